@@ -1,11 +1,17 @@
 # app.py
+import asyncio
 import streamlit as st
-import folium
 from streamlit_folium import st_folium
 from src.utils import load_data, parse_natural_language_query
-from src.logic import build_graph, find_shortest_path, calculate_emissions
-from src.ml_engine import predict_delay, predict_price
-from src.ai_chat import get_travel_advice
+from src.logic import build_graph, find_k_shortest_paths
+from src.itinerary import itinerary_metrics
+from src.graph_cache import GraphCache
+from src.place_index import PlaceIndex
+from src.reachability import reachability_index
+from src.route_map import isochrone_layer, overlay_map, route_map, routes_layer
+from src.ml_engine import model_version
+from src.spatial_index import AirportIndex, METRO_RADIUS_KM
+from src.ai_chat import ask_quick_actions, quick_action_prompts, stream_travel_advice
 
 # --- 1. PAGE CONFIGURATION ---
 st.set_page_config(
@@ -82,14 +88,65 @@ st.markdown("""
 # --- 3. SESSION STATE ---
 if "path_details" not in st.session_state: st.session_state.path_details = None
 if "total_dist" not in st.session_state: st.session_state.total_dist = 0
+if "itineraries" not in st.session_state: st.session_state.itineraries = []
 if "nlp_origin" not in st.session_state: st.session_state.nlp_origin = None
 if "nlp_dest" not in st.session_state: st.session_state.nlp_dest = None
 if "chat_history" not in st.session_state: st.session_state.chat_history = []
 
 # --- 4. DATA LOADING ---
+@st.cache_resource
+def get_graph_cache():
+    """One graph cache per server process, shared by every browser session."""
+    airports, airlines, routes = load_data()
+
+    def build_full():
+        G = build_graph(routes, airports, airlines)
+        reachability_index(G) # attached to G, so "no route" answers skip the search
+        return G
+    return GraphCache(build_full)
+
+@st.cache_resource
+def get_place_index():
+    """Place-name index for the search bar, built once per server process."""
+    airports, _, _ = load_data()
+    return PlaceIndex(airports)
+
+@st.cache_resource
+def get_airport_index():
+    """Spatial index for nearby-airport lookups, built once per server process."""
+    airports, _, _ = load_data()
+    return AirportIndex(airports)
+
+def itinerary_key(path):
+    """Hashable identity of an itinerary (its legs), used as the render cache key."""
+    return tuple((leg["from"], leg["to"], leg["airline"]) for leg in path)
+
+@st.cache_data(max_entries=64, show_spinner=False)
+def get_itinerary_metrics(key, version, _path):
+    """
+    Per-leg price, delay risk and emissions, computed once per itinerary (and
+    model version, so a retrain isn't served stale prices) rather than on every rerun.
+    """
+    return itinerary_metrics(_path)
+
+@st.cache_resource(max_entries=32, show_spinner=False)
+def get_route_map(key, _path):
+    """The folium map of one itinerary, built once and reused by every rerun showing it."""
+    return route_map(_path)
+
+@st.cache_resource(max_entries=16, show_spinner=False)
+def get_overlay_map(key, _itineraries, _reachability, reach_stops):
+    """Lightweight map: every route option and optionally an isochrone, each as a single GeoJSON layer."""
+    origin = _itineraries[0][0][0]
+    layers = [routes_layer(_itineraries)]
+    if reach_stops is not None:
+        layers.append(isochrone_layer(_reachability.reachable(origin["from"], max_stops=reach_stops)))
+    return overlay_map(origin["coords_u"], layers)
+
 with st.spinner("🚀 Booting SkyLink Systems..."):
     airports, airlines, routes = load_data()
     airport_options = dict(zip(airports["Label"], airports["IATA"]))
+    place_index = get_place_index()
 
 # --- 5. TOP NAVIGATION (SEARCH) ---
 col_logo, col_search = st.columns([1, 3])
@@ -99,7 +156,7 @@ with col_logo:
 with col_search:
     nlp_query = st.text_input("🧠  Search", placeholder="Type naturally: 'Fly from Tokyo to Sydney'...")
     if nlp_query:
-        found_origin, found_dest = parse_natural_language_query(nlp_query, airport_options)
+        found_origin, found_dest = parse_natural_language_query(nlp_query, airport_options, place_index)
         if found_origin and found_dest:
             st.session_state.nlp_origin = found_origin
             st.session_state.nlp_dest = found_dest
@@ -116,46 +173,60 @@ with st.expander("⚙️ Manual Selection & Filters"):
     
     # Airline Filter
     preferred_airlines = st.multiselect("Filter Airlines", options=airlines["Name"].sort_values().unique())
+    nearby_airports = st.checkbox(f"Include nearby airports (within {METRO_RADIUS_KM} km)")
+    max_stops = st.selectbox("Max Stops", options=[None, 0, 1, 2, 3], format_func=lambda s: "Any" if s is None else str(s))
     
     if preferred_airlines:
-        selected_iata = airlines[airlines["Name"].isin(preferred_airlines)]["IATA"].tolist()
-        active_routes = routes[routes["Airline"].isin(selected_iata)]
+        selected_iata = airlines[airlines["Name"].isin(preferred_airlines)]["IATA"].dropna().tolist()
     else:
-        active_routes = routes
+        selected_iata = None
 
-    # Refresh Button
+    # Refresh Button (rebuilds the network shared by every session and filter)
+    graph_cache = get_graph_cache()
     if st.button("🔄 Refresh Network Graph"):
-        G = build_graph(active_routes, airports, airlines)
-        st.session_state.G = G
+        graph_cache.invalidate()
         st.success("Network Updated.")
     
-    if "G" not in st.session_state:
-        G = build_graph(active_routes, airports, airlines)
-        st.session_state.G = G
-    else:
-        G = st.session_state.G
+    # One shared network; the airline filter is applied during the search
+    network = graph_cache.get(selected_iata)
+    G = network.graph
 
 # --- 6. ACTION & RESULTS ---
 if st.button("🚀 Launch Route Analysis", type="primary", use_container_width=True):
     if origin_label and dest_label:
         origin_code, dest_code = airport_options[origin_label], airport_options[dest_label]
+        if nearby_airports:
+            # "Any London airport": route from/to whichever airport of the metro area is best
+            airport_index = get_airport_index()
+            origin_code = airport_index.metro_airports(origin_code)
+            dest_code = airport_index.metro_airports(dest_code)
         
         with st.spinner("🛰️ Triangulating optimal path..."):
-            path, dist = find_shortest_path(G, origin_code, dest_code)
-            st.session_state.path_details = path
-            st.session_state.total_dist = dist
+            # Best route plus up to two alternatives at most 50% longer, computed once per search
+            itineraries = find_k_shortest_paths(G, origin_code, dest_code, k=3, max_stops=max_stops, detour_ratio=1.5,
+                                                airlines=network.airlines)
+            st.session_state.itineraries = itineraries
+            st.session_state.path_details, st.session_state.total_dist = itineraries[0] if itineraries else (None, 0)
             st.session_state.chat_history = [] # Reset chat on new search
+        if not itineraries:
+            st.warning("🚫 No route found between these airports with the current filters.")
+
+# Switching between alternatives reuses the stored itineraries
+if len(st.session_state.itineraries) > 1:
+    choice = st.radio("🛫 Route Options", options=range(len(st.session_state.itineraries)), horizontal=True,
+                      format_func=lambda i: f"Option {i+1}: {len(st.session_state.itineraries[i][0]) - 1} stop(s), {int(st.session_state.itineraries[i][1]):,} km")
+    st.session_state.path_details, st.session_state.total_dist = st.session_state.itineraries[choice]
 
 # --- 7. MAIN TABS (THE NEW UI) ---
 if st.session_state.path_details:
     path = st.session_state.path_details
     
-    # Calculate Metrics
-    total_price = 0
-    for leg in path:
-        duration = int((leg['distance'] / 800) * 60 + 45)
-        total_price += predict_price(duration, 0, leg['airline'])
-    total_emissions = calculate_emissions(st.session_state.total_dist)
+    # Calculate Metrics (whole itinerary scored in one call per model, cached per itinerary)
+    path_key = itinerary_key(path)
+    metrics = get_itinerary_metrics(path_key, model_version(), path)
+    leg_emissions, leg_risks = metrics["emissions"], metrics["risks"]
+    total_price = metrics["prices"].sum()
+    total_emissions = leg_emissions.sum()
 
     # Metrics Bar (Always Visible)
     m1, m2, m3 = st.columns(3)
@@ -171,25 +242,28 @@ if st.session_state.path_details:
         c_map, c_list = st.columns([2, 1])
         
         with c_map:
-            start_coords = path[0]['coords_u']
-            m = folium.Map(location=start_coords, zoom_start=3, tiles="CartoDB dark_matter")
-            for leg in path:
-                folium.PolyLine([leg['coords_u'], leg['coords_v']], color="#00C9FF", weight=4, opacity=0.8).add_to(m)
-                folium.Marker(leg['coords_u'], popup=leg['from'], icon=folium.Icon(color="blue", icon="plane", prefix="fa")).add_to(m)
-            folium.Marker(path[-1]['coords_v'], popup="DEST", icon=folium.Icon(color="red", icon="flag", prefix="fa")).add_to(m)
-            st_folium(m, height=500, use_container_width=True)
+            # Lightweight mode: all options (and optionally everywhere reachable from the origin) as GeoJSON layers
+            lightweight = st.toggle("🌐 Overview map (all options as one layer)")
+            if lightweight:
+                reach_stops = st.selectbox("Reachable from origin (any airline)", options=[None, 0, 1, 2, 3],
+                                           format_func=lambda s: "Off" if s is None else f"within {s} stop(s)")
+                itineraries_key = tuple(itinerary_key(p) for p, _ in st.session_state.itineraries)
+                m = get_overlay_map(itineraries_key, st.session_state.itineraries, reachability_index(G), reach_stops)
+            else:
+                m = get_route_map(path_key, path)
+            # Map interactions (pan/zoom) don't need to rerun the script
+            st_folium(m, height=500, use_container_width=True, returned_objects=[],
+                      key="overview_map" if lightweight else "route_map")
             
         with c_list:
             st.markdown("#### 🎫 Itinerary")
             for i, leg in enumerate(path):
-                duration = int((leg['distance'] / 800) * 60 + 45)
-                price = predict_price(duration, 0, leg['airline'])
-                risk = predict_delay(leg['distance'], "rain", leg['airline'])
+                risk = leg_risks[i]
                 risk_color = "#ff4444" if risk > 0.5 else "#00C9FF"
                 
                 with st.container(border=True):
                     st.markdown(f"**Leg {i+1}: {leg['from']} ➝ {leg['to']}**")
-                    st.caption(f"{leg['airline']}")
+                    st.caption(f"{leg['airline']} · {leg_emissions[i]:.0f} kg CO₂")
                     st.markdown(f"Delay Risk: <span style='color:{risk_color}'>{risk:.0%}</span>", unsafe_allow_html=True)
 
     # --- TAB 2: AI TRAVEL COMPANION (CENTRALIZED) ---
@@ -206,28 +280,37 @@ if st.session_state.path_details:
             api_key = st.text_input("Enter Groq API Key for live answers:", type="password")
 
         # Quick Action Buttons
-        col_q1, col_q2, col_q3, col_q4 = st.columns(4)
+        quick_actions = quick_action_prompts(dest_name)
+        cols = st.columns(len(quick_actions) + 1)
         prompt = None
-        if col_q1.button("🍽️ Food Guide"): prompt = f"What is the best local food to eat in {dest_name}?"
-        if col_q2.button("⚠️ Safety Tips"): prompt = f"Is {dest_name} safe for tourists? Any warnings?"
-        if col_q3.button("🎒 Packing List"): prompt = f"What should I pack for a trip to {dest_name}?"
-        if col_q4.button("🏛️ Must Visit"): prompt = f"What are the top 3 hidden gems in {dest_name}?"
+        for col, (label, question) in zip(cols, quick_actions.items()):
+            if col.button(label): prompt = question
+        briefing = cols[-1].button("🧳 Trip Briefing") # all quick actions at once
 
         # Handle User Input (Manual or Button)
         user_input = st.chat_input(f"Ask about {dest_name}...")
         
         if prompt: user_input = prompt # Override if button clicked
 
-        # Process Chat
+        # Render Chat History (Like WhatsApp/iMessage)
+        for msg in st.session_state.chat_history:
+            with st.chat_message(msg["role"]):
+                st.markdown(msg["content"])
+
+        # Process Chat (the reply streams in as the model writes it)
         if user_input:
             st.session_state.chat_history.append({"role": "user", "content": user_input})
-            
-            with st.spinner("🤖 AI is thinking..."):
-                ai_reply = get_travel_advice(dest_name, user_input, api_key)
-            
+            with st.chat_message("user"):
+                st.markdown(user_input)
+            with st.chat_message("assistant"):
+                ai_reply = st.write_stream(stream_travel_advice(dest_name, user_input, api_key))
             st.session_state.chat_history.append({"role": "assistant", "content": ai_reply})
 
-        # Render Chat History (Like WhatsApp/iMessage)
-        for msg in st.session_state.chat_history:
-            with st.chat_message(msg["role"]):
-                st.markdown(msg["content"])
\ No newline at end of file
+        elif briefing:
+            with st.spinner("🤖 Asking all quick questions at once..."):
+                answers = asyncio.run(ask_quick_actions(dest_name, api_key))
+            for question, ai_reply, _ in answers.values():
+                for role, content in [("user", question), ("assistant", ai_reply)]:
+                    st.session_state.chat_history.append({"role": role, "content": content})
+                    with st.chat_message(role):
+                        st.markdown(content)
\ No newline at end of file
@@ -0,0 +1,22 @@
+# benchmarks/_common.py
+import time
+import statistics
+
+from src.tables import load_tables # re-exported: benchmarks load the tables without Streamlit
+
+
+def timeit(fn, *args, repeat=5, **kwargs):
+    """
+    Runs fn `repeat` times and returns (last_result, median_seconds, min_seconds).
+    """
+    timings = []
+    result = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = fn(*args, **kwargs)
+        timings.append(time.perf_counter() - start)
+    return result, statistics.median(timings), min(timings)
+
+
+def report(label, seconds):
+    print(f"   {label:<40} {seconds * 1000:>10.2f} ms")
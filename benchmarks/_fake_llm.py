@@ -0,0 +1,115 @@
+# benchmarks/_fake_llm.py
+"""Local stand-ins for the Groq API, so the chat benchmarks need no API key or network."""
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from types import SimpleNamespace
+
+
+class StubClient:
+    """
+    Mimics `client.chat.completions.create(...)`: sleeps `latency` seconds and
+    answers with the question echoed back. Counts calls across all instances.
+    """
+
+    calls = 0
+    _lock = threading.Lock()
+
+    def __init__(self, api_key=None, latency=0.2):
+        self.api_key = api_key
+        self.latency = latency
+        self.chat = SimpleNamespace(completions=SimpleNamespace(create=self._create))
+
+    def _create(self, model, messages, **kwargs):
+        with StubClient._lock:
+            StubClient.calls += 1
+        time.sleep(self.latency)
+        answer = f"🍽️ Stub answer to: {messages[-1]['content']}"
+        return SimpleNamespace(choices=[SimpleNamespace(message=SimpleNamespace(content=answer))])
+
+
+class FakeLLMServer:
+    """
+    Local HTTP server speaking the OpenAI-compatible chat completions protocol
+    that the Groq client uses, streamed (server-sent events) or not. Each answer
+    is `tokens` words sent `token_delay` seconds apart after `first_token_delay`.
+    Use as a context manager; `base_url` goes to `Groq(base_url=...)`.
+    """
+
+    def __init__(self, tokens=30, first_token_delay=0.3, token_delay=0.02):
+        self.tokens = tokens
+        self.first_token_delay = first_token_delay
+        self.token_delay = token_delay
+        self.requests = 0
+        self._lock = threading.Lock()
+        self._server = ThreadingHTTPServer(("127.0.0.1", 0), self._handler())
+        self._server.daemon_threads = True
+        self.base_url = f"http://127.0.0.1:{self._server.server_port}"
+
+    def answer(self, question):
+        if not self.tokens:
+            return [] # an empty completion
+        return [f"{'🌍' if i == 0 else ''}word{i} " for i in range(self.tokens - 1)] + [f"({question[:20]})"]
+
+    def _handler(self):
+        fake = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def log_message(self, *args):
+                pass
+
+            def do_POST(self):
+                body = json.loads(self.rfile.read(int(self.headers["Content-Length"])))
+                with fake._lock:
+                    fake.requests += 1
+                words = fake.answer(body["messages"][-1]["content"])
+                base = {"id": "fake", "object": "chat.completion.chunk", "created": 0, "model": body["model"]}
+                time.sleep(fake.first_token_delay)
+                if not body.get("stream"):
+                    time.sleep(fake.token_delay * (len(words) - 1)) # the whole answer is generated first
+                    return self._json({**base, "object": "chat.completion", "choices": [{
+                        "index": 0, "finish_reason": "stop",
+                        "message": {"role": "assistant", "content": "".join(words)}}]})
+
+                self.send_response(200)
+                self.send_header("Content-Type", "text/event-stream")
+                self.send_header("Transfer-Encoding", "chunked")
+                self.end_headers()
+                try:
+                    for i, word in enumerate(words):
+                        if i:
+                            time.sleep(fake.token_delay)
+                        self._event({**base, "choices": [{"index": 0, "delta": {"content": word}, "finish_reason": None}]})
+                    self._event({**base, "choices": [{"index": 0, "delta": {}, "finish_reason": "stop"}]})
+                    self._write(b"data: [DONE]\n\n")
+                    self._write(b"")
+                except (BrokenPipeError, ConnectionResetError):
+                    pass # the client gave up (deadline)
+
+            def _json(self, payload):
+                data = json.dumps(payload).encode()
+                self.send_response(200)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(data)))
+                self.end_headers()
+                self.wfile.write(data)
+
+            def _event(self, payload):
+                self._write(f"data: {json.dumps(payload)}\n\n".encode())
+
+            def _write(self, data):
+                self.wfile.write(f"{len(data):x}\r\n".encode() + data + b"\r\n")
+                self.wfile.flush()
+
+        return Handler
+
+    def __enter__(self):
+        threading.Thread(target=self._server.serve_forever, daemon=True).start()
+        return self
+
+    def __exit__(self, *exc):
+        self._server.shutdown()
+        self._server.server_close()
@@ -0,0 +1,86 @@
+# benchmarks/bench_advice_cache.py
+"""
+Travel-advice cache: repeated and concurrent identical questions against a
+stub LLM client with a fixed latency, with and without ADVICE_CACHE.
+
+Run from the repository root:
+    python -m benchmarks.bench_advice_cache
+"""
+import sys
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from src import ai_chat
+from src.response_cache import ResponseCache
+from benchmarks._common import report
+from benchmarks._fake_llm import StubClient
+
+LATENCY = 0.2 # seconds per stub completion
+QUICK_ACTIONS = ["What food should I eat?", "What should I pack?", "What should I visit?"]
+DESTINATIONS = ["London, United Kingdom", "Paris, France", "Tokyo, Japan"]
+CONCURRENT_USERS = 16
+
+
+def offline_client(api_key):
+    raise RuntimeError("no network")
+
+
+def ask_all(questions, workers, use_cache=True):
+    with ThreadPoolExecutor(workers) as pool:
+        return list(pool.map(lambda q: ai_chat.get_travel_advice(*q, api_key="stub", use_cache=use_cache), questions))
+
+
+def main():
+    ai_chat.set_client_factory(lambda api_key: StubClient(api_key, latency=LATENCY))
+    failed = False
+    with tempfile.TemporaryDirectory() as disk_dir:
+        ai_chat.ADVICE_CACHE = ResponseCache(ttl=3600, max_entries=64, disk_dir=disk_dir)
+        # Same question, different spelling: one cache entry
+        questions = [(d, q) for d in DESTINATIONS for q in QUICK_ACTIONS]
+        burst = [(d.upper(), q.lower() + "  ") for d, q in questions] * (CONCURRENT_USERS // len(questions) + 1)
+
+        print(f"💬 {len(questions)} distinct questions, stub latency {LATENCY * 1000:.0f} ms:")
+        start = time.perf_counter()
+        ask_all(questions, workers=1, use_cache=False)
+        report("uncached, sequential", time.perf_counter() - start)
+        calls_before = StubClient.calls
+
+        start = time.perf_counter()
+        answers = ask_all(burst, workers=len(burst))
+        report(f"cold cache, {len(burst)} concurrent askers", time.perf_counter() - start)
+        upstream = StubClient.calls - calls_before
+        print(f"   upstream calls: {upstream} for {len(burst)} requests")
+        failed |= upstream != len(questions)
+
+        start = time.perf_counter()
+        warm = ask_all(questions, workers=1)
+        report("warm cache, sequential", time.perf_counter() - start)
+        stats = ai_chat.ADVICE_CACHE.stats()
+        print(f"   hit rate {stats['hit_rate']:.0%} ({stats['hits']} hits, {stats['coalesced']} coalesced, "
+              f"{stats['misses']} misses)")
+
+        # A fresh process only finds the disk tier
+        ai_chat.ADVICE_CACHE = ResponseCache(ttl=3600, max_entries=64, disk_dir=disk_dir)
+        start = time.perf_counter()
+        from_disk = ask_all(questions, workers=1)
+        report("disk tier after restart", time.perf_counter() - start)
+        failed |= StubClient.calls - calls_before != len(questions)
+
+        stats = ai_chat.ADVICE_CACHE.stats()
+        print(f"   disk hits after restart: {stats['disk_hits']}/{len(questions)}")
+        failed |= any(a != warm[i % len(questions)] for i, a in enumerate(answers)) or from_disk != warm
+
+        ai_chat.ADVICE_CACHE = ResponseCache(ttl=3600, max_entries=64)
+        ai_chat.set_client_factory(offline_client)
+        error = ai_chat.get_travel_advice("Rome", "food?", api_key="stub")
+        failed |= not error.startswith("⚠️") or ai_chat.ADVICE_CACHE.stats()["entries"] != 0
+
+    if failed:
+        print("❌ The cache returned different answers or made extra upstream calls")
+        sys.exit(1)
+    print("✅ Cached answers match, identical questions share one upstream call, errors are not cached.")
+
+
+if __name__ == "__main__":
+    main()
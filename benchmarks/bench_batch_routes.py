@@ -0,0 +1,71 @@
+# benchmarks/bench_batch_routes.py
+"""
+Throughput of bulk O/D routing: `find_shortest_path` in a loop versus the
+origin-grouped `route_many`, serial and on a process pool.
+
+The workload pairs origin and destination airports drawn from the bundled
+routes.dat (busy airports appear as often as they do in the schedule).
+
+Run from the repository root:
+    python -m benchmarks.bench_batch_routes
+"""
+import os
+import random
+import sys
+import time
+
+from src.batch_routes import route_many
+from src.logic import build_graph, find_shortest_path
+from src.network import FlightNetwork
+from benchmarks._common import load_tables
+
+N_PAIRS = 20000
+N_ORIGINS = 500
+LOOP_SAMPLE = 1000 # pairs timed for the per-query loop (extrapolated)
+
+
+def throughput(label, fn, n):
+    start = time.perf_counter()
+    result = fn()
+    seconds = time.perf_counter() - start
+    print(f"   {label:<40} {n / seconds:>10,.0f} pairs/s  ({seconds:.2f} s)")
+    return result
+
+
+def main():
+    print("📦 Loading OpenFlights data...")
+    airports, airlines, routes = load_tables()
+    G = build_graph(routes, airports, airlines)
+    net = FlightNetwork.from_graph(G)
+
+    rng = random.Random(3)
+    sources = [c for c in routes["SourceAirport"].astype(str) if c in net]
+    dests = [c for c in routes["DestAirport"].astype(str) if c in net]
+    origins = rng.sample(sorted(set(sources)), N_ORIGINS)
+    pairs = [(rng.choice(origins), rng.choice(dests)) for _ in range(N_PAIRS)]
+    print(f"🧮 {N_PAIRS:,} O/D pairs over {N_ORIGINS} origins, {os.cpu_count()} CPU(s)")
+
+    sample = pairs[:LOOP_SAMPLE]
+    loop = throughput(f"find_shortest_path loop ({LOOP_SAMPLE:,} pairs)",
+                      lambda: [find_shortest_path(net, s, t)[1] for s, t in sample], len(sample))
+    serial = throughput("route_many (serial)", lambda: list(route_many(net, pairs)), len(pairs))
+    workers = max(os.cpu_count() or 1, 2)
+    parallel = throughput(f"route_many ({workers} workers)",
+                          lambda: list(route_many(net, pairs, workers=workers)), len(pairs))
+
+    start = time.perf_counter()
+    first = next(route_many(net, pairs))
+    print(f"   first streamed result after {(time.perf_counter() - start) * 1000:.1f} ms: "
+          f"{first[0]} -> {first[1]}, {first[3]:,.0f} km")
+
+    by_pair = {(s, t): d for s, t, _, d in serial}
+    mismatched = sum(abs(by_pair[p] - d) > 1e-6 for p, d in zip(sample, loop))
+    mismatched += sum(abs(by_pair[(s, t)] - d) > 1e-6 for s, t, _, d in parallel)
+    if mismatched:
+        print(f"❌ {mismatched} routes differ from find_shortest_path")
+        sys.exit(1)
+    print("✅ Batch results match find_shortest_path.")
+
+
+if __name__ == "__main__":
+    main()
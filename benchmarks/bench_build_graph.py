@@ -0,0 +1,88 @@
+# benchmarks/bench_build_graph.py
+"""
+Compares the vectorized `build_graph` against the original per-row builder
+and checks that both produce the same network.
+
+Run from the repository root:
+    python -m benchmarks.bench_build_graph
+"""
+import math
+import sys
+
+import networkx as nx
+
+from src.logic import build_graph, haversine
+from benchmarks._common import load_tables, timeit, report
+
+
+def build_graph_iterrows(routes, airports, airlines):
+    """The original row-by-row builder, kept here as the reference implementation."""
+    G = nx.Graph()
+    valid_airports = airports.dropna(subset=["IATA"]).drop_duplicates(subset=["IATA"])
+    airport_dict = valid_airports.set_index("IATA")[["Latitude", "Longitude", "City", "Name"]].to_dict('index')
+
+    valid_airlines = airlines.dropna(subset=["IATA"]).drop_duplicates(subset=["IATA"])
+    airline_dict = valid_airlines.set_index("IATA")["Name"].to_dict()
+
+    valid_routes = routes[
+        (routes["SourceAirport"].isin(airport_dict)) &
+        (routes["DestAirport"].isin(airport_dict))
+    ]
+
+    for _, row in valid_routes.iterrows():
+        src, dest, airline = row["SourceAirport"], row["DestAirport"], row["Airline"]
+        src_lat, src_lon = airport_dict[src]["Latitude"], airport_dict[src]["Longitude"]
+        dest_lat, dest_lon = airport_dict[dest]["Latitude"], airport_dict[dest]["Longitude"]
+        dist = haversine(src_lon, src_lat, dest_lon, dest_lat)
+        airline_name = airline_dict.get(airline, airline)
+        G.add_edge(src, dest, weight=dist, airline=airline_name, distance=dist)
+        nx.set_node_attributes(G, {src: airport_dict[src], dest: airport_dict[dest]})
+    return G
+
+
+def graphs_match(G1, G2, tol=1e-6):
+    """Returns a list of differences between two airport graphs (empty = identical)."""
+    problems = []
+    if list(G1.nodes) != list(G2.nodes):
+        problems.append("node sets/order differ")
+    for node, attrs in G1.nodes(data=True):
+        if node in G2 and G2.nodes[node] != attrs:
+            problems.append(f"node attributes differ for {node}")
+            break
+    if G1.number_of_edges() != G2.number_of_edges():
+        problems.append(f"edge count {G1.number_of_edges()} != {G2.number_of_edges()}")
+    for u, v, d in G1.edges(data=True):
+        other = G2.get_edge_data(u, v)
+        if other is None:
+            problems.append(f"missing edge {u}-{v}")
+            break
+        if d["airline"] != other["airline"] or not math.isclose(d["distance"], other["distance"], abs_tol=tol):
+            problems.append(f"edge attributes differ for {u}-{v}: {d} vs {other}")
+            break
+    return problems
+
+
+def main():
+    print("📦 Loading OpenFlights data...")
+    airports, airlines, routes = load_tables()
+    print(f"   {len(routes):,} routes, {len(airports):,} airports")
+
+    print("⏱️ Building graphs...")
+    G_old, old_med, _ = timeit(build_graph_iterrows, routes, airports, airlines, repeat=1)
+    G_new, new_med, _ = timeit(build_graph, routes, airports, airlines, repeat=5)
+    report("iterrows builder", old_med)
+    report("vectorized builder", new_med)
+    print(f"   speedup: {old_med / new_med:.1f}x "
+          f"({G_new.number_of_nodes():,} nodes, {G_new.number_of_edges():,} edges)")
+
+    problems = graphs_match(G_old, G_new)
+    if problems:
+        print("❌ Graphs differ:")
+        for p in problems:
+            print(f"   - {p}")
+        sys.exit(1)
+    print("✅ Both builders produce the same graph.")
+
+
+if __name__ == "__main__":
+    main()
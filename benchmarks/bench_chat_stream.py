@@ -0,0 +1,107 @@
+# benchmarks/bench_chat_stream.py
+"""
+Chat latency against a local fake streaming server: time to first token and
+total time for the blocking `get_travel_advice` versus `stream_travel_advice`,
+the four quick actions one by one versus `ask_quick_actions`, identical
+concurrent questions sharing one upstream stream, and the offline fallback
+when the model misses its deadline or answers with nothing.
+
+Run from the repository root:
+    python -m benchmarks.bench_chat_stream
+"""
+import asyncio
+import sys
+import time
+
+from groq import Groq
+
+from src import ai_chat
+from src.response_cache import ResponseCache
+from benchmarks._common import report
+from benchmarks._fake_llm import FakeLLMServer
+
+DESTINATION = "London"
+QUESTION = "What is the best local food to eat in London?"
+
+
+def use_server(server):
+    ai_chat.set_client_factory(lambda api_key: Groq(api_key=api_key, base_url=server.base_url, max_retries=0))
+    ai_chat.ADVICE_CACHE = ResponseCache(ttl=3600, max_entries=64)
+
+
+def main():
+    failed = False
+    with FakeLLMServer(tokens=30, first_token_delay=0.3, token_delay=0.02) as server:
+        use_server(server)
+        print(f"💬 One answer ({server.tokens} tokens, first after {server.first_token_delay * 1000:.0f} ms):")
+        start = time.perf_counter()
+        blocking = ai_chat.get_travel_advice(DESTINATION, QUESTION, api_key="fake", use_cache=False)
+        report("get_travel_advice (first = last token)", time.perf_counter() - start)
+
+        stats = {}
+        streamed = "".join(ai_chat.stream_travel_advice(DESTINATION, QUESTION, api_key="fake", stats=stats))
+        report("stream_travel_advice, first token", stats["ttft"])
+        report("stream_travel_advice, whole answer", stats["seconds"])
+        failed |= streamed != blocking or stats["source"] != "llm" or stats["chunks"] != server.tokens
+
+        stats = {}
+        "".join(ai_chat.stream_travel_advice(DESTINATION, QUESTION, api_key="fake", stats=stats))
+        report("stream_travel_advice, cached", stats["seconds"])
+        failed |= stats["source"] != "cache"
+
+        print("🧳 Four quick actions:")
+        use_server(server)
+        prompts = ai_chat.quick_action_prompts(DESTINATION)
+        start = time.perf_counter()
+        one_by_one = [ai_chat.get_travel_advice(DESTINATION, q, api_key="fake", use_cache=False) for q in prompts.values()]
+        report("get_travel_advice, one by one", time.perf_counter() - start)
+        start = time.perf_counter()
+        together = asyncio.run(ai_chat.ask_quick_actions(DESTINATION, api_key="fake"))
+        report("ask_quick_actions, concurrently", time.perf_counter() - start)
+        slowest = max(s["ttft"] for _, _, s in together.values())
+        report("ask_quick_actions, slowest first token", slowest)
+        failed |= [answer for _, answer, _ in together.values()] != one_by_one
+
+        print("👥 Four users asking the same question at once:")
+        use_server(server)
+        requests_before = server.requests
+
+        async def same_question():
+            async def one():
+                stats = {}
+                parts = [c async for c in ai_chat.astream_travel_advice(DESTINATION, QUESTION, api_key="fake", stats=stats)]
+                return "".join(parts), stats["source"]
+            return await asyncio.gather(*(one() for _ in range(4)))
+        start = time.perf_counter()
+        shared = asyncio.run(same_question())
+        report("stream_travel_advice x4, coalesced", time.perf_counter() - start)
+        upstream = server.requests - requests_before
+        print(f"   upstream requests: {upstream}, sources: {sorted(source for _, source in shared)}")
+        failed |= upstream != 1 or len({answer for answer, _ in shared}) != 1 or shared[0][0] != blocking
+
+    with FakeLLMServer(tokens=0) as server:
+        use_server(server)
+        stats = {}
+        answer = "".join(ai_chat.stream_travel_advice(DESTINATION, QUESTION, api_key="fake", stats=stats))
+        print(f"🫙 Empty completion: answered from the {stats['source']} guide, "
+              f"{ai_chat.ADVICE_CACHE.stats()['entries']} entries cached")
+        failed |= not answer or ai_chat.ADVICE_CACHE.stats()["entries"] != 0
+
+    with FakeLLMServer(first_token_delay=2.0) as server:
+        use_server(server)
+        print("⏱️ Model slower than the 0.5 s first-token deadline:")
+        stats = {}
+        answer = "".join(ai_chat.stream_travel_advice(DESTINATION, QUESTION, api_key="fake",
+                                                      first_token_deadline=0.5, stats=stats))
+        report("stream_travel_advice, offline fallback", stats["seconds"])
+        failed |= stats["source"] != "deadline" or answer != ai_chat.OFFLINE_KNOWLEDGE["London"]["food"]
+        failed |= ai_chat.ADVICE_CACHE.stats()["entries"] != 0
+
+    if failed:
+        print("❌ Streamed answers differ from blocking ones, or the deadline fallback misbehaved")
+        sys.exit(1)
+    print("✅ Streamed and concurrent answers match; missed deadlines fall back to offline knowledge.")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,107 @@
+# benchmarks/bench_distance_oracle.py
+"""
+Distance-only queries from the hub-label oracle versus a full search, ALT
+versus great-circle A*, and the cost of updating the oracle after a route
+change versus a full build.
+
+Run from the repository root:
+    python -m benchmarks.bench_distance_oracle
+"""
+import os
+import random
+import statistics
+import sys
+import tempfile
+import time
+
+import numpy as np
+import pandas as pd
+from scipy.sparse.csgraph import dijkstra
+
+from src.distance_oracle import DistanceOracle, load_or_build_oracle
+from src.logic import find_shortest_path
+from src.network import build_network
+from benchmarks._common import load_tables, timeit, report
+
+SAMPLE_QUERIES = 2000
+SEARCH_QUERIES = 300
+UPDATE_ROUTES = 30
+CHECK_SOURCES = 200
+MAX_UPDATE_SHARE = 0.25 # an update should cost a small fraction of a full build
+
+
+def count_wrong(oracle, network):
+    """Oracle distances from a sample of airports that differ from scipy's Dijkstra."""
+    codes = network.codes.tolist()
+    sources = random.Random(7).sample(range(len(codes)), CHECK_SOURCES)
+    exact = dijkstra(network.matrix(), indices=sources)
+    got = np.array([[oracle.distance(codes[s], code) for code in codes] for s in sources])
+    return int((~np.isclose(got, exact, rtol=0, atol=1e-6)).sum())
+
+def main():
+    print("📦 Loading OpenFlights data...")
+    airports, airlines, routes = load_tables()
+    net = build_network(routes, airports, airlines)
+    path = os.path.join(tempfile.mkdtemp(), "distance_oracle.npz")
+
+    oracle, build_s, _ = timeit(DistanceOracle.build, net, repeat=1)
+    oracle.save(path)
+    _, load_s, _ = timeit(load_or_build_oracle, net, path, repeat=3)
+    print(f"🏗️ Oracle: {oracle.label_size():.1f} hubs per airport, {len(oracle.landmarks)} landmarks")
+    report("full build", build_s)
+    report("load from disk (up to date)", load_s)
+
+    # Route changes update the saved labels edge by edge instead of rebuilding them
+    rng = random.Random(5)
+    codes = net.codes.tolist()
+    added = routes.sample(UPDATE_ROUTES, random_state=5).assign(
+        SourceAirport=[rng.choice(codes) for _ in range(UPDATE_ROUTES)],
+        DestAirport=[rng.choice(codes) for _ in range(UPDATE_ROUTES)])
+    without_gka = routes[(routes["SourceAirport"] != "GKA") & (routes["DestAirport"] != "GKA")]
+    print("🔁 Update after a route change (vs full build):")
+    wrong, worst = 0, 0.0
+    for label, changed in [("GKA dropped", without_gka),
+                           (f"{UPDATE_ROUTES} routes added", pd.concat([routes, added])),
+                           ("both", pd.concat([without_gka, added]))]:
+        changed_net = build_network(changed, airports, airlines)
+        previous = DistanceOracle.load(path)
+        start = time.perf_counter()
+        updated = DistanceOracle.build(changed_net, previous)
+        seconds = time.perf_counter() - start
+        report(f"{label} ({updated.updated_edges} edges, {seconds / build_s:.0%})", seconds)
+        wrong += count_wrong(updated, changed_net)
+        worst = max(worst, seconds / build_s)
+
+    pairs = [tuple(rng.sample(codes, 2)) for _ in range(SAMPLE_QUERIES)]
+    print("⏱️ Distance per query:")
+    oracle_d, seconds, _ = timeit(lambda: [oracle.distance(s, t) for s, t in pairs], repeat=3)
+    report("hub labels", seconds / len(pairs))
+    search_d, seconds, _ = timeit(lambda: [find_shortest_path(net, s, t)[1] for s, t in pairs[:SEARCH_QUERIES]], repeat=1)
+    report("find_shortest_path (dijkstra)", seconds / SEARCH_QUERIES)
+
+    net.attach_oracle(oracle)
+    print("🔎 Exact path search (median expanded nodes, time per query):")
+    for strategy in ("astar", "alt"):
+        expanded = []
+
+        def run():
+            expanded.clear()
+            for s, t in pairs[:SEARCH_QUERIES]:
+                stats = {}
+                find_shortest_path(net, s, t, strategy=strategy, stats=stats)
+                expanded.append(stats["expanded"])
+        _, seconds, _ = timeit(run, repeat=3)
+        report(f"{strategy:<6} {statistics.median(expanded):>8.0f} nodes", seconds / SEARCH_QUERIES)
+
+    wrong += sum(abs(a - (b if b else float("inf"))) > 1e-6 for a, b in zip(oracle_d, search_d))
+    if wrong:
+        print(f"❌ {wrong} oracle distances differ from the network's")
+        sys.exit(1)
+    if worst > MAX_UPDATE_SHARE:
+        print(f"❌ An update cost {worst:.0%} of a full build (limit {MAX_UPDATE_SHARE:.0%})")
+        sys.exit(1)
+    print("✅ Oracle distances match find_shortest_path and the updated networks.")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,33 @@
+# benchmarks/bench_features.py
+"""
+Cost of producing the price-model training table: reading the XLSX source
+plus `preprocess_data`, versus loading the cached feature file.
+
+Run from the repository root:
+    python -m benchmarks.bench_features
+"""
+import pandas as pd
+
+from src.ml_engine import load_features, preprocess_data, read_raw_data
+from benchmarks._common import timeit, report
+
+
+def main():
+    raw, read_s, _ = timeit(read_raw_data, repeat=3)
+    _, pre_s, _ = timeit(lambda: preprocess_data(raw.copy()), repeat=5)
+    fresh, _, _ = timeit(load_features, use_cache=False, repeat=1)
+    load_features() # make sure the cache exists
+    cached, cache_s, _ = timeit(load_features, repeat=5)
+
+    print(f"⏱️ Training table ({len(cached):,} rows):")
+    report("read XLSX", read_s)
+    report("preprocess_data", pre_s)
+    report("load_features (cached)", cache_s)
+    print(f"   cache is {(read_s + pre_s) / cache_s:.0f}x faster than read + preprocess")
+
+    pd.testing.assert_frame_equal(fresh, cached)
+    print("✅ Cached features are identical to freshly preprocessed ones.")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,66 @@
+# benchmarks/bench_geo_kernels.py
+"""
+Array haversine / emissions kernels versus the scalar functions they replace,
+with accuracy checks (float64 must match the scalar version, float32 must stay
+within FLOAT32_TOLERANCE_KM).
+
+Run from the repository root:
+    python -m benchmarks.bench_geo_kernels
+"""
+import sys
+
+import numpy as np
+
+from src.logic import (calculate_emissions, calculate_emissions_np, haversine, haversine_matrix,
+                       haversine_np)
+from benchmarks._common import load_tables, timeit, report
+
+N_PAIRS = 100_000
+MATRIX_ROWS = 1000
+FLOAT32_TOLERANCE_KM = 2.0
+
+
+def main():
+    airports, _, _ = load_tables()
+    lat = airports["Latitude"].to_numpy(dtype=float)
+    lon = airports["Longitude"].to_numpy(dtype=float)
+    rng = np.random.default_rng(1)
+    i, j = rng.integers(0, len(lat), N_PAIRS), rng.integers(0, len(lat), N_PAIRS)
+    args = (lon[i], lat[i], lon[j], lat[j])
+
+    print(f"⏱️ {N_PAIRS:,} point pairs:")
+    scalar, scalar_s, _ = timeit(lambda: [haversine(*p) for p in zip(*(a.tolist() for a in args))], repeat=3)
+    report("haversine (Python loop)", scalar_s)
+    vec64, vec_s, _ = timeit(haversine_np, *args, repeat=5)
+    report("haversine_np (float64)", vec_s)
+    vec32, vec32_s, _ = timeit(haversine_np, *args, dtype=np.float32, repeat=5)
+    report("haversine_np (float32)", vec32_s)
+
+    print(f"⏱️ Distance matrix {MATRIX_ROWS:,} x {len(lat):,} airports:")
+    for dtype in (np.float64, np.float32):
+        m, seconds, _ = timeit(haversine_matrix, lon[:MATRIX_ROWS], lat[:MATRIX_ROWS], lon, lat, dtype=dtype, repeat=3)
+        report(f"haversine_matrix ({np.dtype(dtype).name}, {m.nbytes / 1e6:.0f} MB)", seconds)
+    matrix = haversine_matrix(lon[:MATRIX_ROWS], lat[:MATRIX_ROWS], lon, lat)
+    one_to_many = haversine_np(lon, lat, lon[0], lat[0])
+
+    distances = np.asarray(scalar)
+    print(f"⏱️ Emissions for {N_PAIRS:,} distances:")
+    emissions, loop_s, _ = timeit(lambda: [calculate_emissions(d) for d in distances.tolist()], repeat=3)
+    report("calculate_emissions (Python loop)", loop_s)
+    emissions_np, np_s, _ = timeit(calculate_emissions_np, distances, repeat=5)
+    report("calculate_emissions_np", np_s)
+
+    err64 = np.max(np.abs(vec64 - distances))
+    err32 = np.max(np.abs(vec32.astype(float) - distances))
+    err_matrix = np.max(np.abs(matrix[0] - one_to_many))
+    err_emissions = np.max(np.abs(emissions_np - np.asarray(emissions)))
+    print(f"📏 max |error|: float64 {err64:.2e} km, float32 {err32:.3f} km, "
+          f"matrix {err_matrix:.2e} km, emissions {err_emissions:.2e} kg")
+    if err64 > 1e-6 or err_matrix > 1e-6 or err_emissions > 0.01 + 1e-9 or err32 > FLOAT32_TOLERANCE_KM:
+        print("❌ Array kernels disagree with the scalar functions")
+        sys.exit(1)
+    print("✅ Array kernels match the scalar functions.")
+
+
+if __name__ == "__main__":
+    main()
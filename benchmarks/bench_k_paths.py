@@ -0,0 +1,79 @@
+# benchmarks/bench_k_paths.py
+"""
+Alternative itineraries: `find_k_shortest_paths` on both network engines versus
+networkx's `shortest_simple_paths` (plain Yen without shared search state).
+
+Run from the repository root:
+    python -m benchmarks.bench_k_paths
+"""
+import random
+import sys
+import time
+
+import networkx as nx
+
+from src.logic import build_graph, find_k_shortest_paths
+from src.network import FlightNetwork
+from benchmarks._common import load_tables, report
+
+SAMPLE_QUERIES = 50
+K = 4
+# (max_stops, detour_ratio) combinations to profile
+LIMITS = [(None, None), (None, 1.3), (2, None), (1, 1.5)]
+
+
+def reference(G, src, dest, k, max_stops, detour_ratio):
+    """Route distances from networkx's Yen, filtered afterwards."""
+    if not nx.has_path(G, src, dest):
+        return []
+    out, best = [], None
+    for path in nx.shortest_simple_paths(G, src, dest, weight="weight"):
+        dist = nx.path_weight(G, path, "weight")
+        best = dist if best is None else best
+        if detour_ratio is not None and dist > best * detour_ratio * (1 + 1e-9):
+            break
+        if max_stops is None or len(path) - 2 <= max_stops:
+            out.append(dist)
+            if len(out) == k:
+                break
+    return out
+
+
+def main():
+    print("📦 Loading OpenFlights data...")
+    airports, airlines, routes = load_tables()
+    G = build_graph(routes, airports, airlines)
+    net = FlightNetwork.from_graph(G)
+
+    rng = random.Random(11)
+    nodes = list(G.nodes)
+    pairs = [tuple(rng.sample(nodes, 2)) for _ in range(SAMPLE_QUERIES)]
+
+    failed = False
+    for max_stops, detour_ratio in LIMITS:
+        print(f"🔀 k={K}, max_stops={max_stops}, detour_ratio={detour_ratio} (time per query):")
+        results = {}
+        for engine, graph in [("networkx", G), ("CSR", net)]:
+            start = time.perf_counter()
+            results[engine] = [[dist for _, dist in find_k_shortest_paths(graph, s, t, K, max_stops, detour_ratio)]
+                               for s, t in pairs]
+            report(f"find_k_shortest_paths ({engine})", (time.perf_counter() - start) / len(pairs))
+
+        # Filtering after the fact gets slow without a stop limit in the search; only time the cheap cases
+        if max_stops is None:
+            start = time.perf_counter()
+            results["reference"] = [reference(G, s, t, K, max_stops, detour_ratio) for s, t in pairs]
+            report("nx.shortest_simple_paths", (time.perf_counter() - start) / len(pairs))
+
+        expected = results["networkx"]
+        for engine, got in results.items():
+            if any(len(a) != len(b) or any(abs(x - y) > 1e-6 for x, y in zip(a, b)) for a, b in zip(expected, got)):
+                print(f"❌ {engine} returns different routes")
+                failed = True
+    if failed:
+        sys.exit(1)
+    print("✅ All engines return the same alternative routes.")
+
+
+if __name__ == "__main__":
+    main()
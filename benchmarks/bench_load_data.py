@@ -0,0 +1,50 @@
+# benchmarks/bench_load_data.py
+"""
+Startup cost of parsing the OpenFlights .dat files versus loading the
+memory-mapped Feather cache written by `tables.load_tables`.
+
+Run from the repository root:
+    python -m benchmarks.bench_load_data
+"""
+import subprocess
+import sys
+
+import pandas as pd
+
+from src.tables import load_tables, parse_tables
+from benchmarks._common import timeit, report
+
+# Fresh interpreter per run so nothing is warm except the OS page cache
+COLD_START = "import time; from src.tables import load_tables; t = time.perf_counter(); load_tables({}); print(time.perf_counter() - t)"
+
+
+def cold_start(use_cache, runs=3):
+    timings = []
+    for _ in range(runs):
+        out = subprocess.run([sys.executable, "-c", COLD_START.format(use_cache)],
+                             capture_output=True, text=True, check=True)
+        timings.append(float(out.stdout.strip().splitlines()[-1]))
+    return min(timings)
+
+
+def main():
+    load_tables() # make sure the cache exists
+
+    _, parse_s, _ = timeit(parse_tables, repeat=5)
+    cached, cache_s, _ = timeit(load_tables, repeat=5)
+    print("⏱️ In-process load:")
+    report("CSV parse + clean", parse_s)
+    report("Feather cache (memory-mapped)", cache_s)
+    print(f"   cache is {parse_s / cache_s:.1f}x faster")
+
+    print("⏱️ First load in a new interpreter (best of 3):")
+    report("CSV path", cold_start(False))
+    report("cache path", cold_start(True))
+
+    for parsed, loaded in zip(parse_tables(), cached):
+        pd.testing.assert_frame_equal(parsed, loaded)
+    print("✅ Cached tables are identical to the parsed ones.")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,65 @@
+# benchmarks/bench_ml_batch.py
+"""
+Per-leg predict_price/predict_delay calls versus one batched call per model,
+for 1-, 10- and 10k-leg batches.
+
+Run from the repository root (trains the models first if they are missing):
+    python -m benchmarks.bench_ml_batch
+"""
+import sys
+import warnings
+
+import numpy as np
+
+from src.ml_engine import (predict_delay, predict_delays_batch, predict_price,
+                           predict_prices_batch)
+from benchmarks._common import timeit, report
+
+BATCH_SIZES = [1, 10, 10_000]
+# Looping 10k single-row predictions takes minutes; time a slice and scale it
+MAX_LOOPED_LEGS = 100
+AIRLINES = ["IndiGo", "Air India", "Jet Airways", "SpiceJet", "Qantas", "Emirates", "Unknown Air"]
+
+
+def make_legs(n, rng):
+    distances = rng.uniform(200, 12000, n)
+    durations = (distances / 800 * 60 + 45).astype(int)
+    airlines = rng.choice(AIRLINES, n).tolist()
+    return distances, durations, airlines
+
+
+def score_looped(distances, durations, airlines):
+    prices = [predict_price(d, 0, a) for d, a in zip(durations, airlines)]
+    risks = [predict_delay(d, "rain", a) for d, a in zip(distances, airlines)]
+    return np.array(prices), np.array(risks)
+
+
+def score_batched(distances, durations, airlines):
+    return predict_prices_batch(durations, 0, airlines), predict_delays_batch(distances, "rain", airlines)
+
+
+def main():
+    warnings.filterwarnings("ignore", message="X does not have valid feature names")
+    rng = np.random.default_rng(0)
+    score_batched(*make_legs(1, rng)) # load the models outside the timings
+
+    for n in BATCH_SIZES:
+        legs = make_legs(n, rng)
+        looped = min(n, MAX_LOOPED_LEGS)
+        (loop_prices, loop_risks), loop_s, _ = timeit(score_looped, *(x[:looped] for x in legs), repeat=3)
+        loop_s *= n / looped
+        (prices, risks), batch_s, _ = timeit(score_batched, *legs, repeat=3)
+
+        print(f"🧮 {n:,} legs:")
+        report("per-leg calls" + (" (scaled)" if looped < n else ""), loop_s)
+        report("batched calls", batch_s)
+        print(f"   speedup: {loop_s / batch_s:.1f}x")
+
+        if not (np.allclose(loop_prices, prices[:looped]) and np.allclose(loop_risks, risks[:looped])):
+            print("❌ Batched predictions differ from the per-leg functions")
+            sys.exit(1)
+    print("✅ Batched and per-leg predictions match.")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,75 @@
+# benchmarks/bench_network.py
+"""
+Memory and query latency of the CSR `FlightNetwork` versus the networkx graph.
+
+Run from the repository root:
+    python -m benchmarks.bench_network
+"""
+import gc
+import random
+import sys
+import tracemalloc
+
+from src.logic import build_graph, find_shortest_path
+from src.network import build_network
+from benchmarks._common import load_tables, timeit, report
+
+SAMPLE_QUERIES = 200
+
+
+def traced_build(builder, *args):
+    """Returns (object, bytes retained after the build)."""
+    gc.collect()
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    obj = builder(*args)
+    gc.collect()
+    after = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    return obj, after - before
+
+
+def run_queries(G, pairs):
+    for src, dest in pairs:
+        find_shortest_path(G, src, dest)
+
+
+def main():
+    print("📦 Loading OpenFlights data...")
+    airports, airlines, routes = load_tables()
+
+    G, graph_bytes = traced_build(build_graph, routes, airports, airlines)
+    net, net_bytes = traced_build(build_network, routes, airports, airlines)
+    print("🧮 Retained memory:")
+    print(f"   networkx.Graph                           {graph_bytes / 1e6:>10.2f} MB")
+    print(f"   FlightNetwork (CSR)                      {net_bytes / 1e6:>10.2f} MB "
+          f"(arrays: {net.nbytes() / 1e6:.2f} MB)")
+
+    _, graph_build, _ = timeit(build_graph, routes, airports, airlines, repeat=3)
+    _, net_build, _ = timeit(build_network, routes, airports, airlines, repeat=3)
+    print("⏱️ Build time:")
+    report("networkx.Graph", graph_build)
+    report("FlightNetwork (CSR)", net_build)
+
+    rng = random.Random(42)
+    nodes = list(G.nodes)
+    pairs = [("GKA", "JFK")] + [tuple(rng.sample(nodes, 2)) for _ in range(SAMPLE_QUERIES - 1)]
+
+    # Same answers on every sampled query
+    for src, dest in pairs:
+        legs_g, dist_g = find_shortest_path(G, src, dest)
+        legs_n, dist_n = find_shortest_path(net, src, dest)
+        if (legs_g is None) != (legs_n is None) or abs(dist_g - dist_n) > 1e-6:
+            print(f"❌ Mismatch for {src}->{dest}: {dist_g} vs {dist_n}")
+            sys.exit(1)
+
+    _, graph_q, _ = timeit(run_queries, G, pairs, repeat=3)
+    _, net_q, _ = timeit(run_queries, net, pairs, repeat=3)
+    print(f"⏱️ Shortest path ({len(pairs)} queries, per query):")
+    report("networkx.Graph", graph_q / len(pairs))
+    report("FlightNetwork (CSR)", net_q / len(pairs))
+    print("✅ Both networks return the same route distances.")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,42 @@
+# benchmarks/bench_place_index.py
+"""
+Search-bar lookups: the linear label scan in `parse_natural_language_query`
+versus the prebuilt `PlaceIndex`.
+
+Run from the repository root:
+    python -m benchmarks.bench_place_index
+"""
+from src.place_index import PlaceIndex
+from src.utils import parse_natural_language_query
+from benchmarks._common import load_tables, timeit, report
+
+QUERIES = [
+    "from Mumbai to Paris", "New York to Tokyo", "fly from london to sydney",
+    "from Sydny to NYC", "heathrow to frankfrt", "from bom to jfk",
+]
+
+
+def main():
+    airports, _, _ = load_tables()
+    airport_options = dict(zip(airports["Label"], airports["IATA"]))
+
+    index, build_s, _ = timeit(PlaceIndex, airports, repeat=3)
+    report("PlaceIndex build", build_s)
+
+    print("⏱️ Per query (origin + destination):")
+    for query in QUERIES:
+        scan, scan_s, _ = timeit(parse_natural_language_query, query, airport_options, repeat=20)
+        found, index_s, _ = timeit(parse_natural_language_query, query, airport_options, index, repeat=20)
+        print(f"   {query!r}")
+        report("  linear scan", scan_s)
+        report("  index", index_s)
+        print(f"      scan:  {scan}")
+        print(f"      index: {found}")
+
+    print("🔎 Top 3 for 'Sydny':")
+    for label, score in index.search("Sydny", k=3):
+        print(f"   {score:.2f}  {label}")
+
+
+if __name__ == "__main__":
+    main()
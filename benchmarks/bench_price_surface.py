@@ -0,0 +1,56 @@
+# benchmarks/bench_price_surface.py
+"""
+Price lookups served by the precomputed price surface versus the forest.
+
+Run from the repository root (compiles the surface if it is missing):
+    python -m benchmarks.bench_price_surface
+"""
+import os
+import sys
+import warnings
+
+import numpy as np
+
+from src import ml_engine
+from benchmarks._common import timeit, report
+
+SINGLE_CALLS = 200
+BATCH = 10_000
+AIRLINES = ["IndiGo", "Air India", "Jet Airways", "SpiceJet", "Vistara", "Unknown Air"]
+
+
+def single_calls(durations, airlines):
+    return [ml_engine.predict_price(d, 0, a) for d, a in zip(durations, airlines)]
+
+
+def main():
+    warnings.filterwarnings("ignore", message="X does not have valid feature names")
+    if not os.path.exists(ml_engine.PRICE_SURFACE_PATH):
+        print("🧮 Compiling price surface...")
+        _, seconds, _ = timeit(ml_engine.compile_price_surface, repeat=1)
+        report("compile", seconds)
+
+    rng = np.random.default_rng(0)
+    durations = rng.integers(45, 1500, BATCH)
+    airlines = rng.choice(AIRLINES, BATCH).tolist()
+
+    results = {}
+    for use_surface in (False, True):
+        ml_engine.USE_PRICE_SURFACE = use_surface
+        label = "surface" if use_surface else "forest"
+        ml_engine.predict_prices_batch(durations[:1], 0, airlines[:1]) # warm the registry
+        single, single_s, _ = timeit(single_calls, durations[:SINGLE_CALLS], airlines[:SINGLE_CALLS], repeat=3)
+        batch, batch_s, _ = timeit(ml_engine.predict_prices_batch, durations, 0, airlines, repeat=3)
+        results[label] = (single, batch)
+        print(f"⏱️ {label}:")
+        print(f"   single predict_price call               {single_s / SINGLE_CALLS * 1e6:>10.1f} us")
+        report(f"{BATCH:,}-leg predict_prices_batch", batch_s)
+
+    if results["forest"][0] != results["surface"][0] or not np.array_equal(*(r[1] for r in results.values())):
+        print("❌ Surface prices differ from the live model")
+        sys.exit(1)
+    print("✅ Surface and forest prices match.")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,143 @@
+# benchmarks/bench_reachability.py
+"""
+Reachability index: building it, "no route" answers between disconnected
+airports with and without it, and isochrone queries (within N stops, within
+X km, both) versus one bounded search per query. Every answer is checked
+against scipy/networkx searches.
+
+Run from the repository root:
+    python -m benchmarks.bench_reachability
+"""
+import random
+import sys
+
+import networkx as nx
+import numpy as np
+from scipy.sparse.csgraph import dijkstra
+
+from src.logic import build_graph, find_shortest_path
+from src.network import FlightNetwork
+from src.reachability import ReachabilityIndex, reachability_index
+from src.route_updates import LiveNetwork
+from benchmarks._common import load_tables, report, timeit
+
+SAMPLE_SOURCES = 200
+NO_ROUTE_QUERIES = 50
+ISOCHRONES = [(2, None), (None, 8000.0), (2, 8000.0)] # (max_stops, max_km)
+
+
+def nx_isochrone(G, src, max_stops, max_km):
+    """The same question answered with networkx searches."""
+    if max_stops is None:
+        return set(nx.single_source_dijkstra_path_length(G, src, cutoff=max_km, weight="weight")) - {src}
+    hops = nx.single_source_shortest_path_length(G, src, cutoff=max_stops + 1)
+    if max_km is None:
+        return set(hops) - {src}
+    # Distance within the stop limit: Bellman-Ford rounds over the hop-limited ball
+    dist = {src: 0.0}
+    for _ in range(max_stops + 1):
+        relaxed = dict(dist)
+        for u, d in dist.items():
+            for v, attrs in G[u].items():
+                if d + attrs["weight"] < relaxed.get(v, np.inf):
+                    relaxed[v] = d + attrs["weight"]
+        dist = relaxed
+    return {v for v, d in dist.items() if d <= max_km} - {src}
+
+
+def main():
+    print("📦 Loading OpenFlights data...")
+    airports, airlines, routes = load_tables()
+    G = build_graph(routes, airports, airlines)
+    net = FlightNetwork.from_graph(G)
+    rng = random.Random(23)
+
+    print("🏗️ Building the index:")
+    index, build_s, _ = timeit(ReachabilityIndex.build, net, repeat=3)
+    report("ReachabilityIndex.build", build_s)
+    print(f"   {index.component.max() + 1} components, {index.max_stops + 1} stop levels, "
+          f"{index.levels.nbytes / 1e6:.1f} MB of bitsets")
+
+    failed = False
+    sizes = np.bincount(index.component)
+    if sorted(sizes.tolist()) != sorted(len(c) for c in nx.connected_components(G)):
+        print("❌ Component ids differ from networkx")
+        failed = True
+    sample = rng.sample(range(len(net)), SAMPLE_SOURCES)
+    hops = dijkstra(net.matrix(), indices=sample, unweighted=True)
+    for stops in range(index.max_stops + 1):
+        bits = np.unpackbits(index.levels[stops, sample], axis=1, count=len(net)).astype(bool)
+        if not np.array_equal(bits, hops <= stops + 1):
+            print(f"❌ Bitsets for {stops} stops differ from scipy hop counts")
+            failed = True
+
+    # Pairs in different components: the index answers without searching
+    big = np.argmax(sizes)
+    outside = net.codes[index.component != big].tolist()
+    inside = net.codes[index.component == big].tolist()
+    pairs = [(rng.choice(inside), rng.choice(outside)) for _ in range(NO_ROUTE_QUERIES)]
+    H = G.copy()
+    H.graph.pop("reachability", None)
+    reachability_index(G)
+
+    def no_route(graph):
+        return [find_shortest_path(graph, s, t) for s, t in pairs]
+    print(f"🚫 {NO_ROUTE_QUERIES} queries with no route (main component -> outlying airports):")
+    plain, plain_s, _ = timeit(no_route, H, repeat=3)
+    indexed, indexed_s, _ = timeit(no_route, G, repeat=3)
+    report("find_shortest_path (search)", plain_s)
+    report("find_shortest_path (index)", indexed_s)
+    print(f"   {plain_s / indexed_s:,.0f}x faster")
+    if plain != indexed or any(path is not None for path, _ in indexed):
+        print("❌ The index changed a no-route answer")
+        failed = True
+
+    reachability_index(net)
+    net_pairs = no_route(net)
+    if net_pairs != indexed:
+        print("❌ FlightNetwork no-route answers differ")
+        failed = True
+
+    sources = rng.sample(inside, 20) + ["BOM"]
+    for max_stops, max_km in ISOCHRONES:
+        label = " & ".join(filter(None, [f"{max_stops} stops" if max_stops is not None else "",
+                                         f"{max_km:,.0f} km" if max_km is not None else ""]))
+        print(f"🗺️ Isochrones within {label} ({len(sources)} origins):")
+        _, index_s, _ = timeit(lambda: [index.reachable(s, max_stops, max_km) for s in sources], repeat=3)
+        expected, search_s, _ = timeit(lambda: [nx_isochrone(G, s, max_stops, max_km) for s in sources], repeat=1)
+        report("ReachabilityIndex.reachable", index_s / len(sources))
+        report("networkx searches", search_s / len(sources))
+        for s, want in zip(sources, expected):
+            got = index.reachable(s, max_stops, max_km)
+            if set(got["codes"].tolist()) != want or np.any(np.diff(got["km"]) < 0):
+                print(f"❌ Isochrone from {s} differs from networkx")
+                failed = True
+                break
+            if max_stops is not None and np.any(got["stops"] > max_stops):
+                print(f"❌ Isochrone from {s} reports more than {max_stops} stops")
+                failed = True
+                break
+    bom = index.reachable("BOM", 2, 8000.0)
+    print(f"   from BOM within 2 stops & 8,000 km: {len(bom['codes'])} airports")
+
+    # A structural route delta drops the stale index; the next one matches a fresh build
+    live = LiveNetwork(routes, airports, airlines)
+    reachability_index(live.G)
+    pair = next(iter(live.pair_routes))
+    result = live.apply([("remove", *r) for r in list(live.pair_routes[pair])])
+    if result["edges_removed"] and "reachability" in live.G.graph:
+        print("❌ A stale index survived a route delta")
+        failed = True
+    refreshed = reachability_index(live.G)
+    fresh = ReachabilityIndex.build(FlightNetwork.from_graph(live.G))
+    if not np.array_equal(refreshed.levels, fresh.levels):
+        print("❌ The refreshed index differs from a fresh build")
+        failed = True
+
+    if failed:
+        sys.exit(1)
+    print("✅ Index answers match scipy and networkx searches.")
+
+
+if __name__ == "__main__":
+    main()
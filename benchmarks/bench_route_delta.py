@@ -0,0 +1,205 @@
+# benchmarks/bench_route_delta.py
+"""
+Route deltas: applying a 100-route add/remove delta to a `LiveNetwork` versus
+rebuilding the graph from the updated route table, plus how many memoized
+shortest paths the edge-scoped invalidation keeps and how often the same
+queries are then served from the cache.
+
+Run from the repository root:
+    python -m benchmarks.bench_route_delta
+"""
+import math
+import os
+import random
+import sys
+import tempfile
+import threading
+import time
+
+import numpy as np
+import pandas as pd
+
+from src.distance_oracle import DistanceOracle
+from src.logic import build_graph, find_shortest_path, node_coords
+from src.route_updates import LiveNetwork, read_delta
+from benchmarks._common import load_tables, report
+
+DELTA_ROUTES = 100
+CACHED_QUERIES = 300
+
+
+def make_delta(live, rng, n):
+    """n rows: half removals of existing routes, half new routes between known airports."""
+    existing = [r for routes in live.pair_routes.values() for r in routes]
+    airports = list(live.G)
+    carriers = sorted(live.airline_pairs)
+    rows = [("remove", *r) for r in rng.sample(existing, n // 2)]
+    rows += [("add", rng.choice(carriers), *rng.sample(airports, 2)) for _ in range(n - n // 2)]
+    rng.shuffle(rows)
+    return rows
+
+
+def reference_routes(routes, delta):
+    """The route table with the delta applied row by row (removals take the last occurrence)."""
+    rows = list(zip(routes["Airline"].astype(str), routes["SourceAirport"].astype(str), routes["DestAirport"].astype(str)))
+    for op, airline, src, dest in delta:
+        if op == "add":
+            rows.append((airline, src, dest))
+        elif src is None:
+            rows = [r for r in rows if r[0] != airline]
+        else:
+            for i in range(len(rows) - 1, -1, -1):
+                if rows[i] == (airline, src, dest):
+                    del rows[i]
+                    break
+    return pd.DataFrame(rows, columns=["Airline", "SourceAirport", "DestAirport"])
+
+
+def same_graph(G, H):
+    if set(G.nodes) != set(H.nodes) or G.number_of_edges() != H.number_of_edges():
+        return False
+    for u, v, d in H.edges(data=True):
+        if not G.has_edge(u, v):
+            return False
+        e = G.edges[u, v]
+        if e["airline"] != d["airline"] or e["airlines"] != d["airlines"] or not math.isclose(e["weight"], d["weight"], rel_tol=1e-9):
+            return False
+    return all(G.nodes[n] == H.nodes[n] for n in H)
+
+
+def main():
+    print("📦 Loading OpenFlights data...")
+    airports, airlines, routes = load_tables()
+    live = LiveNetwork(routes, airports, airlines)
+    rng = random.Random(22)
+
+    # Warm the path cache, including routes inside small outlying components
+    nodes = list(live.G)
+    queries = [tuple(rng.sample(nodes, 2)) for _ in range(CACHED_QUERIES)]
+    small = [c for c, members in live.members.items() if 2 < len(members) < 50]
+    for c in small[:10]:
+        members = sorted(live.members[c])
+        queries.append((members[0], members[-1]))
+    for s, t in queries:
+        live.shortest_path(s, t)
+
+    delta = make_delta(live, rng, DELTA_ROUTES)
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "delta.csv")
+        with open(path, "w") as f:
+            f.write("op,airline,source,dest\n")
+            f.writelines(f"{op},{a},{s or ''},{d or ''}\n" for op, a, s, d in delta)
+        assert read_delta(path) == delta
+
+        cached_before = len(live.paths)
+        before = dict(live.paths.items())
+        result = live.apply(path)
+    expected_routes = reference_routes(routes, delta)
+    start = time.perf_counter()
+    rebuilt = build_graph(expected_routes, airports, airlines)
+    rebuild_s = time.perf_counter() - start
+
+    print(f"🔁 {DELTA_ROUTES}-route delta ({result['routes_added']} added, {result['routes_removed']} removed):")
+    report("LiveNetwork.apply", result["seconds"])
+    report("build_graph (full rebuild)", rebuild_s)
+    print(f"   apply costs {result['seconds'] / rebuild_s:.1%} of a rebuild; "
+          f"{result['edges_added']} edges added, {result['edges_removed']} removed, {result['edges_changed']} changed")
+    print(f"   version {result['version']}, {len(result['components_affected'])} component ids affected, "
+          f"{result['paths_invalidated']}/{cached_before} cached paths invalidated")
+    kept = dict(live.paths.items())
+    changed = sum(not math.isclose(find_shortest_path(live.G, s, t, strategy=st, airlines=a)[1], km, rel_tol=1e-9)
+                  for (s, t, st, a), (_, km) in before.items() if (s, t, st, a) not in kept)
+    print(f"   {changed} of the invalidated paths actually changed")
+    hits, misses = live.paths.hits, live.paths.misses
+    for s, t in queries:
+        live.shortest_path(s, t)
+    hits, misses = live.paths.hits - hits, live.paths.misses - misses
+    print(f"   re-running the {len(queries)} queries: {hits / (hits + misses):.0%} served from the cache")
+
+    failed = not same_graph(live.G, rebuilt)
+    if failed:
+        print("❌ The updated network differs from a full rebuild")
+
+    # Removing a small carrier only touches its own components
+    carrier = min((a for a, pairs in live.airline_pairs.items() if pairs and all(
+        live.component[u] in small and live.component[v] in small for u, v in pairs)), default=None,
+        key=lambda a: len(live.airline_pairs[a]))
+    if carrier is not None:
+        for s, t in queries:
+            live.shortest_path(s, t)
+        cached_before = len(live.paths)
+        result = live.apply([("remove", carrier, None, None)])
+        print(f"✂️ Removing carrier {carrier} ({result['routes_removed']} routes): "
+              f"{result['paths_invalidated']}/{cached_before} cached paths invalidated")
+        report("LiveNetwork.apply", result["seconds"])
+        expected_routes = reference_routes(expected_routes, [("remove", carrier, None, None)])
+        failed |= not same_graph(live.G, build_graph(expected_routes, airports, airlines))
+
+    # One airport leaves and another joins, so the airport count stays the same: the
+    # A* coordinates must still follow, and the ALT bounds of the old network must go
+    live.G.graph["oracle"] = DistanceOracle.build(live.G)
+    leaf = min(n for n in live.G if live.G.degree(n) == 1 and n != "LHR")
+    newcomer = "AKI" if "AKI" not in live.G else min(set(live.airport_attrs) - set(live.G))
+    swap = [("remove", *r) for pair in live.G.edges(leaf) for r in live.pair_routes[tuple(sorted(pair))]]
+    swap.append(("add", "BA", "LHR", newcomer))
+    result = live.apply(swap)
+    print(f"🔀 Swapping airport {leaf} for {newcomer}: "
+          f"{result['airports_removed']} removed, {result['airports_added']} added")
+    expected_routes = reference_routes(expected_routes, swap)
+    failed |= not same_graph(live.G, build_graph(expected_routes, airports, airlines))
+    position, lat, lon = live.G.graph["coords"]
+    fresh_position, fresh_lat, fresh_lon = node_coords(live.G)
+    if position != fresh_position or not (np.array_equal(lat, fresh_lat) and np.array_equal(lon, fresh_lon)):
+        print("❌ The A* coordinates are stale after the airport swap")
+        failed = True
+    if "oracle" in live.G.graph:
+        print("❌ A stale distance oracle survived a route delta")
+        failed = True
+    _, want = find_shortest_path(live.G, "JFK", newcomer)
+    for strategy in ("astar", "alt"):
+        _, got = find_shortest_path(live.G, "JFK", newcomer, strategy=strategy)
+        if not math.isclose(got, want, rel_tol=1e-9):
+            print(f"❌ {strategy} to {newcomer} differs from Dijkstra after the airport swap")
+            failed = True
+
+    # Queries running while deltas are applied neither fail nor cache a route a delta made stale
+    errors = []
+    stop = threading.Event()
+
+    def query_loop():
+        while not stop.is_set():
+            for s, t in queries:
+                try:
+                    live.shortest_path(s, t)
+                except Exception as e:
+                    errors.append(e)
+                    return
+    interval = sys.getswitchinterval()
+    sys.setswitchinterval(1e-6) # switch threads often, so queries interleave with the updates
+    worker = threading.Thread(target=query_loop)
+    worker.start()
+    for _ in range(20):
+        live.apply(make_delta(live, rng, 20))
+    stop.set()
+    worker.join()
+    sys.setswitchinterval(interval)
+    if errors:
+        print(f"❌ A query failed during a route delta: {errors[0]!r}")
+        failed = True
+
+    # Every path still cached must match a fresh search on the updated network
+    stale = 0
+    for (src, dest, strategy, airlines), (_, dist) in live.paths.items():
+        _, fresh = find_shortest_path(live.G, src, dest, strategy=strategy, airlines=airlines)
+        if not math.isclose(dist, fresh, rel_tol=1e-9, abs_tol=1e-9):
+            stale += 1
+    if stale:
+        print(f"❌ {stale} cached paths are stale")
+        failed = True
+    if failed:
+        sys.exit(1)
+    print("✅ Incremental updates match a full rebuild and no stale path survives.")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,92 @@
+# benchmarks/bench_route_map.py
+"""
+Route map rendering: great-circle arcs for many legs in one vectorized pass
+versus one leg at a time, and a big overlay (every option of many searches
+plus an isochrone) drawn as separate folium objects versus single GeoJSON
+layers, timing map build + HTML render and comparing page size.
+
+Run from the repository root:
+    python -m benchmarks.bench_route_map
+"""
+import random
+import sys
+import warnings
+
+import folium
+import numpy as np
+
+from src.logic import build_graph, find_k_shortest_paths, haversine_np
+from src.reachability import reachability_index
+from src.route_map import ARC_POINTS, great_circle_arcs, isochrone_layer, overlay_map, routes_layer
+from benchmarks._common import load_tables, report, timeit
+
+SEARCHES = 300
+ISOCHRONE = ("BOM", 2)
+
+
+def per_object_map(center, routes, reach):
+    """The overlay drawn the way the itinerary map used to be: one folium object per leg and airport."""
+    m = folium.Map(location=center, zoom_start=2, tiles="CartoDB dark_matter")
+    for path, _ in routes:
+        for leg in path:
+            folium.PolyLine([leg["coords_u"], leg["coords_v"]], color="#00C9FF", weight=3, opacity=0.7).add_to(m)
+    for lat, lon in zip(reach["lat"], reach["lon"]):
+        folium.CircleMarker([lat, lon], radius=3, color="#92FE9D", fill=True).add_to(m)
+    return m
+
+
+def main():
+    warnings.filterwarnings("ignore", message="CartoDB tiles") # no tiles are fetched here
+    print("📦 Loading OpenFlights data...")
+    airports, airlines, routes_table = load_tables()
+    G = build_graph(routes_table, airports, airlines)
+    rng = random.Random(24)
+    nodes = list(G)
+    routes = []
+    for _ in range(SEARCHES):
+        routes += find_k_shortest_paths(G, *rng.sample(nodes, 2), k=3, detour_ratio=1.5)
+    legs = [leg for path, _ in routes for leg in path]
+    u = np.array([leg["coords_u"] for leg in legs])
+    v = np.array([leg["coords_v"] for leg in legs])
+
+    print(f"🌐 Great-circle arcs for {len(legs):,} legs ({ARC_POINTS} points each):")
+    arcs, vector_s, _ = timeit(great_circle_arcs, u[:, 0], u[:, 1], v[:, 0], v[:, 1])
+    _, loop_s, _ = timeit(lambda: [great_circle_arcs(*a, *b) for a, b in zip(u, v)], repeat=1)
+    report("one pass", vector_s)
+    report("one leg at a time", loop_s)
+
+    failed = False
+    # Endpoints are the airports (longitudes modulo a full turn) and the arc length is the great-circle distance
+    ends = np.concatenate([arcs[:, 0], arcs[:, -1]])
+    expected = np.concatenate([u, v])
+    if not (np.allclose(ends[:, 0], expected[:, 0], atol=1e-6)
+            and np.allclose((ends[:, 1] - expected[:, 1] + 180) % 360 - 180, 0, atol=1e-6)):
+        print("❌ Arcs don't start and end at the airports")
+        failed = True
+    lengths = haversine_np(arcs[:, :-1, 1], arcs[:, :-1, 0], arcs[:, 1:, 1], arcs[:, 1:, 0]).sum(axis=1)
+    if not np.allclose(lengths, haversine_np(u[:, 1], u[:, 0], v[:, 1], v[:, 0]), rtol=1e-6, atol=1e-6):
+        print("❌ Arc lengths differ from the great-circle distances")
+        failed = True
+    if np.abs(np.diff(arcs[:, :, 1], axis=1)).max() > 180:
+        print("❌ An arc jumps across the antimeridian")
+        failed = True
+
+    reach = reachability_index(G).reachable(*ISOCHRONE)
+    center = list(legs[0]["coords_u"])
+    print(f"🗺️ Overlay: {len(routes):,} itineraries, {len(legs):,} legs, "
+          f"{len(reach['codes']):,} airports within {ISOCHRONE[1]} stops of {ISOCHRONE[0]}:")
+    html_objects, objects_s, _ = timeit(lambda: per_object_map(center, routes, reach).get_root().render(), repeat=1)
+    html_geojson, geojson_s, _ = timeit(
+        lambda: overlay_map(center, [routes_layer(routes), isochrone_layer(reach)]).get_root().render(), repeat=3)
+    report("separate folium objects", objects_s)
+    report("GeoJSON layers (great-circle arcs)", geojson_s)
+    print(f"   page size {len(html_objects) / 1e6:.1f} MB -> {len(html_geojson) / 1e6:.1f} MB, "
+          f"{objects_s / geojson_s:.0f}x faster")
+
+    if failed:
+        sys.exit(1)
+    print("✅ Arcs follow the great circles.")
+
+
+if __name__ == "__main__":
+    main()
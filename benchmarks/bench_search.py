@@ -0,0 +1,66 @@
+# benchmarks/bench_search.py
+"""
+Expanded nodes and latency per search strategy on both network engines.
+
+Run from the repository root:
+    python -m benchmarks.bench_search
+"""
+import random
+import statistics
+import sys
+
+from src.logic import build_graph, find_shortest_path
+from src.network import FlightNetwork
+from src.search import SEARCH_STRATEGIES
+from benchmarks._common import load_tables, timeit, report
+
+SAMPLE_QUERIES = 200
+
+
+def profile(G, pairs, strategy):
+    """Returns (distances, median expanded nodes, seconds per query)."""
+    distances, expanded = [], []
+
+    def run():
+        distances.clear()
+        expanded.clear()
+        for src, dest in pairs:
+            stats = {}
+            _, dist = find_shortest_path(G, src, dest, strategy=strategy, stats=stats)
+            distances.append(dist)
+            expanded.append(stats["expanded"])
+
+    _, seconds, _ = timeit(run, repeat=3)
+    return list(distances), statistics.median(expanded), seconds / len(pairs)
+
+
+def main():
+    print("📦 Loading OpenFlights data...")
+    airports, airlines, routes = load_tables()
+    G = build_graph(routes, airports, airlines)
+    net = FlightNetwork.from_graph(G)
+
+    rng = random.Random(7)
+    nodes = list(G.nodes)
+    sampled = [tuple(rng.sample(nodes, 2)) for _ in range(SAMPLE_QUERIES)]
+
+    failed = False
+    for label, pairs in [("GKA -> JFK", [("GKA", "JFK")]), (f"{SAMPLE_QUERIES} random pairs", sampled)]:
+        for engine, graph in [("networkx", G), ("CSR", net)]:
+            print(f"🔎 {label} on {engine} (median expanded nodes, time per query):")
+            reference = None
+            for strategy in SEARCH_STRATEGIES:
+                distances, expanded, seconds = profile(graph, pairs, strategy)
+                report(f"{strategy:<14} {expanded:>8.0f} nodes", seconds)
+                if reference is None:
+                    reference = distances
+                elif any(abs(a - b) > 1e-6 for a, b in zip(reference, distances)):
+                    print(f"❌ {strategy} disagrees with dijkstra on route distances")
+                    failed = True
+    if failed:
+        sys.exit(1)
+    print("✅ All strategies return the same route distances.")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,67 @@
+# benchmarks/bench_spatial_index.py
+"""
+Nearest-airport and radius queries: a haversine scan over every airport
+versus the ball-tree `AirportIndex`, per point and for batches of points.
+
+Run from the repository root:
+    python -m benchmarks.bench_spatial_index
+"""
+import sys
+
+import numpy as np
+
+from src.logic import haversine_np
+from src.spatial_index import AirportIndex
+from benchmarks._common import load_tables, timeit, report
+
+N_POINTS = 2000
+RADIUS_KM = 150
+
+
+def scan_nearest(lats, lons, table):
+    """One vectorized haversine pass over all airports per point."""
+    codes = table["IATA"].to_numpy()
+    lat, lon = table["Latitude"].to_numpy(), table["Longitude"].to_numpy()
+    return [codes[np.argmin(haversine_np(lon, lat, x, y))] for y, x in zip(lats, lons)]
+
+
+def scan_within(lats, lons, table, radius_km):
+    lat, lon = table["Latitude"].to_numpy(), table["Longitude"].to_numpy()
+    return [np.count_nonzero(haversine_np(lon, lat, x, y) <= radius_km) for y, x in zip(lats, lons)]
+
+
+def main():
+    print("📦 Loading OpenFlights data...")
+    airports, _, _ = load_tables()
+    index, build_s, _ = timeit(AirportIndex, airports, repeat=3)
+    report(f"AirportIndex build ({len(index.codes):,} airports)", build_s)
+
+    rng = np.random.default_rng(9)
+    lats, lons = rng.uniform(-60, 70, N_POINTS), rng.uniform(-180, 180, N_POINTS)
+
+    print(f"⏱️ Nearest airport, {N_POINTS:,} points:")
+    scanned, scan_s, _ = timeit(scan_nearest, lats, lons, index.airports, repeat=3)
+    report("haversine scan (per point)", scan_s)
+    (codes, _), tree_s, _ = timeit(index.nearest, lats, lons, repeat=3)
+    report("ball tree (one batch)", tree_s)
+    _, single_s, _ = timeit(lambda: [index.nearest(y, x) for y, x in zip(lats[:200], lons[:200])], repeat=3)
+    report("ball tree (one call per point)", single_s * N_POINTS / 200)
+
+    print(f"⏱️ Airports within {RADIUS_KM} km, {N_POINTS:,} points:")
+    counts, scan_s, _ = timeit(scan_within, lats, lons, index.airports, RADIUS_KM, repeat=3)
+    report("haversine scan (per point)", scan_s)
+    found, tree_s, _ = timeit(index.within, lats, lons, RADIUS_KM, repeat=3)
+    report("ball tree (one batch)", tree_s)
+
+    print("🏙️ Metro areas:", {code: len(index.metro_airports(code)) for code in ("LHR", "JFK", "NRT", "CDG")})
+
+    mismatched = sum(a != b for a, b in zip(scanned, codes[:, 0]))
+    mismatched += sum(a != len(b) for a, (b, _) in zip(counts, found))
+    if mismatched:
+        print(f"❌ {mismatched} queries disagree with the haversine scan")
+        sys.exit(1)
+    print("✅ Ball-tree results match the haversine scan.")
+
+
+if __name__ == "__main__":
+    main()
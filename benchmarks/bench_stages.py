@@ -0,0 +1,136 @@
+# benchmarks/bench_stages.py
+"""
+Stage benchmark suite: runs every instrumented hot path on the bundled data
+with metrics on (src/metrics.py) and compares each stage's mean latency with
+the stored baseline in benchmarks/baseline.json. Fails when a stage is slower
+than baseline * (1 + TOLERANCE) + SLACK_SECONDS.
+
+Run from the repository root:
+    python -m benchmarks.bench_stages                     # check against the baseline
+    python -m benchmarks.bench_stages --update-baseline   # record this machine's timings
+    python -m benchmarks.bench_stages --export metrics.prom   # also write the metrics (.prom or .json)
+"""
+import argparse
+import json
+import os
+import random
+import sys
+
+import numpy as np
+
+from src import ai_chat
+from src.logic import build_graph, find_k_shortest_paths, find_shortest_path
+from src.metrics import METRICS
+from src.ml_engine import MODEL_REGISTRY, predict_delays_batch, predict_prices_batch
+from src.network import FlightNetwork
+from src.response_cache import ResponseCache
+from src.tables import load_tables
+from benchmarks._fake_llm import StubClient
+
+BASELINE_PATH = "benchmarks/baseline.json"
+TOLERANCE = 0.5 # timings on shared machines are noisy
+SLACK_SECONDS = 0.0005 # absolute allowance, so sub-millisecond stages don't flap
+ROUTE_QUERIES = 50
+
+
+def run_stages():
+    """Runs each stage and returns {label: mean seconds}, read back from METRICS."""
+    results = {}
+
+    def measure(label, stage, fn, repeat):
+        before = METRICS.snapshot()
+        for _ in range(repeat):
+            fn()
+        after = METRICS.snapshot()
+        prev = before["stages"].get(stage, {"count": 0, "sum": 0.0})
+        count = after["stages"][stage]["count"] - prev["count"]
+        results[label] = (after["stages"][stage]["sum"] - prev["sum"]) / count
+        counters = {k: v - before["counters"].get(k, 0) for k, v in after["counters"].items()}
+        extra = "".join(f", {k}={v:,}" for k, v in counters.items() if v)
+        print(f"   {label:<34} {results[label] * 1000:>10.2f} ms  (n={count}{extra})")
+
+    print("⏱️ Stages (mean latency):")
+    measure("parse_tables", "parse_tables", lambda: load_tables(use_cache=False), 3)
+    measure("load_tables (cached)", "load_tables", load_tables, 5)
+    airports, airlines, routes = load_tables()
+    measure("build_graph", "build_graph", lambda: build_graph(routes, airports, airlines), 3)
+
+    G = build_graph(routes, airports, airlines)
+    net = FlightNetwork.from_graph(G)
+    rng = random.Random(5)
+    pairs = [tuple(rng.sample(list(G.nodes), 2)) for _ in range(ROUTE_QUERIES)]
+
+    def route_all(graph, strategy):
+        return lambda: [find_shortest_path(graph, s, t, strategy=strategy) for s, t in pairs]
+    measure("find_shortest_path (networkx)", "find_shortest_path", route_all(G, "dijkstra"), 1)
+    measure("find_shortest_path (CSR)", "find_shortest_path", route_all(net, "dijkstra"), 1)
+    measure("find_shortest_path (CSR, A*)", "find_shortest_path", route_all(net, "astar"), 1)
+    measure("find_k_shortest_paths (CSR, k=3)", "find_k_shortest_paths",
+            lambda: [find_k_shortest_paths(net, s, t, k=3, max_stops=2) for s, t in pairs[:20]], 1)
+
+    def cold_models():
+        MODEL_REGISTRY.clear()
+        predict_prices_batch([120], [0], ["IndiGo"])
+        predict_delays_batch([1000], ["rain"], ["IndiGo"])
+    measure("model_load", "model_load", cold_models, 3)
+
+    legs = 100
+    durations = rng.choices(range(45, 900), k=legs)
+    names = rng.choices(["IndiGo", "Air India", "SpiceJet", "Vistara"], k=legs)
+    measure(f"predict_prices ({legs} legs)", "predict_prices",
+            lambda: predict_prices_batch(durations, 0, names), 20)
+    measure(f"predict_delays ({legs} legs)", "predict_delays",
+            lambda: predict_delays_batch(np.array(durations) * 12.0, "rain", names), 20)
+
+    measure("get_travel_advice (offline)", "get_travel_advice",
+            lambda: ai_chat.get_travel_advice("London", "What should I eat?"), 50)
+    ai_chat.set_client_factory(lambda api_key: StubClient(api_key, latency=0))
+    ai_chat.ADVICE_CACHE = ResponseCache(ttl=3600, max_entries=64)
+    ai_chat.get_travel_advice("Paris", "What should I pack?", api_key="stub")
+    measure("get_travel_advice (cached)", "get_travel_advice",
+            lambda: ai_chat.get_travel_advice("Paris", "What should I pack?", api_key="stub"), 50)
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--update-baseline", action="store_true")
+    parser.add_argument("--export", help="write the final metrics to this .prom or .json file")
+    args = parser.parse_args()
+
+    METRICS.enable()
+    results = run_stages()
+
+    if args.export:
+        with open(args.export, "w") as f:
+            f.write(METRICS.to_json() if args.export.endswith(".json") else METRICS.to_prometheus())
+        print(f"📝 Metrics written to {args.export}")
+
+    if args.update_baseline or not os.path.exists(BASELINE_PATH):
+        with open(BASELINE_PATH, "w") as f:
+            json.dump({stage: round(seconds, 6) for stage, seconds in results.items()}, f, indent=2)
+            f.write("\n")
+        print(f"📌 Baseline saved to {BASELINE_PATH}")
+        return
+
+    with open(BASELINE_PATH) as f:
+        baseline = json.load(f)
+    print(f"📊 Against {BASELINE_PATH} (allowed: +{TOLERANCE:.0%} + {SLACK_SECONDS * 1000:.1f} ms):")
+    regressions = []
+    for stage, seconds in results.items():
+        if stage not in baseline:
+            print(f"   {stage:<34} {'(new stage)':>10}")
+            continue
+        ratio = seconds / baseline[stage] if baseline[stage] else float("inf")
+        regressed = seconds > baseline[stage] * (1 + TOLERANCE) + SLACK_SECONDS
+        print(f"   {stage:<34} {ratio:>9.2f}x {'❌' if regressed else ''}")
+        if regressed:
+            regressions.append(stage)
+    if regressions:
+        print(f"❌ Regressed: {', '.join(regressions)}")
+        sys.exit(1)
+    print("✅ No stage regressed past the baseline.")
+
+
+if __name__ == "__main__":
+    main()
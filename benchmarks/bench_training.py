@@ -0,0 +1,54 @@
+# benchmarks/bench_training.py
+"""
+Price-model training on one core versus every core, a warm-start update
+versus a full refit, and artifact size / load time per save format.
+Models are written to a temporary directory; models/ is not touched.
+
+Run from the repository root:
+    python -m benchmarks.bench_training
+"""
+import os
+import tempfile
+import time
+
+import joblib
+import numpy as np
+from sklearn.ensemble import RandomForestRegressor
+
+from src.ml_engine import (FEATURE_COLUMNS, PRICE_TREES, PRICE_TREES_PER_UPDATE, _fit_forest,
+                           load_features)
+from benchmarks._common import report
+
+
+def main():
+    df = load_features()
+    X, y = df[FEATURE_COLUMNS].to_numpy(), df["Price"].to_numpy()
+    print(f"🧠 Price model, {len(X):,} rows, {PRICE_TREES} trees, {os.cpu_count()} CPU(s):")
+
+    for n_jobs in (1, -1):
+        reg = RandomForestRegressor(n_estimators=PRICE_TREES, random_state=42)
+        report(f"full fit (n_jobs={n_jobs})", _fit_forest(reg, X, y, n_jobs))
+
+    grown = joblib.load(joblib.dump(reg, os.path.join(tempfile.mkdtemp(), "copy.pkl"))[0])
+    grown.set_params(warm_start=True, n_estimators=PRICE_TREES + PRICE_TREES_PER_UPDATE)
+    report(f"warm start (+{PRICE_TREES_PER_UPDATE} trees)", _fit_forest(grown, X, y, -1))
+
+    print("💾 Artifact formats:")
+    directory = tempfile.mkdtemp()
+    sample = X[:1000]
+    expected = reg.predict(sample)
+    for label, compress in [("uncompressed", 0), ("zlib level 3", 3), ("zlib level 9", 9)]:
+        path = os.path.join(directory, f"price_{compress}.pkl")
+        joblib.dump(reg, path, compress=compress)
+        timings = []
+        for _ in range(5):
+            start = time.perf_counter()
+            loaded = joblib.load(path)
+            timings.append(time.perf_counter() - start)
+        assert np.array_equal(loaded.predict(sample), expected)
+        report(f"load, {label} ({os.path.getsize(path) / 1e6:.1f} MB)", min(timings))
+    print("✅ Every format predicts identically.")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,138 @@
+# benchmarks/load_test_service.py
+"""
+Load test for the headless routing service (src/service.py): concurrent
+keep-alive clients send a mix of route/price/delay/emissions requests and the
+p50/p99 latency per endpoint and overall requests per second are reported.
+
+By default the service runs inside this process (clients and server then share
+one interpreter). For numbers closer to production, start it separately and
+point the test at it:
+    python -m src.service serve --port 8000
+    python -m benchmarks.load_test_service --url http://127.0.0.1:8000
+
+Run from the repository root:
+    python -m benchmarks.load_test_service [--clients 8] [--requests 400]
+"""
+import argparse
+import http.client
+import json
+import random
+import sys
+import threading
+import time
+from urllib.parse import urlencode, urlsplit
+
+import numpy as np
+
+from src.service import RoutingService, make_server
+
+# Share of each endpoint in the request mix
+MIX = {"route": 0.55, "price": 0.2, "delay": 0.15, "emissions": 0.1}
+AIRLINE_NAMES = ["IndiGo", "Air India", "SpiceJet", "Vistara", "GO FIRST", "AirAsia"]
+
+
+def make_requests(codes, n, seed=7):
+    """A reproducible list of (endpoint, path) requests."""
+    rng = random.Random(seed)
+    endpoints, weights = zip(*MIX.items())
+    requests = []
+    for endpoint in rng.choices(endpoints, weights, k=n):
+        if endpoint == "route":
+            src, dest = rng.sample(codes, 2)
+            params = {"src": src, "dest": dest, "k": rng.choice([1, 1, 3])}
+        elif endpoint == "price":
+            params = {"duration": rng.randint(45, 900), "stops": rng.randint(0, 2), "airline": rng.choice(AIRLINE_NAMES)}
+        elif endpoint == "delay":
+            params = {"distance": rng.randint(200, 12000), "weather": rng.choice(["clear", "rain", "storm"]),
+                      "airline": rng.choice(AIRLINE_NAMES)}
+        else:
+            params = {"distance": rng.randint(200, 12000)}
+        requests.append((endpoint, f"/{endpoint}?{urlencode(params)}"))
+    return requests
+
+
+def client(host, port, requests, results):
+    """Sends `requests` one after another over one keep-alive connection."""
+    conn = http.client.HTTPConnection(host, port, timeout=60)
+    for endpoint, path in requests:
+        start = time.perf_counter()
+        try:
+            conn.request("GET", path)
+            response = conn.getresponse()
+            ok = response.status == 200 and json.loads(response.read()) is not None
+        except (OSError, http.client.HTTPException, ValueError):
+            conn.close()
+            conn = http.client.HTTPConnection(host, port, timeout=60)
+            ok = False
+        results.append((endpoint, time.perf_counter() - start, ok))
+    conn.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--url", help="running service to test (default: start one in this process)")
+    parser.add_argument("--clients", type=int, default=8)
+    parser.add_argument("--requests", type=int, default=400)
+    args = parser.parse_args()
+
+    server = None
+    if args.url:
+        url = urlsplit(args.url)
+        host, port = url.hostname, url.port or 80
+        conn = http.client.HTTPConnection(host, port, timeout=10)
+        conn.request("GET", "/health")
+        health = json.loads(conn.getresponse().read())
+        conn.close()
+        print(f"🎯 Testing {args.url} ({health['airports']:,} airports)")
+        codes = None
+    else:
+        print("🚀 Starting the service in-process...")
+        service = RoutingService()
+        server = make_server(service, port=0)
+        host, port = "127.0.0.1", server.server_port
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        print(f"   ready in {service.startup_seconds:.1f}s")
+        codes = service.network.codes.tolist()
+
+    if codes is None:
+        # Same bundled data as the service; only needed for the airport codes
+        from src.tables import load_tables
+        airports, _, routes = load_tables()
+        codes = sorted(set(routes["SourceAirport"]) & set(airports["IATA"].dropna()))
+
+    requests = make_requests(codes, args.requests)
+    # Warm-up: one of each endpoint, so lazy loads don't count
+    warm = []
+    client(host, port, [next(r for r in requests if r[0] == e) for e in MIX], warm)
+
+    results = []
+    threads = [threading.Thread(target=client, args=(host, port, requests[i::args.clients], results))
+               for i in range(args.clients)]
+    start = time.perf_counter()
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    elapsed = time.perf_counter() - start
+    if server is not None:
+        server.shutdown()
+        server.server_close()
+
+    print(f"📈 {len(results)} requests, {args.clients} concurrent clients:")
+    print(f"   {'endpoint':<12} {'count':>6} {'p50 ms':>10} {'p99 ms':>10}")
+    for endpoint in list(MIX) + ["all"]:
+        times = np.array([s for e, s, _ in results if endpoint in ("all", e)])
+        if len(times):
+            p50, p99 = np.percentile(times, [50, 99]) * 1000
+            print(f"   {endpoint:<12} {len(times):>6} {p50:>10.2f} {p99:>10.2f}")
+    print(f"   throughput: {len(results) / elapsed:,.0f} requests/s")
+
+    errors = sum(not ok for _, _, ok in results + warm)
+    if errors:
+        print(f"❌ {errors} requests failed")
+        sys.exit(1)
+    print("✅ Every request succeeded.")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,7 +1,36 @@
 # src/ai_chat.py
+import asyncio
 import os
+import queue
+import re
+import threading
+import time
+
 from groq import Groq
 
+from src.metrics import METRICS, timed
+from src.response_cache import ResponseCache
+
+MODEL = "llama-3.1-8b-instant"
+REQUEST_TIMEOUT = 30.0 # seconds; avoids "Request Timed Out" on slow answers
+
+# Identical (destination, question) pairs get the cached answer for a day
+ADVICE_CACHE_TTL = 24 * 3600
+ADVICE_CACHE_SIZE = 512
+ADVICE_CACHE_DIR = "data/.cache/advice" # None keeps the cache in memory only
+
+# Streaming: give up on the model if the first token or the whole answer takes longer
+FIRST_TOKEN_DEADLINE = 8.0 # seconds
+ANSWER_DEADLINE = 20.0 # seconds
+
+ADVICE_CACHE = ResponseCache(ttl=ADVICE_CACHE_TTL, max_entries=ADVICE_CACHE_SIZE, disk_dir=ADVICE_CACHE_DIR)
+
+# Builds the API client for a key; replaceable (e.g. by a stub in benchmarks)
+CLIENT_FACTORY = lambda api_key: Groq(api_key=api_key, timeout=REQUEST_TIMEOUT)
+
+_CLIENTS = {}
+_CLIENTS_LOCK = threading.Lock()
+
 # --- HARDCODED KNOWLEDGE BASE (For Offline Mode) ---
 OFFLINE_KNOWLEDGE = {
     "London": {
@@ -26,38 +55,68 @@ OFFLINE_KNOWLEDGE = {
     }
 }
 
-def get_travel_advice(destination, user_question, api_key=None):
+def get_client(api_key):
     """
-    Generates travel advice using Llama 3.1 via Groq.
-    Falls back to 'Smart Dictionary' if no API Key is provided.
+    One shared client per API key, so its HTTP connection pool is reused
+    across questions instead of reconnecting on every call.
     """
-    
-    # --- REAL AI MODE (With API Key) ---
-    if api_key:
-        try:
-            # --- FIX: Add a 30-second timeout to prevent "Request Timed Out" ---
-            client = Groq(api_key=api_key, timeout=30.0)
-            
-            system_prompt = f"""You are an expert local guide for {destination}. 
-            The user asks: "{user_question}"
-            Give specific, actionable advice (names of specific dishes, places, or items). 
-            Keep it under 50 words. Use emojis."""
-            
-            completion = client.chat.completions.create(
-                model="llama-3.1-8b-instant",
-                messages=[
-                    {"role": "system", "content": system_prompt},
-                    {"role": "user", "content": user_question}
-                ],
-                temperature=0.7,
-                max_tokens=150,
-            )
-            
-            return completion.choices[0].message.content
-        except Exception as e:
-            return f"⚠️ AI Error: {str(e)}"
+    with _CLIENTS_LOCK:
+        client = _CLIENTS.get(api_key)
+        if client is None:
+            client = _CLIENTS[api_key] = CLIENT_FACTORY(api_key)
+        return client
 
-    # --- OFFLINE MODE (Smart Fallback) ---
+
+def set_client_factory(factory):
+    """Replaces CLIENT_FACTORY and drops the clients built by the old one."""
+    global CLIENT_FACTORY
+    with _CLIENTS_LOCK:
+        CLIENT_FACTORY = factory
+        _CLIENTS.clear()
+
+
+def advice_key(destination, user_question):
+    """Cache key: case, spacing and trailing punctuation don't change the answer."""
+    def normalize(text):
+        return re.sub(r"\s+", " ", str(text)).strip().rstrip("?!. ").lower()
+    return (MODEL, normalize(destination), normalize(user_question))
+
+
+def quick_action_prompts(destination):
+    """The chat tab's one-click questions, by button label."""
+    return {
+        "🍽️ Food Guide": f"What is the best local food to eat in {destination}?",
+        "⚠️ Safety Tips": f"Is {destination} safe for tourists? Any warnings?",
+        "🎒 Packing List": f"What should I pack for a trip to {destination}?",
+        "🏛️ Must Visit": f"What are the top 3 hidden gems in {destination}?",
+    }
+
+
+def _messages(destination, user_question):
+    system_prompt = f"""You are an expert local guide for {destination}. 
+    The user asks: "{user_question}"
+    Give specific, actionable advice (names of specific dishes, places, or items). 
+    Keep it under 50 words. Use emojis."""
+    return [
+        {"role": "system", "content": system_prompt},
+        {"role": "user", "content": user_question}
+    ]
+
+
+@timed("llm_completion")
+def ask_llm(destination, user_question, api_key):
+    """One upstream completion; raises on API errors."""
+    completion = get_client(api_key).chat.completions.create(
+        model=MODEL,
+        messages=_messages(destination, user_question),
+        temperature=0.7,
+        max_tokens=150,
+    )
+    return completion.choices[0].message.content
+
+
+def offline_advice(destination, user_question):
+    """The OFFLINE_KNOWLEDGE answer for this city and question, or None."""
     city_name = destination.split(",")[0].strip() 
     
     found_city = None
@@ -74,5 +133,171 @@ def get_travel_advice(destination, user_question, api_key=None):
             return found_city["pack"]
         elif "visit" in q or "do" in q:
             return found_city["visit"]
+    return None
+
+
+@timed("get_travel_advice")
+def get_travel_advice(destination, user_question, api_key=None, use_cache=True):
+    """
+    Generates travel advice using Llama 3.1 via Groq.
+    Falls back to 'Smart Dictionary' if no API Key is provided.
+    Answers are cached in ADVICE_CACHE (errors are not), and concurrent
+    identical questions share one API call.
+    """
     
-    return f"🤖 **Offline Mode:** I don't have specific data for **{city_name}** yet. Please add a free Groq API Key to the sidebar to unlock full AI intelligence!"
\ No newline at end of file
+    # --- REAL AI MODE (With API Key) ---
+    if api_key:
+        try:
+            if not use_cache:
+                return ask_llm(destination, user_question, api_key)
+            return ADVICE_CACHE.get_or_compute(
+                advice_key(destination, user_question),
+                lambda: ask_llm(destination, user_question, api_key))
+        except Exception as e:
+            return f"⚠️ AI Error: {str(e)}"
+
+    # --- OFFLINE MODE (Smart Fallback) ---
+    answer = offline_advice(destination, user_question)
+    if answer:
+        return answer
+    city_name = destination.split(",")[0].strip()
+    return f"🤖 **Offline Mode:** I don't have specific data for **{city_name}** yet. Please add a free Groq API Key to the sidebar to unlock full AI intelligence!"
+
+
+# --- STREAMING ---
+_DONE = object()
+
+
+def _produce_stream(destination, user_question, api_key, out, cancel):
+    """Worker thread: pushes each text delta of a streamed completion onto `out`, then _DONE (or the exception)."""
+    try:
+        stream = get_client(api_key).chat.completions.create(
+            model=MODEL,
+            messages=_messages(destination, user_question),
+            temperature=0.7,
+            max_tokens=150,
+            stream=True,
+        )
+        try:
+            for chunk in stream:
+                if cancel.is_set():
+                    break
+                text = chunk.choices[0].delta.content if chunk.choices else None
+                if text:
+                    out.put(text)
+        finally:
+            stream.close()
+        out.put(_DONE)
+    except Exception as e:
+        out.put(e)
+
+
+def _fallback(destination, user_question):
+    """What a stream shows when the model gives no usable answer in time."""
+    return offline_advice(destination, user_question) or (
+        "⏱️ The AI guide is taking too long to answer. Please try again in a moment.")
+
+
+def stream_travel_advice(destination, user_question, api_key=None, first_token_deadline=FIRST_TOKEN_DEADLINE,
+                         deadline=ANSWER_DEADLINE, stats=None):
+    """
+    `get_travel_advice` as a generator of text chunks, yielded as the model
+    produces them (ready for `st.write_stream`). Cached answers come back as one
+    chunk, and completed, non-empty answers are added to ADVICE_CACHE. A
+    question already being streamed for another caller is not sent again:
+    this caller waits for that answer and gets it as one chunk.
+
+    If no token arrives within `first_token_deadline` seconds the offline answer
+    is used instead; an answer still running after `deadline` seconds is cut
+    off. `stats`, if given, receives the source ("cache", "coalesced", "llm",
+    "offline", "deadline" or "error"), time to first token, total time and
+    chunk count.
+    """
+    start = time.perf_counter()
+    stats = {} if stats is None else stats
+    stats.update(source="llm", ttft=None, seconds=None, chunks=0)
+
+    def emit(text, source=None):
+        if source:
+            stats["source"] = source
+        if stats["ttft"] is None:
+            stats["ttft"] = time.perf_counter() - start
+        stats["chunks"] += 1
+        return text
+
+    key = advice_key(destination, user_question)
+    cached, inflight, leader = ADVICE_CACHE.begin(key) if api_key else (None, None, False)
+    if cached is not None:
+        yield emit(cached, "cache")
+    elif not api_key:
+        yield emit(get_travel_advice(destination, user_question), "offline")
+    elif not leader:
+        # The same question is already streaming for another caller: wait for its answer
+        try:
+            answer = inflight.result(timeout=max(0.0, start + deadline - time.perf_counter()))
+        except Exception: # the leader hit its deadline, failed or was abandoned
+            answer = None
+        yield emit(answer or _fallback(destination, user_question), "coalesced" if answer else "deadline")
+    else:
+        out, cancel = queue.Queue(), threading.Event()
+        threading.Thread(target=_produce_stream, args=(destination, user_question, api_key, out, cancel),
+                         daemon=True).start()
+        parts, error = [], TimeoutError("the answer was cut off")
+        try:
+            while True:
+                limit = first_token_deadline if not parts else deadline
+                try:
+                    item = out.get(timeout=max(0.0, start + limit - time.perf_counter()))
+                except queue.Empty:
+                    cancel.set()
+                    yield emit(" …" if parts else _fallback(destination, user_question), "deadline")
+                    break
+                if item is _DONE:
+                    error = None
+                    if not parts: # an empty completion: answer offline, cache nothing
+                        yield emit(_fallback(destination, user_question), "offline")
+                    break
+                if isinstance(item, Exception):
+                    error = item
+                    yield emit(f"⚠️ AI Error: {str(item)}", "error")
+                    break
+                parts.append(item)
+                yield emit(item)
+        finally:
+            cancel.set() # also stops the worker if the caller abandons the stream
+            # Hands the answer (or the failure) to callers waiting on the same question
+            ADVICE_CACHE.finish(key, "".join(parts), error)
+    stats["seconds"] = time.perf_counter() - start
+    METRICS.observe("chat_stream", stats["seconds"])
+    if stats["ttft"] is not None:
+        METRICS.observe("chat_first_token", stats["ttft"])
+    METRICS.count(f"chat_answers_{stats['source']}")
+
+
+async def astream_travel_advice(destination, user_question, api_key=None, **kwargs):
+    """Async-generator version of `stream_travel_advice` (same arguments)."""
+    loop = asyncio.get_running_loop()
+    chunks = stream_travel_advice(destination, user_question, api_key, **kwargs)
+    try:
+        while (chunk := await loop.run_in_executor(None, next, chunks, _DONE)) is not _DONE:
+            yield chunk
+    finally:
+        try:
+            chunks.close()
+        except ValueError:
+            pass # cancelled while a chunk was pending in the executor; its deadline still ends the stream
+
+
+async def ask_quick_actions(destination, api_key=None, **kwargs):
+    """
+    Streams all quick-action questions at once; returns {label: (question,
+    answer, stats)} once every answer is complete or has hit its deadline.
+    """
+    async def collect(question):
+        stats = {}
+        parts = [chunk async for chunk in astream_travel_advice(destination, question, api_key, stats=stats, **kwargs)]
+        return question, "".join(parts), stats
+
+    prompts = quick_action_prompts(destination)
+    answers = await asyncio.gather(*(collect(q) for q in prompts.values()))
+    return dict(zip(prompts, answers))
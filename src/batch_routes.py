@@ -0,0 +1,112 @@
+# src/batch_routes.py
+"""
+Bulk origin/destination routing.
+
+Queries are grouped by origin so one single-source Dijkstra answers every
+destination of that origin, and several origins share one compiled call.
+Origin groups can be spread over a process pool: each worker receives the
+read-only network once, through the pool initializer (inherited without
+pickling when processes are forked), so tasks only carry airport ids.
+"""
+import os
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor
+from itertools import islice
+
+import numpy as np
+
+from src.network import FlightNetwork
+
+# Origins per compiled Dijkstra call / pool task
+ORIGINS_PER_TASK = 32
+
+# Set in each worker by _init_worker
+_WORKER_STATE = None
+
+
+def _as_network(G):
+    return G if isinstance(G, FlightNetwork) else FlightNetwork.from_graph(G)
+
+
+def group_by_origin(network, pairs):
+    """
+    Splits (src, dest) code pairs into {origin_id: [(src, dest, dest_id), ...]}
+    plus the pairs that can't be routed because an airport is not in the network.
+    """
+    groups = OrderedDict()
+    unknown = []
+    index = network.index
+    for src, dest in pairs:
+        if src in index and dest in index:
+            groups.setdefault(index[src], []).append((src, dest, index[dest]))
+        else:
+            unknown.append((src, dest))
+    return groups, unknown
+
+
+def route_origins(network, groups, mask=None, airlines=None):
+    """
+    Routes a list of (origin_id, [(src, dest, dest_id), ...]) groups with one
+    multi-source Dijkstra. Returns [(src, dest, legs, total_km), ...] with legs
+    in the `find_shortest_path` format, or (src, dest, None, 0) when unreachable.
+    """
+    dist, pred = network.shortest_path_tree([s for s, _ in groups], mask)
+    results = []
+    for row, (s, targets) in enumerate(groups):
+        for src, dest, t in targets:
+            if t == s or not np.isfinite(dist[row, t]): # same airport: no flight, as in find_shortest_path
+                results.append((src, dest, None, 0))
+                continue
+            node_path, edge_positions = network.tree_path(pred[row], s, t, mask)
+            legs, total_dist = network.path_details(node_path, edge_positions, airlines)
+            results.append((src, dest, legs, total_dist))
+    return results
+
+
+def _init_worker(network, airlines):
+    global _WORKER_STATE
+    mask = None if airlines is None else network.allowed_positions(airlines)
+    network.matrix() # cached on the network; built once per worker unless inherited
+    _WORKER_STATE = (network, mask, airlines)
+
+
+def _route_task(groups):
+    network, mask, airlines = _WORKER_STATE
+    return route_origins(network, groups, mask, airlines)
+
+
+def _chunks(items, size):
+    items = iter(items)
+    while chunk := list(islice(items, size)):
+        yield chunk
+
+
+def route_many(G, pairs, airlines=None, workers=None, origins_per_task=ORIGINS_PER_TASK):
+    """
+    Shortest routes for many (src, dest) airport-code pairs.
+
+    Yields (src, dest, legs, total_km) as origin groups finish; results come
+    grouped by origin rather than in input order, and pairs with an unknown
+    airport come last as (src, dest, None, 0). `G` is a FlightNetwork or a
+    `build_graph` networkx graph. `airlines` restricts every route to those
+    airline IATA codes. `workers`: None runs in this process, -1 uses every CPU.
+    """
+    network = _as_network(G)
+    if airlines is not None:
+        airlines = frozenset(airlines)
+    groups, unknown = group_by_origin(network, pairs)
+    tasks = _chunks(groups.items(), origins_per_task)
+
+    if workers == -1:
+        workers = os.cpu_count() or 1
+    if not workers or workers <= 1:
+        mask = None if airlines is None else network.allowed_positions(airlines)
+        for task in tasks:
+            yield from route_origins(network, task, mask, airlines)
+    else:
+        with ProcessPoolExecutor(workers, initializer=_init_worker, initargs=(network, airlines)) as pool:
+            for results in pool.map(_route_task, tasks):
+                yield from results
+
+    for src, dest in unknown:
+        yield src, dest, None, 0
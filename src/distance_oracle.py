@@ -0,0 +1,404 @@
+# src/distance_oracle.py
+"""
+Precomputed distance oracle for the full flight network.
+
+Two structures are built from the network (a FlightNetwork or the
+`build_graph` networkx graph):
+
+* Hub labels (pruned landmark labelling): every airport stores its distance to
+  a small set of hub airports, chosen so that every shortest path passes
+  through a hub shared by both endpoints' labels. The exact distance between
+  two airports is one label intersection, a few microseconds, with no search.
+* ALT landmark tables: exact distances from a few far-apart landmarks to every
+  airport. By the triangle inequality |d(L, t) - d(L, v)| <= d(v, t), which gives
+  A* a much tighter heuristic than the great-circle distance ("alt" strategy).
+
+When the route data changes, the labels are updated edge by edge instead of
+rebuilt:
+
+* A removed edge can only lengthen routes between airports on opposite sides
+  of it (those with a shortest path through it). Exact distances from the
+  smaller side correct the label entries that relied on the edge and restore a
+  shared hub for every pair across it.
+* An added edge can only shorten routes, so the pruned searches of the hubs in
+  its endpoints' labels are resumed across it (dynamic pruned landmark
+  labelling, Akiba et al. 2014).
+"""
+import heapq
+import os
+
+import numpy as np
+from scipy.sparse import csr_matrix
+from scipy.sparse.csgraph import connected_components, dijkstra
+
+from src.network import FlightNetwork
+
+ORACLE_PATH = "data/.cache/distance_oracle.npz"
+N_LANDMARKS = 16
+# Past this share of changed edges (or of airports affected by removals) a
+# full build is cheaper than an update
+UPDATE_LIMIT = 0.05
+TOLERANCE = 1e-6 # km; slack for float rounding when comparing path lengths
+
+INF = float("inf")
+
+
+def _as_network(G):
+    return G if isinstance(G, FlightNetwork) else FlightNetwork.from_graph(G)
+
+
+def network_edges(network):
+    """Every undirected edge once as (u, v, km) arrays with u < v, keeping the shortest of parallel edges."""
+    src = np.repeat(np.arange(len(network), dtype=np.int32), np.diff(network.offsets))
+    keep = src < network.targets
+    u, v, w = src[keep], network.targets[keep], network.distances[keep]
+    order = np.lexsort((w, v, u))
+    u, v, w = u[order], v[order], w[order]
+    first = np.ones(len(u), dtype=bool)
+    first[1:] = (u[1:] != u[:-1]) | (v[1:] != v[:-1])
+    return u[first], v[first], w[first]
+
+
+def _edge_matrix(n, u, v, w):
+    """Symmetric CSR adjacency for scipy's dijkstra from (u, v, km) edge arrays."""
+    return csr_matrix((np.concatenate([w, w]), (np.concatenate([u, v]), np.concatenate([v, u]))), shape=(n, n))
+
+
+def _edge_arrays(triples):
+    """(u, v, km) arrays from a list of (u, v, km) tuples."""
+    u, v, w = zip(*triples) if triples else ((), (), ())
+    return np.array(u, dtype=np.int64), np.array(v, dtype=np.int64), np.array(w, dtype=np.float64)
+
+
+def _flatten(labels):
+    """(offsets, hubs, dists) arrays holding every label back to back."""
+    counts = np.fromiter((len(l) for l in labels), dtype=np.int64, count=len(labels))
+    offsets = np.zeros(len(labels) + 1, dtype=np.int64)
+    np.cumsum(counts, out=offsets[1:])
+    hubs = np.fromiter((h for l in labels for h in l), dtype=np.int64, count=offsets[-1])
+    dists = np.fromiter((d for l in labels for d in l.values()), dtype=np.float64, count=offsets[-1])
+    return offsets, hubs, dists
+
+
+def _pruned_search(labels, neighbors, T, hub, start, d0):
+    """
+    Dijkstra for `hub` from `start` (at distance `d0` from it), adding (hub,
+    distance) to `labels[node]` only where the current labels can't already
+    prove that distance; covered nodes are not expanded. `T` is `labels[hub]`
+    as a dense lookup (INF elsewhere).
+    """
+    push, pop = heapq.heappush, heapq.heappop
+    dist = {start: d0}
+    settled = set()
+    heap = [(d0, start)]
+    while heap:
+        d, u = pop(heap)
+        if u in settled:
+            continue
+        settled.add(u)
+        label = labels[u]
+        if label and min(T[h] + x for h, x in label.items()) <= d:
+            continue # already covered by another hub
+        label[hub] = d
+        for v, w, _ in neighbors(u):
+            nd = d + w
+            if v not in settled and nd < dist.get(v, INF):
+                dist[v] = nd
+                push(heap, (nd, v))
+
+
+def _dense(T, hub, label):
+    """Loads `label` (of `hub`) into the dense lookup `T` and returns the ids to reset."""
+    for h, d in label.items():
+        T[h] = d
+    T[hub] = 0.0
+    return list(label) + [hub]
+
+
+def pruned_labels(network, order, labels):
+    """
+    Pruned Dijkstra from each hub in `order` (most important first), adding
+    (hub, distance) to `labels[node]` only where the labels built so far can't
+    already prove that distance.
+    """
+    T = [INF] * len(network) # the current hub's label as a dense lookup
+    for hub in order:
+        touched = _dense(T, hub, labels[hub])
+        _pruned_search(labels, network.neighbors, T, hub, hub, 0.0)
+        for h in touched:
+            T[h] = INF
+    return labels
+
+
+def remove_edges(labels, n, old, kept, removed):
+    """
+    Updates `labels` (a cover of the graph with `old` edges) after the
+    `removed` edges are deleted, leaving `kept`. Each edge set is (u, v, km)
+    arrays over airport ids < n. Returns False, with `labels` untouched, when
+    the removals affect too many airports to be worth updating.
+    """
+    ru, rv, rw = removed
+    ends = np.unique(np.concatenate([ru, rv]))
+    row = dict(zip(ends.tolist(), range(len(ends))))
+    before = dijkstra(_edge_matrix(n, *old), indices=ends)
+
+    # Only pairs split by an edge (one airport with a shortest path to it from
+    # each end) can get longer; exact distances from the smaller side cover them
+    sources = set()
+    with np.errstate(invalid="ignore"):
+        for a, b, w in zip(ru.tolist(), rv.tolist(), rw.tolist()):
+            da, db = before[row[a]], before[row[b]]
+            side_a = np.flatnonzero(np.abs(da + w - db) <= TOLERANCE)
+            side_b = np.flatnonzero(np.abs(db + w - da) <= TOLERANCE)
+            sources.update((side_a if len(side_a) <= len(side_b) else side_b).tolist())
+    if len(sources) > UPDATE_LIMIT * n:
+        return False
+    if not sources:
+        return True
+    sources = np.array(sorted(sources))
+    after = dijkstra(_edge_matrix(n, *kept), indices=sources)
+    source_row = np.full(n, -1)
+    source_row[sources] = np.arange(len(sources))
+
+    # Raise the entries whose distance relied on a removed edge (drop them if
+    # the airports are no longer connected)
+    offsets, hubs, dists = _flatten(labels)
+    owners = np.repeat(np.arange(n), np.diff(offsets))
+    hit = np.flatnonzero((source_row[owners] >= 0) | (source_row[hubs] >= 0))
+    owner_is_source = source_row[owners[hit]] >= 0
+    s = np.where(owner_is_source, owners[hit], hubs[hit])
+    t = np.where(owner_is_source, hubs[hit], owners[hit])
+    exact = after[source_row[s], t]
+    low = dists[hit] < exact - TOLERANCE
+    for i, d in zip(hit[low].tolist(), exact[low].tolist()):
+        owner, hub = int(owners[i]), int(hubs[i])
+        if d == INF:
+            del labels[owner][hub]
+        else:
+            labels[owner][hub] = d
+        dists[i] = d
+
+    # Give every pair from a source whose shared hub was lost the source itself
+    starts = offsets[:-1]
+    T = np.full(n, INF)
+    for i, s in enumerate(sources.tolist()):
+        label = labels[s]
+        T[list(label)] = list(label.values())
+        covered = np.minimum.reduceat(T[hubs] + dists, starts)
+        for t in np.flatnonzero(covered > after[i] + TOLERANCE).tolist():
+            labels[t][s] = float(after[i, t])
+        T[list(label)] = INF
+    return True
+
+
+def add_edges(labels, rank, adjacency, added):
+    """
+    Updates `labels` after inserting the `added` (u, v, km) edges into
+    `adjacency` (per airport id, a list of (neighbour, km, -1)): for each edge,
+    the searches of the hubs labelling either end are resumed across it, most
+    important hub first.
+    """
+    T = [INF] * len(labels)
+    neighbors = adjacency.__getitem__
+    for a, b, w in zip(*(x.tolist() for x in added)):
+        adjacency[a].append((b, w, -1))
+        adjacency[b].append((a, w, -1))
+        label_a, label_b = dict(labels[a]), dict(labels[b])
+        for hub in sorted(label_a.keys() | label_b.keys(), key=rank.__getitem__):
+            for start, label in ((b, label_a), (a, label_b)):
+                if hub in label:
+                    touched = _dense(T, hub, labels[hub])
+                    _pruned_search(labels, neighbors, T, hub, start, label[hub] + w)
+                    for h in touched:
+                        T[h] = INF
+    return labels
+
+
+def pick_landmarks(network, k=N_LANDMARKS):
+    """Farthest-point landmarks, starting from the best-connected airport."""
+    matrix = network.matrix()
+    degree = np.diff(network.offsets)
+    landmarks = [int(np.argmax(degree))]
+    closest = dijkstra(matrix, indices=landmarks[0])
+    reachable = np.isfinite(closest)
+    while len(landmarks) < min(k, int(reachable.sum())):
+        nxt = int(np.argmax(np.where(reachable, closest, -1)))
+        landmarks.append(nxt)
+        closest = np.minimum(closest, dijkstra(matrix, indices=nxt))
+    return np.array(landmarks, dtype=np.int32)
+
+
+class DistanceOracle:
+    """Exact airport-to-airport distances from hub labels, plus ALT landmark bounds."""
+
+    def __init__(self, codes, component, edges, rank, labels, landmarks, landmark_dist):
+        self.codes = codes
+        self.index = {code: i for i, code in enumerate(codes.tolist())}
+        self.component = component
+        self.edges = edges # (u, v, km) arrays the labels were built for
+        self.rank = rank # hub importance per airport id (0 = most important)
+        self.labels = labels # per airport id: {hub id: distance}
+        self.landmarks = landmarks
+        self.landmark_dist = landmark_dist # (landmarks x airports)
+        self.updated_edges = None # edges added/removed by the update that made it (None = full build)
+
+    # --- Building ---
+    @classmethod
+    def build(cls, G, previous=None):
+        """
+        Builds the oracle for a network. With `previous` (the oracle of an older
+        version of the route data) its labels are updated for the edges added
+        and removed since, in place, instead of rebuilt; a change too large for
+        that falls back to a full build. The landmark tables are always recomputed.
+        """
+        network = _as_network(G)
+        edges = network_edges(network)
+        update = previous._update(network, edges) if previous is not None else None
+        if update is not None:
+            labels, rank, changed = update
+        else:
+            changed = None
+            degree = np.diff(network.offsets)
+            order = sorted(range(len(network)), key=lambda v: (-degree[v], network.codes[v]))
+            rank = np.empty(len(network), dtype=np.int32)
+            rank[order] = np.arange(len(network))
+            labels = pruned_labels(network, order, [{} for _ in range(len(network))])
+
+        _, component = connected_components(network.matrix(), directed=False)
+        landmarks = pick_landmarks(network)
+        landmark_dist = dijkstra(network.matrix(), indices=landmarks)
+        oracle = cls(network.codes, component.astype(np.int32), edges, rank, labels, landmarks, landmark_dist)
+        oracle.updated_edges = changed
+        return oracle
+
+    def _update(self, network, edges):
+        """
+        (labels, rank, edges changed) for `network`, derived from this oracle's
+        labels, or None when the change is too large to be worth updating.
+        Removals are applied first, then additions; a moved airport's edges
+        count as both.
+        """
+        codes = network.codes.tolist()
+        n = len(codes)
+        # New ids, with the airports that disappeared appended after them
+        index = dict(network.index)
+        for code in self.codes.tolist():
+            index.setdefault(code, len(index))
+        size = len(index)
+        to_new = np.array([index[code] for code in self.codes.tolist()], dtype=np.int64)
+
+        ou, ov = to_new[self.edges[0]], to_new[self.edges[1]]
+        old = (np.minimum(ou, ov), np.maximum(ou, ov), self.edges[2])
+        old_set = set(zip(*(x.tolist() for x in old)))
+        new_set = set(zip(*(x.tolist() for x in edges)))
+        removed = sorted(old_set - new_set)
+        added = sorted(new_set - old_set)
+        if len(removed) + len(added) > UPDATE_LIMIT * max(len(new_set), 1):
+            return None
+
+        if size == n and np.array_equal(to_new, np.arange(n)):
+            labels = self.labels
+            rank = self.rank.tolist()
+        else:
+            labels = [{} for _ in range(size)]
+            for i, label in enumerate(self.labels):
+                labels[to_new[i]] = {int(to_new[h]): d for h, d in label.items()}
+            rank = [0] * size
+            for i, r in enumerate(self.rank.tolist()):
+                rank[to_new[i]] = r
+            # New airports rank last and start labelled with themselves only
+            fresh = [v for v in range(n) if not labels[v]]
+            for r, v in enumerate(fresh, start=len(self.rank)):
+                labels[v] = {v: 0.0}
+                rank[v] = r
+
+        kept = sorted(old_set & new_set)
+        if removed and not remove_edges(labels, size, old, _edge_arrays(kept), _edge_arrays(removed)):
+            return None
+        # Airports that disappeared are now isolated and in no other label
+        del labels[n:]
+        del rank[n:]
+
+        adjacency = [[] for _ in range(n)]
+        for u, v, w in kept:
+            adjacency[u].append((v, w, -1))
+            adjacency[v].append((u, w, -1))
+        add_edges(labels, rank, adjacency, _edge_arrays(added))
+        return labels, np.array(rank, dtype=np.int32), len(removed) + len(added)
+
+    # --- Queries ---
+    def distance(self, src, dest):
+        """Shortest route distance in km between two airport codes (inf if there is no route)."""
+        if src not in self.index or dest not in self.index:
+            return INF
+        a, b = self.labels[self.index[src]], self.labels[self.index[dest]]
+        if len(a) > len(b):
+            a, b = b, a
+        return min((d + b[h] for h, d in a.items() if h in b), default=INF)
+
+    def distances(self, src, dests):
+        """Distances from one airport to many, as a float array."""
+        return np.array([self.distance(src, dest) for dest in dests], dtype=np.float64)
+
+    def lower_bounds(self, t):
+        """ALT lower bound on the distance from every airport id to airport id `t`."""
+        D = self.landmark_dist
+        with np.errstate(invalid="ignore"):
+            gaps = np.abs(D[:, [t]] - D)
+        return np.where(np.isfinite(gaps), gaps, 0.0).max(axis=0)
+
+    def label_size(self):
+        """Average number of hubs per airport."""
+        return float(np.mean([len(label) for label in self.labels]))
+
+    # --- Persistence ---
+    def save(self, path=ORACLE_PATH):
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        offsets, hubs, dists = _flatten(self.labels)
+        tmp = path + ".tmp.npz"
+        np.savez(
+            tmp,
+            codes=self.codes.astype(str),
+            component=self.component,
+            edge_u=self.edges[0],
+            edge_v=self.edges[1],
+            edge_km=self.edges[2],
+            rank=self.rank,
+            label_offsets=offsets,
+            label_hubs=hubs.astype(np.int32),
+            label_dists=dists,
+            landmarks=self.landmarks,
+            landmark_dist=self.landmark_dist,
+        )
+        os.replace(tmp, path)
+
+    @classmethod
+    def load(cls, path=ORACLE_PATH):
+        with np.load(path) as f:
+            offsets, hubs, dists = f["label_offsets"], f["label_hubs"].tolist(), f["label_dists"].tolist()
+            labels = [dict(zip(hubs[lo:hi], dists[lo:hi])) for lo, hi in zip(offsets[:-1].tolist(), offsets[1:].tolist())]
+            return cls(f["codes"].astype(object), f["component"], (f["edge_u"], f["edge_v"], f["edge_km"]),
+                       f["rank"], labels, f["landmarks"], f["landmark_dist"])
+
+
+def load_or_build_oracle(G, path=ORACLE_PATH):
+    """
+    The oracle for this network: loaded from `path` when it is up to date,
+    otherwise updated from the saved one (or built, if there is none or the
+    route data changed too much) and saved.
+    """
+    network = _as_network(G)
+    previous = None
+    if os.path.exists(path):
+        try:
+            previous = DistanceOracle.load(path)
+        except KeyError: # saved by an older version, without the edge list
+            previous = None
+    if previous is not None and previous.codes.tolist() == network.codes.tolist():
+        edges = network_edges(network)
+        if all(np.array_equal(a, b) for a, b in zip(edges, previous.edges)):
+            return previous
+
+    oracle = DistanceOracle.build(network, previous)
+    oracle.save(path)
+    return oracle
@@ -0,0 +1,89 @@
+# src/graph_cache.py
+import threading
+import time
+
+# Rough per-item footprint of a `build_graph` networkx graph, measured with
+# tracemalloc on the bundled OpenFlights data (~14.6 MB for 3.3k/19k).
+NODE_BYTES = 1000
+EDGE_BYTES = 600
+
+
+def estimate_graph_bytes(G):
+    """Approximate memory held by a network (exact for array-backed networks)."""
+    if hasattr(G, "nbytes"):
+        return G.nbytes()
+    return G.number_of_nodes() * NODE_BYTES + G.number_of_edges() * EDGE_BYTES
+
+
+class AirlineView:
+    """
+    The full network seen through an airline filter. Nothing is copied: pass
+    `airlines` to the search (`find_shortest_path(view.graph, ..., airlines=view.airlines)`).
+    """
+    __slots__ = ("graph", "airlines")
+
+    def __init__(self, graph, airlines=None):
+        self.graph = graph
+        self.airlines = airlines # frozenset of IATA codes, or None for every airline
+
+
+class GraphCache:
+    """
+    Thread-safe, process-wide holder of the flight network.
+
+    Only the full network is built (with `build_full()`) and held. `get`
+    returns an `AirlineView` of it for the selected airlines, so a new filter
+    costs no build and no copy, and the filter is applied during the search.
+    `invalidate` drops the network; the next `get` rebuilds it.
+    """
+
+    def __init__(self, build_full):
+        self.build_full = build_full
+        self._graph = None
+        self._lock = threading.Lock()
+        self._build_lock = threading.Lock()
+        self._stats = {"hits": 0, "misses": 0, "builds": 0,
+                       "build_seconds": 0.0, "last_build_seconds": 0.0}
+
+    @staticmethod
+    def key(airlines):
+        return None if airlines is None else frozenset(airlines)
+
+    def _full(self):
+        """The full network, built on first use; concurrent callers wait for one build."""
+        with self._lock:
+            if self._graph is not None:
+                self._stats["hits"] += 1
+                return self._graph
+            self._stats["misses"] += 1
+        with self._build_lock:
+            with self._lock:
+                if self._graph is not None:
+                    return self._graph
+            start = time.perf_counter()
+            G = self.build_full()
+            elapsed = time.perf_counter() - start
+            with self._lock:
+                self._stats["builds"] += 1
+                self._stats["build_seconds"] += elapsed
+                self._stats["last_build_seconds"] = elapsed
+                self._graph = G
+        return G
+
+    def get(self, airlines=None):
+        """The `AirlineView` for this airline filter (None = every airline), building the network if needed."""
+        return AirlineView(self._full(), self.key(airlines))
+
+    def invalidate(self):
+        """Drops the network; the next `get` rebuilds it."""
+        with self._lock:
+            self._graph = None
+
+    def stats(self):
+        """Snapshot of hit/miss/build counters plus the network's estimated size."""
+        with self._lock:
+            stats = dict(self._stats)
+            stats["bytes"] = 0 if self._graph is None else estimate_graph_bytes(self._graph)
+        lookups = stats["hits"] + stats["misses"]
+        stats["hit_rate"] = stats["hits"] / lookups if lookups else 0.0
+        return stats
@@ -0,0 +1,36 @@
+# src/itinerary.py
+"""
+Per-leg price, delay risk and emissions for a whole itinerary, shared by the
+app and the headless service. Kept out of `logic` so the graph code doesn't
+load the ML models.
+"""
+import numpy as np
+
+from src.logic import calculate_emissions_np
+from src.ml_engine import predict_delays_batch, predict_prices_batch
+
+DEFAULT_WEATHER = "rain" # what the app assumes for delay risk
+# Leg duration estimate used for pricing: cruise speed plus taxi/climb time
+CRUISE_KMH = 800
+GROUND_MINS = 45
+
+
+def leg_durations(distances_km):
+    """Estimated flight time (whole minutes) per leg distance."""
+    return (np.asarray(distances_km, dtype=np.float64) / CRUISE_KMH * 60 + GROUND_MINS).astype(int)
+
+
+def itinerary_metrics(legs, weather=DEFAULT_WEATHER):
+    """
+    Per-leg price, delay risk and emissions for one itinerary (leg dicts from
+    `find_shortest_path`), each model called once for all legs.
+    """
+    distances = np.array([leg["distance"] for leg in legs], dtype=np.float64)
+    airlines = [leg["airline"] for leg in legs]
+    durations = leg_durations(distances)
+    return {
+        "durations": durations,
+        "prices": predict_prices_batch(durations, 0, airlines),
+        "risks": predict_delays_batch(distances, weather, airlines),
+        "emissions": calculate_emissions_np(distances),
+    }
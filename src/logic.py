@@ -1,8 +1,15 @@
 # src/logic.py
+import functools
+import inspect
 import networkx as nx
 from math import radians, cos, sin, asin, sqrt
+import time
+import numpy as np
 import pandas as pd
 
+from src.metrics import METRICS, timed
+from src.search import INF, check_strategy, distances_from, k_shortest_paths, search, with_endpoints
+
 def haversine(lon1, lat1, lon2, lat2):
     """Calculate distance between two points on Earth."""
     lon1, lat1, lon2, lat2 = map(radians, [lon1, lat1, lon2, lat2])
@@ -13,77 +20,359 @@ def haversine(lon1, lat1, lon2, lat2):
     r = 6371 # Radius of earth in km
     return c * r
 
-def build_graph(routes, airports, airlines):
-    G = nx.Graph()
-    
+def haversine_np(lon1, lat1, lon2, lat2, dtype=np.float64):
+    """
+    Vectorized haversine (same formula as `haversine`). Takes scalars, NumPy
+    arrays or pandas Series and broadcasts them against each other, e.g. one
+    point against many. `dtype=np.float32` halves memory for large batches.
+    """
+    lon1, lat1, lon2, lat2 = (np.radians(np.asarray(x, dtype=dtype)) for x in (lon1, lat1, lon2, lat2))
+    dlon = lon2 - lon1
+    dlat = lat2 - lat1
+    a = np.sin(dlat/2)**2 + np.cos(lat1) * np.cos(lat2) * np.sin(dlon/2)**2
+    c = 2 * np.arcsin(np.sqrt(a))
+    r = 6371 # Radius of earth in km
+    return c * r
+
+def haversine_matrix(lon1, lat1, lon2, lat2, dtype=np.float64):
+    """Many-to-many distances: a (len(lon1), len(lon2)) matrix in km."""
+    lon1, lat1 = np.asarray(lon1, dtype=dtype)[:, None], np.asarray(lat1, dtype=dtype)[:, None]
+    lon2, lat2 = np.asarray(lon2, dtype=dtype)[None, :], np.asarray(lat2, dtype=dtype)[None, :]
+    return haversine_np(lon1, lat1, lon2, lat2, dtype=dtype)
+
+def route_edges(routes, airports, airlines):
+    """
+    Joins the routes to the airport table and collapses duplicate airport pairs.
+    Returns (valid_airports, edges, airline_dict): `edges` has one row per
+    undirected airport pair in first-seen order (Source, Dest, Distance, Airline,
+    Carriers). `Airline` is the name of the last route seen for that pair - the
+    same result as adding the routes to a graph one by one - while `Carriers`
+    keeps the IATA codes of every airline flying it. `airline_dict` maps
+    airline IATA codes to names.
+    """
     # Clean Data - Ensure unique IATA codes for lookup
     valid_airports = airports.dropna(subset=["IATA"]).drop_duplicates(subset=["IATA"])
-    airport_dict = valid_airports.set_index("IATA")[["Latitude", "Longitude", "City", "Name"]].to_dict('index')
 
     valid_airlines = airlines.dropna(subset=["IATA"]).drop_duplicates(subset=["IATA"])
     airline_dict = valid_airlines.set_index("IATA")["Name"].to_dict()
 
+    # Resolve every route endpoint to a row of the airport table (-1 = unknown)
+    airport_index = pd.Index(valid_airports["IATA"])
+    src_idx = airport_index.get_indexer(routes["SourceAirport"])
+    dest_idx = airport_index.get_indexer(routes["DestAirport"])
+
     # Filter routes to only include valid airports
-    valid_routes = routes[
-        (routes["SourceAirport"].isin(airport_dict)) & 
-        (routes["DestAirport"].isin(airport_dict))
-    ]
-
-    for _, row in valid_routes.iterrows():
-        src, dest, airline = row["SourceAirport"], row["DestAirport"], row["Airline"]
-        
-        # Only add edges if both source and dest exist in our valid airport list
-        if src in airport_dict and dest in airport_dict:
-            src_lat, src_lon = airport_dict[src]["Latitude"], airport_dict[src]["Longitude"]
-            dest_lat, dest_lon = airport_dict[dest]["Latitude"], airport_dict[dest]["Longitude"]
-            
-            dist = haversine(src_lon, src_lat, dest_lon, dest_lat)
-            airline_name = airline_dict.get(airline, airline)
-            
-            # Add edge
-            G.add_edge(src, dest, weight=dist, airline=airline_name, distance=dist)
-            
-            # Add node attributes
-            nx.set_node_attributes(G, {src: airport_dict[src], dest: airport_dict[dest]})
+    valid = (src_idx >= 0) & (dest_idx >= 0)
+    src_idx, dest_idx = src_idx[valid], dest_idx[valid]
+
+    # Great-circle distance of every route in one pass
+    lat = valid_airports["Latitude"].to_numpy(dtype=float)
+    lon = valid_airports["Longitude"].to_numpy(dtype=float)
+    dists = haversine_np(lon[src_idx], lat[src_idx], lon[dest_idx], lat[dest_idx])
+
+    airline_codes = routes["Airline"][valid]
+    airline_names = airline_codes.map(airline_dict).fillna(airline_codes).to_numpy()
+
+    # Collapse duplicate airport pairs (undirected): first position, last attributes
+    pair_key = np.minimum(src_idx, dest_idx).astype(np.int64) * len(airport_index) + np.maximum(src_idx, dest_idx)
+    _, first = np.unique(pair_key, return_index=True)
+    _, last_rev = np.unique(pair_key[::-1], return_index=True)
+    last = len(pair_key) - 1 - last_rev
+    order = np.argsort(first)
+    first, last = first[order], last[order]
+
+    # Every distinct airline per airport pair, grouped by edge position
+    _, pair_id = np.unique(pair_key, return_inverse=True)
+    edge_pos = np.empty_like(order)
+    edge_pos[order] = np.arange(len(order))
+    code_ids, code_values = pd.factorize(airline_codes)
+    combos = np.unique(edge_pos[pair_id] * (len(code_values) + 1) + (code_ids + 1))
+    combo_edge, combo_code = np.divmod(combos, len(code_values) + 1)
+    keep = combo_code > 0 # drop routes without an airline code
+    combo_edge, combo_code = combo_edge[keep], combo_code[keep] - 1
+    bounds = np.searchsorted(combo_edge, np.arange(len(order) + 1)).tolist()
+    combo_codes = np.asarray(code_values, dtype=object)[combo_code].tolist()
+    carriers = [frozenset(combo_codes[lo:hi]) for lo, hi in zip(bounds, bounds[1:])]
+
+    codes = airport_index.to_numpy()
+    edges = pd.DataFrame({
+        "Source": codes[src_idx[first]],
+        "Dest": codes[dest_idx[first]],
+        "Distance": dists[last],
+        "Airline": airline_names[last],
+        "Carriers": carriers,
+    })
+    return valid_airports, edges, airline_dict
+
+def node_coords(G):
+    """({code: position}, latitudes, longitudes) of a graph's airports, stored as G.graph["coords"]."""
+    nodes = G._node
+    codes = list(G)
+    return ({code: i for i, code in enumerate(codes)},
+            np.array([nodes[c]["Latitude"] for c in codes]),
+            np.array([nodes[c]["Longitude"] for c in codes]))
+
+@timed("build_graph")
+def build_graph(routes, airports, airlines):
+    """
+    Builds the undirected airport network from the OpenFlights tables.
+    Distances and duplicate routes are handled in bulk by `route_edges`.
+    Each edge keeps the IATA codes of every airline on it ("airlines"), so
+    routing can be restricted to a set of carriers without a rebuild.
+    """
+    G = nx.Graph()
+
+    valid_airports, edges, airline_dict = route_edges(routes, airports, airlines)
+    airport_dict = valid_airports.set_index("IATA")[["Latitude", "Longitude", "City", "Name"]].to_dict('index')
+    G.graph["airline_names"] = airline_dict
+
+    # Add edges
+    G.add_edges_from(
+        (src, dest, {"weight": dist, "airline": airline, "distance": dist, "airlines": carriers})
+        for src, dest, dist, airline, carriers in zip(
+            edges["Source"].tolist(), edges["Dest"].tolist(), edges["Distance"].tolist(),
+            edges["Airline"].tolist(), edges["Carriers"].tolist()
+        )
+    )
+
+    # Add node attributes
+    nx.set_node_attributes(G, {node: airport_dict[node] for node in G})
+    # Coordinate arrays for vectorized distance-to-destination heuristics
+    G.graph["coords"] = node_coords(G)
             
     return G
 
-def find_shortest_path(G, src, dest):
+def _timed_search(stage):
+    """
+    `timed(stage)` for a route search, plus query, no-route and expanded-node
+    counters. The expansion count comes from the search's `stats` dict, which
+    is supplied when the caller didn't pass one.
+    """
+    def decorate(fn):
+        signature = inspect.signature(fn)
+
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            if not METRICS.enabled:
+                return fn(*args, **kwargs)
+            bound = signature.bind(*args, **kwargs)
+            if bound.arguments.get("stats") is None:
+                bound.arguments["stats"] = {}
+            stats = bound.arguments["stats"]
+            start = time.perf_counter()
+            try:
+                result = fn(*bound.args, **bound.kwargs)
+            finally:
+                METRICS.observe(stage, time.perf_counter() - start)
+            found = result[0] is not None if isinstance(result, tuple) else bool(result)
+            METRICS.count("route_queries")
+            METRICS.count("route_nodes_expanded", stats.get("expanded", 0))
+            if not found:
+                METRICS.count("route_not_found")
+            return result
+        return wrapper
+    return decorate
+
+@_timed_search("find_shortest_path")
+def find_shortest_path(G, src, dest, strategy="dijkstra", stats=None, airlines=None):
+    """
+    Shortest route between two airports as (leg dicts, total km), or (None, 0).
+    strategy: "dijkstra" (default), "astar" (great-circle heuristic),
+    "bidirectional" or "alt" (A* with landmark bounds from a DistanceOracle
+    attached to the network, or stored as G.graph["oracle"]). Pass a `stats`
+    dict to get the number of expanded nodes.
+    `airlines` restricts the search to edges flown by one of these airline
+    IATA codes (None = any airline). `src` and `dest` can also be collections
+    of codes (e.g. every London airport from `spatial_index.metro_airports`);
+    the best route between any origin and any destination is returned.
+    """
+    check_strategy(strategy)
+    # Compact array-backed networks (src/network.py) bring their own search
+    if hasattr(G, "shortest_path"):
+        return G.shortest_path(src, dest, strategy=strategy, stats=stats, airlines=airlines)
+
+    # src/dest may also be collections of codes, meaning "any of these airports"
+    sources = [src] if isinstance(src, str) else [s for s in src if s in G]
+    targets = [dest] if isinstance(dest, str) else [t for t in dest if t in G]
+    # An airport on both ends is no destination: a route takes at least one flight
+    targets = [t for t in targets if t not in sources]
+
     # --- CRITICAL FIX: Check if nodes exist before searching ---
-    if src not in G:
+    if not sources or sources[0] not in G:
         return None, 0 # Source airport not in the selected airline network
-    if dest not in G:
+    if not targets or targets[0] not in G:
         return None, 0 # Destination airport not in the selected airline network
     # ----------------------------------------------------------
 
-    try:
-        path = nx.shortest_path(G, src, dest, weight="weight")
-        details = []
-        total_dist = 0
-        
-        for i in range(len(path)-1):
-            u, v = path[i], path[i+1]
-            edge_data = G.get_edge_data(u, v)
-            dist = edge_data['distance']
-            total_dist += dist
-            details.append({
-                "from": u, "to": v,
-                "airline": edge_data['airline'],
-                "distance": dist,
-                "coords_u": (G.nodes[u]['Latitude'], G.nodes[u]['Longitude']),
-                "coords_v": (G.nodes[v]['Latitude'], G.nodes[v]['Longitude'])
-            })
-            
-        return details, total_dist
-    except nx.NetworkXNoPath:
+    # Airports in different components: no search needed
+    reach = G.graph.get("reachability")
+    if reach is not None and not reach.any_connected(sources, targets):
+        if stats is not None:
+            stats.update({"strategy": strategy, "expanded": 0})
         return None, 0
-    
 
-    # src/logic.py (Add this to the bottom)
+    neighbors = _nx_neighbors(G, airlines)
+    nodes = G._node
+
+    # Edge weights are great-circle distances, so the straight line to the
+    # (nearest) destination never overestimates the remaining distance (admissible).
+    # Only A* uses it, so the other strategies skip computing it.
+    heuristic = None
+    if strategy in ("astar", "alt"):
+        dest_coords = [(nodes[t]['Latitude'], nodes[t]['Longitude']) for t in targets]
+        if "coords" in G.graph:
+            # Every airport against every destination in one vectorized pass
+            position, lat, lon = G.graph["coords"]
+            if len(dest_coords) == 1:
+                h = haversine_np(lon, lat, dest_coords[0][1], dest_coords[0][0]).tolist()
+            else:
+                h = haversine_matrix(lon, lat, [x for _, x in dest_coords], [y for y, _ in dest_coords]).min(axis=1).tolist()
+
+            def heuristic(n):
+                return h[position[n]]
+        else:
+            def heuristic(n):
+                return min(haversine(nodes[n]['Longitude'], nodes[n]['Latitude'], lon, lat) for lat, lon in dest_coords)
+    requested = strategy
+    if strategy == "alt":
+        oracle = G.graph.get("oracle")
+        if oracle is not None and all(t in oracle.index for t in targets):
+            index = oracle.index
+            bounds = np.min([oracle.lower_bounds(index[t]) for t in targets], axis=0).tolist()
+            great_circle = heuristic
+
+            def heuristic(n):
+                return max(bounds[index[n]], great_circle(n))
+        strategy = "astar"
+
+    if len(sources) == 1 and len(targets) == 1:
+        path, edges, _, expanded = search(neighbors, sources[0], targets[0], strategy, heuristic)
+    else:
+        # One search from a virtual start joined to every origin to a virtual end
+        start, end = object(), object()
+        to_end = heuristic
+        path, edges, _, expanded = search(
+            with_endpoints(neighbors, sources, targets, start, end), start, end, strategy,
+            lambda n: 0.0 if n is start or n is end else to_end(n))
+        if path is not None:
+            path, edges = path[1:-1], edges[1:-1]
+    if stats is not None:
+        stats.update({"strategy": requested, "expanded": expanded})
+    if path is None:
+        return None, 0
+
+    return _nx_path_details(G, path, edges, airlines)
+
+
+def _nx_neighbors(G, airlines=None):
+    """`neighbors(u)` callable for src/search.py over a networkx graph, optionally airline-filtered."""
+    # Raw adjacency dicts (as networkx's own algorithms use) - the public
+    # views route every lookup through Mapping wrappers
+    adj = G._adj
+
+    if airlines is None:
+        def neighbors(u):
+            return [(v, d["weight"], d) for v, d in adj[u].items()]
+    else:
+        allowed = frozenset(airlines)
+
+        def neighbors(u):
+            return [(v, d["weight"], d) for v, d in adj[u].items() if not allowed.isdisjoint(d["airlines"])]
+    return neighbors
+
+
+def _nx_path_details(G, path, edges, airlines=None):
+    """Leg dicts and total km for a node path and the edge dicts between them."""
+    nodes = G._node
+    details = []
+    total_dist = 0
+    airline_names = G.graph.get("airline_names", {})
+    allowed = None if airlines is None else frozenset(airlines)
+
+    for u, v, edge_data in zip(path, path[1:], edges):
+        dist = edge_data['distance']
+        total_dist += dist
+        if allowed is None:
+            airline = edge_data['airline']
+        else:
+            code = min(allowed & edge_data['airlines'])
+            airline = airline_names.get(code, code)
+        details.append({
+            "from": u, "to": v,
+            "airline": airline,
+            "distance": dist,
+            "coords_u": (nodes[u]['Latitude'], nodes[u]['Longitude']),
+            "coords_v": (nodes[v]['Latitude'], nodes[v]['Longitude'])
+        })
+
+    return details, total_dist
+
+
+@_timed_search("find_k_shortest_paths")
+def find_k_shortest_paths(G, src, dest, k=3, max_stops=None, detour_ratio=None, stats=None, airlines=None):
+    """
+    Up to `k` alternative routes, shortest first, as a list of (leg dicts, total km)
+    in the `find_shortest_path` format. Routes never revisit an airport. `src`
+    and `dest` can be collections of codes, as in `find_shortest_path`.
+
+    max_stops: drop routes with more intermediate stops than this.
+    detour_ratio: drop routes longer than detour_ratio x the shortest one (e.g. 1.5).
+    `stats` and `airlines` work as in `find_shortest_path`.
+    """
+    if hasattr(G, "k_shortest_paths"):
+        return G.k_shortest_paths(src, dest, k=k, max_stops=max_stops, detour_ratio=detour_ratio,
+                                  stats=stats, airlines=airlines)
+    sources = [src] if isinstance(src, str) else [s for s in src if s in G]
+    targets = [dest] if isinstance(dest, str) else [t for t in dest if t in G]
+    targets = [t for t in targets if t not in sources] # as in find_shortest_path
+    if not sources or not targets or sources[0] not in G or targets[0] not in G:
+        return []
+    reach = G.graph.get("reachability")
+    if reach is not None and not reach.any_connected(sources, targets):
+        if stats is not None:
+            stats.update({"strategy": "yen", "expanded": 0})
+        return []
+
+    neighbors = _nx_neighbors(G, airlines)
+    if len(sources) == 1 and len(targets) == 1:
+        source, target, virtual_legs = sources[0], targets[0], 0
+    else:
+        # Several airports on either end: search between virtual end points
+        source, target, virtual_legs = object(), object(), 2
+        neighbors = with_endpoints(neighbors, sources, targets, source, target)
+
+    # One full search back from the destination gives every airport's exact
+    # remaining distance (and legs), shared by all of Yen's spur searches
+    to_dest = distances_from(neighbors, target)
+    if source not in to_dest:
+        return []
+    hops_to_dest = distances_from(neighbors, target, unit=True) if max_stops is not None else {}
+    max_dist = to_dest[source] * detour_ratio if detour_ratio is not None else INF
+
+    paths, expanded = k_shortest_paths(
+        neighbors, source, target, k,
+        to_target=lambda n: to_dest.get(n, INF),
+        hops_to_target=lambda n: hops_to_dest.get(n, INF),
+        max_edges=None if max_stops is None else max_stops + 1 + virtual_legs,
+        max_dist=max_dist,
+    )
+    if virtual_legs:
+        paths = [(nodes[1:-1], edges[1:-1], dist) for nodes, edges, dist in paths]
+    if stats is not None:
+        stats.update({"strategy": "yen", "expanded": expanded})
+    return [_nx_path_details(G, nodes, edges, airlines) for nodes, edges, _ in paths]
+
+
+# Avg: ~0.115 kg CO2 per passenger per km
+CO2_KG_PER_KM = 0.115
 
 def calculate_emissions(distance_km):
     """
     Calculates CO2 emissions (kg) based on distance.
     Avg: ~0.115 kg CO2 per passenger per km.
     """
-    return round(distance_km * 0.115, 2)
\ No newline at end of file
+    return round(distance_km * CO2_KG_PER_KM, 2)
+
+def calculate_emissions_np(distances_km):
+    """Vectorized `calculate_emissions` for an array or Series of distances."""
+    return np.round(np.asarray(distances_km, dtype=np.float64) * CO2_KG_PER_KM, 2)
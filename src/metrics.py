@@ -0,0 +1,144 @@
+# src/metrics.py
+"""
+Opt-in timing and counter layer for the hot paths (data loading, graph
+building, routing, model loads and inference, chat).
+
+Set SKYLINK_METRICS=1 to turn it on; `METRICS.enable()` does the same at
+runtime. While it is off, an instrumented call costs one attribute check.
+Stage latencies go into fixed-bucket histograms, so recording is O(1) and
+needs no stored samples; the totals export as Prometheus text or JSON.
+"""
+import bisect
+import functools
+import json
+import os
+import threading
+import time
+
+ENV_VAR = "SKYLINK_METRICS"
+PREFIX = "skylink"
+# Histogram bucket upper bounds in seconds (Prometheus `le` labels)
+BUCKETS = (0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1,
+           0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+
+class Histogram:
+    """Count, sum, min, max and per-bucket counts of observed durations."""
+
+    def __init__(self):
+        self.buckets = [0] * (len(BUCKETS) + 1) # last one is +Inf
+        self.count = 0
+        self.sum = 0.0
+        self.min = float("inf")
+        self.max = 0.0
+
+    def observe(self, seconds):
+        self.buckets[bisect.bisect_left(BUCKETS, seconds)] += 1
+        self.count += 1
+        self.sum += seconds
+        self.min = min(self.min, seconds)
+        self.max = max(self.max, seconds)
+
+    def quantile(self, q):
+        """Upper bound of the bucket holding the q-quantile (the max for the +Inf bucket)."""
+        if not self.count:
+            return 0.0
+        rank, seen = q * self.count, 0
+        for bound, n in zip(BUCKETS, self.buckets):
+            seen += n
+            if seen >= rank:
+                return min(bound, self.max)
+        return self.max
+
+    def to_dict(self):
+        return {
+            "count": self.count,
+            "sum": self.sum,
+            "mean": self.sum / self.count if self.count else 0.0,
+            "min": self.min if self.count else 0.0,
+            "max": self.max,
+            "p50": self.quantile(0.5),
+            "p99": self.quantile(0.99),
+        }
+
+
+class Metrics:
+    """Thread-safe registry of per-stage latency histograms and named counters."""
+
+    def __init__(self, enabled=False):
+        self.enabled = enabled
+        self._lock = threading.Lock()
+        self._histograms = {} # stage -> Histogram
+        self._counters = {} # name -> number
+
+    def enable(self, on=True):
+        self.enabled = on
+
+    def observe(self, stage, seconds):
+        if not self.enabled:
+            return
+        with self._lock:
+            hist = self._histograms.get(stage)
+            if hist is None:
+                hist = self._histograms[stage] = Histogram()
+            hist.observe(seconds)
+
+    def count(self, name, value=1):
+        if not self.enabled:
+            return
+        with self._lock:
+            self._counters[name] = self._counters.get(name, 0) + value
+
+    def timed(self, stage):
+        """Decorator recording every call's duration under `stage` (also when it raises)."""
+        def decorate(fn):
+            @functools.wraps(fn)
+            def wrapper(*args, **kwargs):
+                if not self.enabled:
+                    return fn(*args, **kwargs)
+                start = time.perf_counter()
+                try:
+                    return fn(*args, **kwargs)
+                finally:
+                    self.observe(stage, time.perf_counter() - start)
+            return wrapper
+        return decorate
+
+    def reset(self):
+        with self._lock:
+            self._histograms.clear()
+            self._counters.clear()
+
+    def snapshot(self):
+        """{"stages": {stage: summary}, "counters": {name: value}}."""
+        with self._lock:
+            return {
+                "stages": {stage: hist.to_dict() for stage, hist in sorted(self._histograms.items())},
+                "counters": dict(sorted(self._counters.items())),
+            }
+
+    def to_json(self):
+        return json.dumps(self.snapshot(), indent=2)
+
+    def to_prometheus(self):
+        """The Prometheus text exposition format (one histogram family, one counter per name)."""
+        lines = []
+        with self._lock:
+            if self._histograms:
+                name = f"{PREFIX}_stage_seconds"
+                lines += [f"# HELP {name} Latency of instrumented stages.", f"# TYPE {name} histogram"]
+                for stage, hist in sorted(self._histograms.items()):
+                    cumulative = 0
+                    for bound, n in zip(BUCKETS + ("+Inf",), hist.buckets):
+                        cumulative += n
+                        lines.append(f'{name}_bucket{{stage="{stage}",le="{bound}"}} {cumulative}')
+                    lines.append(f'{name}_sum{{stage="{stage}"}} {hist.sum!r}')
+                    lines.append(f'{name}_count{{stage="{stage}"}} {hist.count}')
+            for counter, value in sorted(self._counters.items()):
+                name = f"{PREFIX}_{counter}_total"
+                lines += [f"# TYPE {name} counter", f"{name} {value!r}"]
+        return "\n".join(lines) + "\n"
+
+
+METRICS = Metrics(enabled=os.environ.get(ENV_VAR, "").lower() in ("1", "true", "yes", "on"))
+timed = METRICS.timed
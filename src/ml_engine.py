@@ -3,78 +3,296 @@ import pandas as pd
 import numpy as np
 from sklearn.ensemble import RandomForestClassifier, RandomForestRegressor
 from sklearn.preprocessing import LabelEncoder
+import hashlib
 import joblib
+import json
 import os
+import pyarrow as pa
+import pyarrow.feather as feather
+import threading
+import time
+
+from src.metrics import METRICS, timed
+from src.price_surface import build_price_surface, load_price_surface, save_price_surface, surface_error
 
 DELAY_MODEL_PATH = "models/delay_model.pkl"
 PRICE_MODEL_PATH = "models/price_model.pkl"
 ENCODER_PATH = "models/airline_encoder.pkl"
+PRICE_SURFACE_PATH = "models/price_surface.npy"
+PRICE_SURFACE_META_PATH = "models/price_surface.json"
 DATA_PATH = "data/real_flight_prices.csv"
+FEATURE_CACHE_DIR = "data/.cache/features"
+# Bump when preprocess_data changes so stale feature files are ignored
+FEATURE_CACHE_VERSION = 1
+FEATURE_COLUMNS = ["Duration_Mins", "Total_Stops", "Airline_Encoded"]
+
+TRAINING_REPORT_PATH = "models/training_report.json"
+
+INR_TO_USD = 0.012
+# Training uses every core; saved models predict single-threaded (no pool start-up per call)
+TRAIN_N_JOBS = -1
+PRICE_TREES = 100
+DELAY_TREES = 100
+# Trees added to the price forest per `update_price_model`
+PRICE_TREES_PER_UPDATE = 20
+# joblib compression level for saved models. 0 (plain pickles) loads fastest;
+# 3 makes the price model ~3.5x smaller but ~2.5x slower to load.
+MODEL_COMPRESS = 0
+# Serve prices from the precomputed grid when one matching the current model exists
+USE_PRICE_SURFACE = True
+# Largest allowed gap (USD) between the grid and the live model before it is rejected
+PRICE_SURFACE_MAX_ERROR = 1.0
+
+class ModelRegistry:
+    """
+    Keeps the trained artifacts resident for the whole process.
+    Each file is deserialized once and reloaded only when its mtime changes
+    (e.g. after `train_models`), so predictions don't pay a joblib.load.
+    Safe to share between threads; also records load and inference timings.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._models = {} # path -> (mtime, object)
+        self._loads = {} # path -> load counters
+        self._inferences = {} # model name -> inference counters
+
+    def get(self, path, loader=joblib.load):
+        """Returns the object stored at `path`; raises FileNotFoundError if it doesn't exist."""
+        mtime = os.stat(path).st_mtime_ns
+        with self._lock:
+            cached = self._models.get(path)
+            if cached is not None and cached[0] == mtime:
+                return cached[1]
+
+            start = time.perf_counter()
+            obj = loader(path)
+            elapsed = time.perf_counter() - start
+
+            self._models[path] = (mtime, obj)
+            metric = self._loads.setdefault(path, {"loads": 0, "load_seconds": 0.0, "last_load_seconds": 0.0})
+            metric["loads"] += 1
+            metric["load_seconds"] += elapsed
+            metric["last_load_seconds"] = elapsed
+            METRICS.observe("model_load", elapsed)
+            METRICS.count("model_loads")
+            return obj
+
+    def record_inference(self, name, seconds, count=1):
+        METRICS.observe(f"inference_{name}", seconds)
+        METRICS.count("inference_rows", count)
+        with self._lock:
+            metric = self._inferences.setdefault(name, {"calls": 0, "rows": 0, "seconds": 0.0})
+            metric["calls"] += 1
+            metric["rows"] += count
+            metric["seconds"] += seconds
+
+    def clear(self):
+        with self._lock:
+            self._models.clear()
+
+    def stats(self):
+        """Load counts/timings per artifact and inference counts/timings per model."""
+        with self._lock:
+            return {
+                "loads": {path: dict(metric) for path, metric in self._loads.items()},
+                "inference": {name: dict(metric) for name, metric in self._inferences.items()},
+            }
+
+def save_artifact(obj, path, compress=None):
+    """Writes a model atomically, so the registry never sees a half-written file."""
+    tmp = path + ".tmp"
+    joblib.dump(obj, tmp, compress=MODEL_COMPRESS if compress is None else compress)
+    os.replace(tmp, path)
+
+MODEL_REGISTRY = ModelRegistry()
+_TRAIN_LOCK = threading.Lock()
+
+def _load_models(*paths):
+    """Fetches artifacts from the registry, training them first if any is missing."""
+    try:
+        return [MODEL_REGISTRY.get(path) for path in paths]
+    except FileNotFoundError:
+        with _TRAIN_LOCK:
+            if not all(os.path.exists(path) for path in paths):
+                print("⚠️ Model or Encoder missing. Retraining systems...")
+                train_models()
+        return [MODEL_REGISTRY.get(path) for path in paths]
+
+def model_version():
+    """
+    Modification times of the prediction artifacts (None for a missing one).
+    Changes whenever the models are retrained or updated, so callers caching
+    predictions can key on it.
+    """
+    return tuple(os.stat(path).st_mtime_ns if os.path.exists(path) else None
+                 for path in (PRICE_MODEL_PATH, ENCODER_PATH, DELAY_MODEL_PATH, PRICE_SURFACE_META_PATH))
+
+STOPS = {"non-stop": 0, "1 stop": 1, "2 stops": 2, "3 stops": 3, "4 stops": 4}
+
+def _fit_encoder(airline_names):
+    """
+    Returns the airline LabelEncoder for these names. The saved encoder is
+    reused when it already has exactly these classes; otherwise a new one is
+    fitted and saved (which also makes the registry reload it).
+    """
+    classes = np.unique(np.asarray(airline_names, dtype=str))
+    if os.path.exists(ENCODER_PATH):
+        le_airline = MODEL_REGISTRY.get(ENCODER_PATH)
+        if np.array_equal(le_airline.classes_, classes):
+            return le_airline
+    le_airline = LabelEncoder().fit(classes)
+    save_artifact(le_airline, ENCODER_PATH)
+    return le_airline
 
 def preprocess_data(df):
     """
     Cleans the real dataset to make it ready for AI.
     """
-    # 1. Handle Dates
+    # 1. Handle Dates (parsed once)
     # Ensure it's string first to handle Excel auto-formatting
     df["Date_of_Journey"] = df["Date_of_Journey"].astype(str)
-    df["Journey_Day"] = pd.to_datetime(df["Date_of_Journey"], dayfirst=True).dt.day
-    df["Journey_Month"] = pd.to_datetime(df["Date_of_Journey"], dayfirst=True).dt.month
-
-    # 2. Clean Duration
-    def duration_to_minutes(duration):
-        h, m = 0, 0
-        parts = str(duration).split()
-        for part in parts:
-            if 'h' in part: h = int(part.replace('h', ''))
-            if 'm' in part: m = int(part.replace('m', ''))
-        return h * 60 + m
-
-    df["Duration_Mins"] = df["Duration"].apply(duration_to_minutes)
-    
+    journey_date = pd.to_datetime(df["Date_of_Journey"], dayfirst=True)
+    df["Journey_Day"] = journey_date.dt.day
+    df["Journey_Month"] = journey_date.dt.month
+
+    # 2. Clean Duration ("2h 50m", "19h", "5m") with vectorized regexes
+    duration = df["Duration"].astype(str)
+    hours = duration.str.extract(r"(\d+)h", expand=False).astype(float).fillna(0).astype(int)
+    minutes = duration.str.extract(r"(\d+)m", expand=False).astype(float).fillna(0).astype(int)
+    df["Duration_Mins"] = hours * 60 + minutes
+
     # 3. Encode Categorical Data (Airline Name -> Numbers)
-    le_airline = LabelEncoder()
-    df["Airline_Encoded"] = le_airline.fit_transform(df["Airline"].astype(str))
-    joblib.dump(le_airline, ENCODER_PATH)
+    airline = df["Airline"].astype(str)
+    le_airline = _fit_encoder(airline)
+    df["Airline_Encoded"] = np.searchsorted(le_airline.classes_, airline.to_numpy(dtype=str))
 
     # 4. Create 'Stops' as integer
-    df["Total_Stops"] = df["Total_Stops"].replace({"non-stop": 0, "1 stop": 1, "2 stops": 2, "3 stops": 3, "4 stops": 4})
-    df["Total_Stops"] = df["Total_Stops"].fillna(0).astype(int)
+    df["Total_Stops"] = df["Total_Stops"].map(STOPS).fillna(0).astype(int)
 
     return df
 
-def train_models():
-    print("🧠 Training AI Models on REAL Data...")
-    os.makedirs("models", exist_ok=True)
-    
-    if not os.path.exists(DATA_PATH):
-        print(f"⚠️ File {DATA_PATH} not found!")
-        return
-
+def read_raw_data(path=DATA_PATH):
+    """Reads the flight price dataset; returns None if it can't be read."""
     # --- FIX: Smart Loader (Excel vs CSV) ---
     try:
         # First, try reading as Excel (Since Kaggle data is usually XLSX)
-        raw_df = pd.read_excel(DATA_PATH, engine='openpyxl')
+        return pd.read_excel(path, engine='openpyxl')
     except:
         # If that fails, try reading as standard CSV
         try:
-            raw_df = pd.read_csv(DATA_PATH)
+            return pd.read_csv(path)
         except Exception as e:
             print(f"❌ Could not read file. Error: {e}")
-            return
+            return None
     # ----------------------------------------
 
-    df = preprocess_data(raw_df)
+def _feature_key(path):
+    """SHA-1 of the source file's bytes (plus the cache version)."""
+    h = hashlib.sha1(f"v{FEATURE_CACHE_VERSION}".encode())
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(1 << 20), b""):
+            h.update(chunk)
+    return h.hexdigest()[:16]
+
+def load_features(path=DATA_PATH, use_cache=True):
+    """
+    The preprocessed training table (FEATURE_COLUMNS, Price, Airline and the
+    journey day/month). It is cached as a Feather file keyed by a hash of the
+    source file, so retraining and sweeps skip reading and parsing it.
+    Returns None if the source can't be read.
+    """
+    cache = os.path.join(FEATURE_CACHE_DIR, f"{_feature_key(path)}.feather")
+    if use_cache and os.path.exists(cache):
+        try:
+            df = feather.read_feather(cache)
+            _fit_encoder(df["Airline"]) # restore the encoder if it was deleted
+            return df
+        except (OSError, pa.ArrowException):
+            pass
+
+    raw_df = read_raw_data(path)
+    if raw_df is None:
+        return None
+    df = preprocess_data(raw_df)[["Airline", "Journey_Day", "Journey_Month"] + FEATURE_COLUMNS + ["Price"]]
+    df = df.assign(Airline=df["Airline"].astype(str)).reset_index(drop=True)
+
+    if use_cache:
+        try:
+            os.makedirs(FEATURE_CACHE_DIR, exist_ok=True)
+            tmp = cache + ".tmp"
+            feather.write_feather(df, tmp, compression="uncompressed")
+            os.replace(tmp, cache)
+            for filename in os.listdir(FEATURE_CACHE_DIR):
+                if filename != os.path.basename(cache):
+                    os.remove(os.path.join(FEATURE_CACHE_DIR, filename))
+        except OSError as e:
+            print(f"⚠️ Could not write the feature cache: {e}")
+    return df
+
+def _artifact_report(path, train_seconds, **extra):
+    """Training time, on-disk size and a fresh (unregistered) load time for one artifact."""
+    start = time.perf_counter()
+    joblib.load(path)
+    return {"train_seconds": round(train_seconds, 3), "bytes": os.path.getsize(path),
+            "load_seconds": round(time.perf_counter() - start, 4), **extra}
+
+def _write_training_report(report):
+    """Prints the per-model report and merges it into TRAINING_REPORT_PATH."""
+    for name, r in report.items():
+        print(f"   📊 {name}: trained in {r['train_seconds']:.2f}s, "
+              f"{r['bytes'] / 1e6:.1f} MB on disk, loads in {r['load_seconds'] * 1000:.0f} ms")
+    saved = {}
+    if os.path.exists(TRAINING_REPORT_PATH):
+        with open(TRAINING_REPORT_PATH) as f:
+            saved = json.load(f)
+    saved.update(report)
+    with open(TRAINING_REPORT_PATH, "w") as f:
+        json.dump(saved, f, indent=2)
+
+def _fit_forest(model, X, y, n_jobs):
+    """Fits on every core, then leaves the model single-threaded for prediction."""
+    start = time.perf_counter()
+    model.set_params(n_jobs=n_jobs)
+    model.fit(X, y)
+    model.set_params(n_jobs=None, warm_start=False)
+    return time.perf_counter() - start
+
+def _compile_surface_for(reg, X):
+    print("   -> Compiling Price Lookup Surface...")
+    compile_price_surface(reg, n_airlines=int(X[:, 2].max()) + 1,
+                          max_duration=int(X[:, 0].max()) + 1,
+                          max_stops=int(X[:, 1].max()))
+
+def train_models(n_jobs=TRAIN_N_JOBS):
+    """
+    Trains the price (and, if missing, delay) models from scratch on every
+    core. Returns the per-model report (training time, size, load time), which
+    is also printed and saved to TRAINING_REPORT_PATH.
+    """
+    print("🧠 Training AI Models on REAL Data...")
+    os.makedirs("models", exist_ok=True)
+    
+    if not os.path.exists(DATA_PATH):
+        print(f"⚠️ File {DATA_PATH} not found!")
+        return
+
+    df = load_features(DATA_PATH)
+    if df is None:
+        return
+    report = {}
 
-    # Features & Targets
-    X = df[["Duration_Mins", "Total_Stops", "Airline_Encoded"]]
-    y_price = df["Price"]
+    # Features & Targets (plain arrays, as the models are queried with arrays)
+    X = df[FEATURE_COLUMNS].to_numpy()
+    y_price = df["Price"].to_numpy()
     
     # Train Price Model
     print("   -> Training Price Predictor...")
-    reg = RandomForestRegressor(n_estimators=100, random_state=42)
-    reg.fit(X, y_price)
-    joblib.dump(reg, PRICE_MODEL_PATH)
+    reg = RandomForestRegressor(n_estimators=PRICE_TREES, random_state=42)
+    seconds = _fit_forest(reg, X, y_price, n_jobs)
+    save_artifact(reg, PRICE_MODEL_PATH)
+    report["price"] = _artifact_report(PRICE_MODEL_PATH, seconds, trees=PRICE_TREES, rows=len(X))
+    _compile_surface_for(reg, X)
     
     # Train Delay Model (Simulated for now)
     if not os.path.exists(DELAY_MODEL_PATH):
@@ -87,40 +305,166 @@ def train_models():
         delay_prob = (weather / 15) + (dists / 30000) + (is_legacy * -0.1)
         labels = [1 if p > 0.5 else 0 for p in delay_prob]
         
-        clf = RandomForestClassifier(n_estimators=100)
-        clf.fit(pd.DataFrame({"Distance": dists, "Weather": weather, "AirlineType": is_legacy}), labels)
-        joblib.dump(clf, DELAY_MODEL_PATH)
+        clf = RandomForestClassifier(n_estimators=DELAY_TREES)
+        seconds = _fit_forest(clf, np.column_stack([dists, weather, is_legacy]), labels, n_jobs)
+        save_artifact(clf, DELAY_MODEL_PATH)
+        report["delay"] = _artifact_report(DELAY_MODEL_PATH, seconds, trees=DELAY_TREES, rows=n_samples)
     
+    _write_training_report(report)
     print("✅ All Models Saved.")
+    return report
 
-def predict_price(duration_mins, stops, airline_name):
-    # SAFETY CHECK: Ensure BOTH model and encoder exist
-    if not os.path.exists(PRICE_MODEL_PATH) or not os.path.exists(ENCODER_PATH): 
-        print("⚠️ Model or Encoder missing. Retraining systems...")
-        train_models()
-        
-    reg = joblib.load(PRICE_MODEL_PATH)
-    le_airline = joblib.load(ENCODER_PATH)
-    
+def update_price_model(n_new_trees=PRICE_TREES_PER_UPDATE, n_jobs=TRAIN_N_JOBS):
+    """
+    Incremental retrain after price rows were added to DATA_PATH: keeps the
+    existing trees and grows `n_new_trees` more on the current data
+    (warm_start). Falls back to `train_models` when there is no price model
+    yet or the airline set changed (the old trees' airline codes would be stale).
+    """
+    if not os.path.exists(PRICE_MODEL_PATH) or not os.path.exists(ENCODER_PATH):
+        return train_models(n_jobs)
+    old_classes = MODEL_REGISTRY.get(ENCODER_PATH).classes_
+    df = load_features(DATA_PATH)
+    if df is None:
+        return
+    if not np.array_equal(old_classes, MODEL_REGISTRY.get(ENCODER_PATH).classes_):
+        print("⚠️ Airline set changed. Retraining from scratch...")
+        return train_models(n_jobs)
+
+    print(f"🧠 Growing the price model by {n_new_trees} trees...")
+    reg = joblib.load(PRICE_MODEL_PATH) # a private, writable copy
+    X = df[FEATURE_COLUMNS].to_numpy()
+    reg.set_params(warm_start=True, n_estimators=len(reg.estimators_) + n_new_trees)
+    seconds = _fit_forest(reg, X, df["Price"].to_numpy(), n_jobs)
+    save_artifact(reg, PRICE_MODEL_PATH)
+    report = {"price": _artifact_report(PRICE_MODEL_PATH, seconds, trees=len(reg.estimators_), rows=len(X))}
+    _compile_surface_for(reg, X)
+    _write_training_report(report)
+    return report
+
+def compile_price_surface(reg=None, n_airlines=None, max_duration=48 * 60, max_stops=4, step=1,
+                          max_error=PRICE_SURFACE_MAX_ERROR):
+    """
+    Precomputes the price model over a (stops x airline x duration) grid and
+    saves it next to the price model. The grid is checked against the live
+    model first; if the worst error exceeds `max_error` (USD) it is discarded.
+    Returns the measured error in USD, or None when the surface was rejected.
+    """
+    if reg is None:
+        reg, le_airline = _load_models(PRICE_MODEL_PATH, ENCODER_PATH)
+        n_airlines = len(le_airline.classes_)
+
+    surface = build_price_surface(reg, n_airlines, max_duration, max_stops, step)
+    error = surface_error(surface, reg) * INR_TO_USD
+    if error > max_error:
+        print(f"⚠️ Price surface rejected: max error ${error:.2f} > ${max_error:.2f}")
+        for path in (PRICE_SURFACE_META_PATH, PRICE_SURFACE_PATH):
+            if os.path.exists(path): os.remove(path)
+        return None
+
+    save_price_surface(surface, PRICE_SURFACE_PATH, PRICE_SURFACE_META_PATH, PRICE_MODEL_PATH)
+    return error
+
+def _price_surface():
+    """The memory-mapped price surface, or None if missing or built from an older model."""
     try:
-        airline_enc = le_airline.transform([airline_name])[0]
-    except:
-        # Fallback if airline is unknown to the model
-        airline_enc = le_airline.transform([le_airline.classes_[0]])[0]
-        
-    price = reg.predict([[duration_mins, stops, airline_enc]])[0]
-    
+        # Keyed on the metadata, which `save_price_surface` replaces after the grid
+        surface = MODEL_REGISTRY.get(PRICE_SURFACE_META_PATH,
+                                     loader=lambda meta_path: load_price_surface(PRICE_SURFACE_PATH, meta_path))
+        model_mtime = os.stat(PRICE_MODEL_PATH).st_mtime_ns
+    except FileNotFoundError:
+        return None
+    return surface if surface.model_mtime_ns == model_mtime else None
+
+WEATHER_SCORES = {"clear": 0, "clouds": 3, "rain": 6, "snow": 8, "storm": 10}
+LEGACY_CARRIERS = ["qantas", "singapore", "emirates", "lufthansa"]
+
+def _column(values, n):
+    """Broadcasts a scalar or sequence to a 1-D array of length n."""
+    return np.broadcast_to(np.asarray(values), (n,)) if np.ndim(values) == 0 else np.asarray(values)
+
+def _batch_size(*columns):
+    """Common length of the sequence arguments; 1 when every argument is a scalar."""
+    lengths = [len(c) for c in columns if np.ndim(c) > 0]
+    return max(lengths) if lengths else 1
+
+def encode_airlines(le_airline, airline_names):
+    """LabelEncoder.transform for a whole batch; unknown airlines fall back to the first class."""
+    # classes_ is sorted, so a binary search replaces transform's per-call validation
+    classes = le_airline.classes_
+    names = np.asarray(airline_names, dtype=str)
+    codes = np.minimum(np.searchsorted(classes, names), len(classes) - 1)
+    codes[classes[codes] != names] = 0 # == le_airline.transform([le_airline.classes_[0]])[0]
+    return codes
+
+@timed("predict_prices")
+def predict_prices_batch(durations, stops, airlines):
+    """
+    Price (USD) for many legs with one model call.
+    `durations` (minutes), `stops` and `airlines` (names) are equal-length
+    sequences; scalars are broadcast. Returns a NumPy array.
+    Rows covered by the precomputed price surface are answered from it and
+    the forest is only consulted for the rest.
+    """
+    le_airline, = _load_models(ENCODER_PATH)
+
+    n = _batch_size(durations, stops, airlines)
+    if n == 0:
+        return np.empty(0)
+    durations, stops = _column(durations, n), _column(stops, n)
+    airline_codes = encode_airlines(le_airline, _column(airlines, n))
+
+    prices = np.empty(n)
+    todo = np.ones(n, dtype=bool)
+    surface = _price_surface() if USE_PRICE_SURFACE else None
+    if surface is not None:
+        hit = surface.covers(stops)
+        start = time.perf_counter()
+        prices[hit] = surface.lookup(durations[hit], stops[hit], airline_codes[hit])
+        MODEL_REGISTRY.record_inference("price_surface", time.perf_counter() - start, int(hit.sum()))
+        todo = ~hit
+
+    if todo.any():
+        # Resident models (loaded once, retrained if model or encoder is missing)
+        reg, = _load_models(PRICE_MODEL_PATH)
+        X = np.column_stack([durations[todo], stops[todo], airline_codes[todo]])
+        start = time.perf_counter()
+        prices[todo] = reg.predict(X)
+        MODEL_REGISTRY.record_inference("price", time.perf_counter() - start, int(todo.sum()))
+
     # Convert INR to USD
-    return round(price * 0.012, 2)
+    return np.round(prices * INR_TO_USD, 2)
+
+@timed("predict_delays")
+def predict_delays_batch(distances, weather_conditions, airlines):
+    """
+    Delay probability for many legs with one model call.
+    `distances` (km), `weather_conditions` and `airlines` (names) are
+    equal-length sequences; scalars are broadcast. Returns a NumPy array.
+    """
+    clf, = _load_models(DELAY_MODEL_PATH)
+
+    n = _batch_size(distances, weather_conditions, airlines)
+    if n == 0:
+        return np.empty(0)
+
+    # Last matching keyword wins, as in the original per-leg loop
+    weather = pd.Series(_column(weather_conditions, n), dtype=object).astype(str).str.lower()
+    w_score = np.zeros(n, dtype=int)
+    for k, v in WEATHER_SCORES.items():
+        w_score[weather.str.contains(k, regex=False).to_numpy()] = v
+
+    names = pd.Series(_column(airlines, n), dtype=object).str.lower()
+    is_legacy = names.str.contains("|".join(LEGACY_CARRIERS), regex=True).fillna(False).to_numpy().astype(int)
+
+    X = np.column_stack([_column(distances, n), w_score, is_legacy])
+    start = time.perf_counter()
+    probs = clf.predict_proba(X)[:, 1]
+    MODEL_REGISTRY.record_inference("delay", time.perf_counter() - start, n)
+    return probs
+
+def predict_price(duration_mins, stops, airline_name):
+    return float(predict_prices_batch([duration_mins], [stops], [airline_name])[0])
 
 def predict_delay(distance, weather_condition, airline_name):
-    if not os.path.exists(DELAY_MODEL_PATH): train_models()
-    clf = joblib.load(DELAY_MODEL_PATH)
-    
-    weather_map = {"clear": 0, "clouds": 3, "rain": 6, "snow": 8, "storm": 10}
-    w_score = 0
-    for k, v in weather_map.items():
-        if k in weather_condition.lower(): w_score = v
-            
-    is_legacy = 1 if any(x in airline_name.lower() for x in ["qantas", "singapore", "emirates", "lufthansa"]) else 0
-    return clf.predict_proba([[distance, w_score, is_legacy]])[0][1]
\ No newline at end of file
+    return float(predict_delays_batch([distance], [weather_condition], [airline_name])[0])
@@ -0,0 +1,376 @@
+# src/network.py
+import numpy as np
+import pandas as pd
+from scipy.sparse import csr_matrix
+from scipy.sparse.csgraph import dijkstra
+
+from src.logic import haversine_np, route_edges
+from src.search import INF, check_strategy, k_shortest_paths, search, with_endpoints
+
+
+class FlightNetwork:
+    """
+    Compact, array-backed airport network.
+
+    Airports are integer ids (0..n-1) and the undirected adjacency is stored in
+    CSR form: the neighbours of airport `i` are `targets[offsets[i]:offsets[i+1]]`
+    with matching `distances` and `edge_ids` (the undirected edge behind each
+    position). Per edge, `edge_airline` indexes `airline_names` (the label the
+    networkx graph keeps) and `carrier_ids[carrier_offsets[e]:carrier_offsets[e+1]]`
+    index `carrier_codes`/`carrier_names` for every airline flying it.
+    """
+
+    def __init__(self, codes, lat, lon, city, name, offsets, targets, distances, edge_ids,
+                 edge_airline, airline_names, carrier_offsets, carrier_ids, carrier_codes, carrier_names):
+        self.codes = codes
+        self.lat = lat
+        self.lon = lon
+        self.city = city
+        self.name = name
+        self.offsets = offsets
+        self.targets = targets
+        self.distances = distances
+        self.edge_ids = edge_ids
+        self.edge_airline = edge_airline
+        self.airline_names = airline_names
+        self.carrier_offsets = carrier_offsets
+        self.carrier_ids = carrier_ids
+        self.carrier_codes = carrier_codes
+        self.carrier_names = carrier_names
+        self.index = {code: i for i, code in enumerate(codes.tolist())}
+        self._matrix = None
+        self.oracle = None # optional DistanceOracle, enables the "alt" strategy
+        self.reachability = None # optional ReachabilityIndex, answers "no route" without searching
+        self._make_views()
+
+    def _make_views(self):
+        # Buffer views index into the arrays without creating NumPy scalars
+        self._offsets_view = memoryview(self.offsets)
+        self._targets_view = memoryview(self.targets)
+        self._distances_view = memoryview(self.distances)
+
+    def __getstate__(self):
+        # memoryviews can't be pickled (e.g. when sent to spawned worker processes)
+        state = self.__dict__.copy()
+        for key in ("_offsets_view", "_targets_view", "_distances_view"):
+            del state[key]
+        return state
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self._make_views()
+
+    # --- Construction ---
+    @classmethod
+    def from_edges(cls, valid_airports, edges, airline_dict):
+        """Builds the network from the tables returned by `route_edges`."""
+        # Airports are numbered in order of first appearance, like networkx nodes
+        endpoints = np.column_stack([edges["Source"].to_numpy(), edges["Dest"].to_numpy()]).ravel()
+        codes = pd.unique(endpoints)
+        node_index = pd.Index(codes)
+        attrs = valid_airports.set_index("IATA").loc[codes]
+
+        return cls._from_arrays(
+            codes.astype(object),
+            attrs["Latitude"].to_numpy(dtype=np.float64),
+            attrs["Longitude"].to_numpy(dtype=np.float64),
+            attrs["City"].to_numpy(dtype=object),
+            attrs["Name"].to_numpy(dtype=object),
+            node_index.get_indexer(edges["Source"]).astype(np.int32),
+            node_index.get_indexer(edges["Dest"]).astype(np.int32),
+            edges["Distance"].to_numpy(dtype=np.float64),
+            edges["Airline"].tolist(),
+            edges["Carriers"].tolist(),
+            airline_dict,
+        )
+
+    @classmethod
+    def from_graph(cls, G):
+        """Converts a `build_graph` networkx graph into a compact network."""
+        codes = np.array(list(G.nodes), dtype=object)
+        index = {code: i for i, code in enumerate(codes.tolist())}
+        edges = list(G.edges(data=True))
+        nodes = G.nodes
+        return cls._from_arrays(
+            codes,
+            np.array([nodes[c]["Latitude"] for c in codes], dtype=np.float64),
+            np.array([nodes[c]["Longitude"] for c in codes], dtype=np.float64),
+            np.array([nodes[c]["City"] for c in codes], dtype=object),
+            np.array([nodes[c]["Name"] for c in codes], dtype=object),
+            np.fromiter((index[u] for u, _, _ in edges), dtype=np.int32, count=len(edges)),
+            np.fromiter((index[v] for _, v, _ in edges), dtype=np.int32, count=len(edges)),
+            np.fromiter((d["distance"] for _, _, d in edges), dtype=np.float64, count=len(edges)),
+            [d["airline"] for _, _, d in edges],
+            [d["airlines"] for _, _, d in edges],
+            G.graph.get("airline_names", {}),
+        )
+
+    @classmethod
+    def _from_arrays(cls, codes, lat, lon, city, name, src, dst, dist, airlines, carriers, airline_dict):
+        n = len(codes)
+        # Store every undirected edge in both directions, grouped by source airport.
+        # The stable sort keeps each airport's neighbours in edge insertion order.
+        heads = np.concatenate([src, dst])
+        tails = np.concatenate([dst, src])
+        order = np.argsort(heads, kind="stable")
+        offsets = np.zeros(n + 1, dtype=np.int32)
+        np.cumsum(np.bincount(heads, minlength=n), out=offsets[1:])
+        edge_ids = np.concatenate([np.arange(len(src)), np.arange(len(src))])[order].astype(np.int32)
+
+        edge_airline, airline_names = pd.factorize(pd.Series(airlines, dtype=object), use_na_sentinel=False)
+
+        # Every carrier of every edge, flattened edge by edge
+        counts = np.fromiter((len(c) for c in carriers), dtype=np.int32, count=len(carriers))
+        carrier_offsets = np.zeros(len(carriers) + 1, dtype=np.int32)
+        np.cumsum(counts, out=carrier_offsets[1:])
+        flat = [code for c in carriers for code in sorted(c)]
+        carrier_ids, carrier_codes = pd.factorize(pd.Series(flat, dtype=object))
+        carrier_codes = np.asarray(carrier_codes, dtype=object)
+
+        return cls(
+            codes, lat, lon, city, name,
+            offsets,
+            tails[order].astype(np.int32),
+            np.concatenate([dist, dist])[order],
+            edge_ids,
+            edge_airline.astype(np.int32),
+            list(airline_names),
+            carrier_offsets,
+            carrier_ids.astype(np.int32),
+            carrier_codes,
+            [airline_dict.get(code, code) for code in carrier_codes],
+        )
+
+    # --- Basic queries ---
+    def __contains__(self, code):
+        return code in self.index
+
+    def __len__(self):
+        return len(self.codes)
+
+    def number_of_nodes(self):
+        return len(self.codes)
+
+    def number_of_edges(self):
+        return len(self.targets) // 2
+
+    def nbytes(self):
+        """Approximate memory held by the network's arrays (excluding interned strings)."""
+        arrays = [self.codes, self.lat, self.lon, self.city, self.name, self.offsets, self.targets,
+                  self.distances, self.edge_ids, self.edge_airline, self.carrier_offsets,
+                  self.carrier_ids, self.carrier_codes]
+        return sum(a.nbytes for a in arrays)
+
+    def coords(self, i):
+        return (float(self.lat[i]), float(self.lon[i]))
+
+    # --- Airline filtering ---
+    def allowed_positions(self, airlines):
+        """Boolean mask over CSR positions: True where one of `airlines` (IATA codes) flies the edge."""
+        n_edges = len(self.carrier_offsets) - 1
+        wanted = np.isin(self.carrier_codes, list(airlines))
+        edge_of_carrier = np.repeat(np.arange(n_edges), np.diff(self.carrier_offsets))
+        per_edge = np.bincount(edge_of_carrier, weights=wanted[self.carrier_ids], minlength=n_edges) > 0
+        return per_edge[self.edge_ids]
+
+    def edge_airline_name(self, e, airlines=None):
+        """Airline label for CSR position `e`, picked among `airlines` when a filter is given."""
+        edge = self.edge_ids[e]
+        if airlines is None:
+            return self.airline_names[self.edge_airline[edge]]
+        lo, hi = self.carrier_offsets[edge], self.carrier_offsets[edge + 1]
+        _, i = min((self.carrier_codes[i], i) for i in self.carrier_ids[lo:hi].tolist()
+                   if self.carrier_codes[i] in airlines)
+        return self.carrier_names[i]
+
+    def attach_oracle(self, oracle):
+        """Uses a `DistanceOracle` built from this network for "alt" searches."""
+        if oracle.codes.tolist() != self.codes.tolist():
+            raise ValueError("Distance oracle was built for a different network")
+        self.oracle = oracle
+
+    # --- Routing ---
+    def _maybe_connected(self, sources, targets):
+        """False only when the reachability index proves no origin id is connected to any destination id."""
+        if self.reachability is None:
+            return True
+        component = self.reachability.component
+        return bool(np.isin(component[targets], component[sources]).any())
+
+    def matrix(self, mask=None):
+        """The adjacency as a scipy CSR matrix (restricted to `mask` positions if given)."""
+        n = len(self.codes)
+        if mask is not None:
+            kept = np.concatenate([[0], np.cumsum(mask)]).astype(np.int32)
+            return csr_matrix((self.distances[mask], self.targets[mask], kept[self.offsets]), shape=(n, n))
+        if self._matrix is None:
+            self._matrix = csr_matrix((self.distances, self.targets, self.offsets), shape=(n, n))
+        return self._matrix
+
+    def edge_position(self, u, v, mask=None):
+        """CSR position of the cheapest u->v edge (among `mask` positions if given)."""
+        lo, hi = int(self.offsets[u]), int(self.offsets[u + 1])
+        hit = self.targets[lo:hi] == v
+        if mask is not None:
+            hit &= mask[lo:hi]
+        hits = np.flatnonzero(hit) + lo
+        return int(hits[np.argmin(self.distances[hits])])
+
+    def path_details(self, node_path, edge_positions, airlines=None):
+        """Turns a list of airport ids (and the CSR edges used) into `find_shortest_path` leg dicts."""
+        details = []
+        total_dist = 0
+        for (u, v), e in zip(zip(node_path, node_path[1:]), edge_positions):
+            dist = float(self.distances[e])
+            total_dist += dist
+            details.append({
+                "from": self.codes[u], "to": self.codes[v],
+                "airline": self.edge_airline_name(e, airlines),
+                "distance": dist,
+                "coords_u": self.coords(u),
+                "coords_v": self.coords(v)
+            })
+        return details, total_dist
+
+    def neighbors(self, u):
+        """Yields (neighbour_id, distance, edge_position) for airport id `u`."""
+        offsets = self._offsets_view
+        lo, hi = offsets[u], offsets[u + 1]
+        return zip(self._targets_view[lo:hi], self._distances_view[lo:hi], range(lo, hi))
+
+    def masked_neighbors(self, mask):
+        """`neighbors` restricted to the CSR positions where `mask` is True."""
+        allowed = memoryview(mask)
+
+        def neighbors(u):
+            return [(v, w, e) for v, w, e in self.neighbors(u) if allowed[e]]
+        return neighbors
+
+    def shortest_path_tree(self, sources, mask=None):
+        """
+        Distances and predecessors from one or more source ids in a single
+        compiled call: (dist, pred) arrays with one row per source.
+        """
+        return dijkstra(self.matrix(mask), indices=sources, return_predecessors=True)
+
+    def tree_path(self, pred, s, t, mask=None):
+        """(node_path, edge_positions) from `s` to `t` along a predecessor row."""
+        node_path = [t]
+        while node_path[-1] != s:
+            node_path.append(int(pred[node_path[-1]]))
+        node_path.reverse()
+        edge_positions = [self.edge_position(u, v, mask) for u, v in zip(node_path, node_path[1:])]
+        return node_path, edge_positions
+
+    def _scipy_dijkstra(self, sources, targets, mask=None):
+        """
+        Dijkstra from every id in `sources` at once (compiled code) to the
+        nearest of `targets`; returns (nodes, edges, distance, expanded).
+        """
+        dist, pred, origin = dijkstra(self.matrix(mask), indices=sources, return_predecessors=True, min_only=True)
+        expanded = int(np.isfinite(dist).sum())
+        t = targets[int(np.argmin(dist[targets]))]
+        if not np.isfinite(dist[t]):
+            return None, None, float("inf"), expanded
+        node_path, edge_positions = self.tree_path(pred, int(origin[t]), t, mask)
+        return node_path, edge_positions, float(dist[t]), expanded
+
+    def shortest_path(self, src, dest, strategy="dijkstra", stats=None, airlines=None):
+        """Same contract as `logic.find_shortest_path`: (legs, total_km) or (None, 0)."""
+        check_strategy(strategy)
+        sources = [self.index[c] for c in ([src] if isinstance(src, str) else src) if c in self.index]
+        targets = [self.index[c] for c in ([dest] if isinstance(dest, str) else dest) if c in self.index]
+        targets = [t for t in targets if t not in sources] # a route takes at least one flight
+        if not sources or not targets:
+            return None, 0
+        if not self._maybe_connected(sources, targets):
+            if stats is not None:
+                stats.update({"strategy": strategy, "expanded": 0})
+            return None, 0
+        if airlines is not None:
+            airlines = frozenset(airlines)
+        mask = None if airlines is None else self.allowed_positions(airlines)
+        requested = strategy
+
+        if strategy == "dijkstra":
+            node_path, edge_positions, _, expanded = self._scipy_dijkstra(sources, targets, mask)
+        else:
+            h = None # bidirectional Dijkstra never calls the heuristic
+            if strategy in ("astar", "alt"):
+                # Great-circle distance to the (nearest) destination for every airport, in one pass
+                h = np.min([haversine_np(self.lon, self.lat, self.lon[t], self.lat[t]) for t in targets], axis=0)
+            if strategy == "alt":
+                # Landmark bounds are usually far tighter; the max of two lower bounds is one too
+                if self.oracle is not None:
+                    h = np.maximum(h, np.min([self.oracle.lower_bounds(t) for t in targets], axis=0))
+                strategy = "astar"
+            neighbors = self.neighbors if mask is None else self.masked_neighbors(mask)
+
+            if len(sources) == 1 and len(targets) == 1:
+                node_path, edge_positions, _, expanded = search(
+                    neighbors, sources[0], targets[0], strategy, None if h is None else h.tolist().__getitem__)
+            else:
+                # Virtual ids n / n+1 join every origin / destination airport
+                n = len(self.codes)
+                neighbors = with_endpoints(neighbors, sources, targets, n, n + 1)
+                h = None if h is None else (h.tolist() + [0.0, 0.0]).__getitem__
+                node_path, edge_positions, _, expanded = search(neighbors, n, n + 1, strategy, h)
+                if node_path is not None:
+                    node_path, edge_positions = node_path[1:-1], edge_positions[1:-1]
+
+        if stats is not None:
+            stats.update({"strategy": requested, "expanded": expanded})
+        if node_path is None:
+            return None, 0
+        return self.path_details(node_path, edge_positions, airlines)
+
+    def k_shortest_paths(self, src, dest, k=3, max_stops=None, detour_ratio=None, stats=None, airlines=None):
+        """Same contract as `logic.find_k_shortest_paths`: a list of (legs, total_km)."""
+        sources = [self.index[c] for c in ([src] if isinstance(src, str) else src) if c in self.index]
+        targets = [self.index[c] for c in ([dest] if isinstance(dest, str) else dest) if c in self.index]
+        targets = [t for t in targets if t not in sources] # a route takes at least one flight
+        if not sources or not targets:
+            return []
+        if not self._maybe_connected(sources, targets):
+            if stats is not None:
+                stats.update({"strategy": "yen", "expanded": 0})
+            return []
+        if airlines is not None:
+            airlines = frozenset(airlines)
+        mask = None if airlines is None else self.allowed_positions(airlines)
+
+        # Exact distance and leg count to the (nearest) destination from every
+        # airport, computed once in compiled code and shared by all spur searches
+        to_dest = dijkstra(self.matrix(mask), indices=targets, min_only=True)
+        hops_to_dest = dijkstra(self.matrix(mask), indices=targets, min_only=True, unweighted=True)
+        neighbors = self.neighbors if mask is None else self.masked_neighbors(mask)
+        if len(sources) == 1 and len(targets) == 1:
+            s, t, virtual_legs = sources[0], targets[0], 0
+        else:
+            # Virtual ids n / n+1 join every origin / destination airport
+            n = len(self.codes)
+            s, t, virtual_legs = n, n + 1, 2
+            neighbors = with_endpoints(neighbors, sources, targets, s, t)
+            to_dest = np.append(to_dest, [to_dest[sources].min(), 0.0])
+            hops_to_dest = np.append(hops_to_dest + 1, [hops_to_dest[sources].min() + 2, 0.0])
+        if not np.isfinite(to_dest[s]):
+            return []
+        max_dist = float(to_dest[s]) * detour_ratio if detour_ratio is not None else INF
+
+        paths, expanded = k_shortest_paths(
+            neighbors, s, t, k,
+            to_target=to_dest.tolist().__getitem__,
+            hops_to_target=hops_to_dest.tolist().__getitem__,
+            max_edges=None if max_stops is None else max_stops + 1 + virtual_legs,
+            max_dist=max_dist,
+        )
+        if virtual_legs:
+            paths = [(nodes[1:-1], edges[1:-1], dist) for nodes, edges, dist in paths]
+        if stats is not None:
+            stats.update({"strategy": "yen", "expanded": expanded})
+        return [self.path_details(nodes, edges, airlines) for nodes, edges, _ in paths]
+
+
+def build_network(routes, airports, airlines):
+    """Array-backed counterpart of `logic.build_graph`."""
+    return FlightNetwork.from_edges(*route_edges(routes, airports, airlines))
@@ -0,0 +1,127 @@
+# src/place_index.py
+"""
+Prebuilt search index for resolving free-text place names to airports.
+
+Every airport contributes three searchable fields (city, airport name and
+country) plus exact IATA/ICAO codes. Queries are answered from hash maps and
+a character-trigram inverted index, so lookups don't scan the airport table
+and tolerate typos ("Sydny") and metro codes ("NYC").
+"""
+import re
+import unicodedata
+from collections import defaultdict
+
+import numpy as np
+
+# Metropolitan-area codes that are not airport codes themselves
+METRO_ALIASES = {
+    "nyc": "new york", "lon": "london", "par": "paris", "tyo": "tokyo", "chi": "chicago",
+    "was": "washington", "mow": "moscow", "mil": "milan", "rom": "rome", "sao": "sao paulo",
+    "rio": "rio de janeiro", "bue": "buenos aires", "yto": "toronto", "ymq": "montreal",
+    "osa": "osaka", "sel": "seoul", "bjs": "beijing", "sto": "stockholm", "jkt": "jakarta",
+    "bkk": "bangkok", "la": "los angeles", "sf": "san francisco", "new delhi": "delhi",
+}
+
+# Base score per kind of match; popularity only reorders within a few tenths
+SCORE_CODE = 4.0
+SCORE_EXACT = {"city": 3.5, "name": 3.2, "country": 2.5}
+SCORE_CITY_PREFIX = 2.2
+SCORE_SUBSTRING = 2.0
+SCORE_FUZZY = 1.0 # + similarity in [0, 1]
+POPULARITY_WEIGHT = 0.25
+MIN_SIMILARITY = 0.5
+
+FIELDS = ("city", "name", "country")
+
+
+def normalize(text):
+    """Lowercase ASCII words separated by single spaces."""
+    text = unicodedata.normalize("NFKD", str(text)).encode("ascii", "ignore").decode()
+    return " ".join(re.sub(r"[^a-z0-9]+", " ", text.lower()).split())
+
+
+def trigrams(text):
+    """Character trigrams with word-boundary padding ('sydney' -> ' sy', 'syd', ..., 'ey ')."""
+    padded = f" {text} "
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+
+class PlaceIndex:
+    """Ranks airports for a place-name query; build once per airports table."""
+
+    def __init__(self, airports):
+        self.labels = airports["Label"].tolist()
+        counts = airports["RouteCount"].to_numpy(dtype=float)
+        self.popularity = POPULARITY_WEIGHT * np.log1p(counts) / np.log1p(max(counts.max(), 1))
+
+        self.codes = defaultdict(list)
+        for col in ("IATA", "ICAO"):
+            for row, code in enumerate(airports[col].tolist()):
+                if isinstance(code, str) and code:
+                    self.codes[code.lower()].append(row)
+
+        # One document per (airport, field): doc = row * len(FIELDS) + field
+        self.exact = {field: defaultdict(list) for field in FIELDS}
+        self.doc_text = []
+        postings = defaultdict(list)
+        columns = [airports[col].tolist() for col in ("City", "Name", "Country")]
+        for row, values in enumerate(zip(*columns)):
+            for field, value in zip(FIELDS, values):
+                text = normalize(value) if isinstance(value, str) else ""
+                doc = len(self.doc_text)
+                self.doc_text.append(text)
+                if text:
+                    self.exact[field][text].append(row)
+                    for gram in trigrams(text):
+                        postings[gram].append(doc)
+        self.doc_grams = np.array([len(trigrams(t)) if t else 0 for t in self.doc_text], dtype=np.float64)
+        self.postings = {gram: np.array(docs, dtype=np.int32) for gram, docs in postings.items()}
+
+    def search(self, query, k=5):
+        """Top-k (label, score) matches for a place name, best first."""
+        q = normalize(query)
+        if not q:
+            return []
+        q = METRO_ALIASES.get(q, q)
+        scores = {}
+
+        def offer(rows, score):
+            for row in rows:
+                if score > scores.get(row, 0):
+                    scores[row] = score
+
+        offer(self.codes.get(q, ()), SCORE_CODE)
+        for field in FIELDS:
+            offer(self.exact[field].get(q, ()), SCORE_EXACT[field])
+
+        # Trigram overlap per document, in one vectorized pass
+        q_grams = trigrams(q)
+        lists = [self.postings[g] for g in q_grams if g in self.postings]
+        if lists:
+            n_q = len(q_grams)
+            shared = np.bincount(np.concatenate(lists), minlength=len(self.doc_text))
+            docs = np.flatnonzero(shared)
+            hits = shared[docs]
+            similarity = (hits / n_q + 2 * hits / (n_q + self.doc_grams[docs])) / 2
+            keep = (hits == n_q) | (similarity >= MIN_SIMILARITY)
+
+            for doc, n_hits, sim in zip(docs[keep].tolist(), hits[keep].tolist(), similarity[keep].tolist()):
+                text = self.doc_text[doc]
+                row, field = divmod(doc, len(FIELDS))
+                if n_hits == n_q and q in text:
+                    # Every trigram present and a real substring (the old label-scan semantics)
+                    score = SCORE_CITY_PREFIX if field == 0 and text.startswith(q) else SCORE_SUBSTRING
+                elif sim >= MIN_SIMILARITY:
+                    score = SCORE_FUZZY + sim
+                else:
+                    continue
+                if score > scores.get(row, 0):
+                    scores[row] = score
+
+        ranked = sorted(scores.items(), key=lambda item: item[1] + self.popularity[item[0]], reverse=True)
+        return [(self.labels[row], float(score + self.popularity[row])) for row, score in ranked[:k]]
+
+    def resolve(self, query):
+        """Best matching airport label, or None."""
+        matches = self.search(query, k=1)
+        return matches[0][0] if matches else None
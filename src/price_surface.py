@@ -0,0 +1,86 @@
+# src/price_surface.py
+"""
+Precomputed price surface for the price model.
+
+The price model only sees three low-cardinality features (duration in whole
+minutes, stops, encoded airline), so its whole input space fits in a small
+grid: surface[stops, airline, duration_bucket] holds the raw (INR) model
+output. Lookups interpolate along the duration axis instead of walking the
+forest's trees.
+"""
+import json
+import os
+
+import numpy as np
+
+
+class PriceSurface:
+    """A (stops x airline x duration) grid of price-model outputs, usually memory-mapped."""
+
+    def __init__(self, grid, step, model_mtime_ns=None):
+        self.grid = grid
+        self.step = step
+        self.model_mtime_ns = model_mtime_ns
+        self.max_stops = grid.shape[0] - 1
+        self.max_duration = (grid.shape[2] - 1) * step
+
+    def covers(self, stops):
+        """Rows whose stop count is inside the grid (durations are clamped, airlines always are)."""
+        stops = np.asarray(stops)
+        return (stops >= 0) & (stops <= self.max_stops) & (stops == np.floor(stops))
+
+    def lookup(self, durations, stops, airline_codes):
+        """Raw model output (INR) for covered rows, interpolated linearly between duration buckets."""
+        # The forest is constant past the longest training duration, so clamping is exact there
+        pos = np.clip(np.asarray(durations, dtype=np.float64), 0, self.max_duration) / self.step
+        lo = np.minimum(np.floor(pos).astype(np.intp), self.grid.shape[2] - 2)
+        frac = pos - lo
+        s = np.asarray(stops, dtype=np.intp)
+        a = np.asarray(airline_codes, dtype=np.intp)
+        return self.grid[s, a, lo] * (1 - frac) + self.grid[s, a, lo + 1] * frac
+
+
+def build_price_surface(reg, n_airlines, max_duration, max_stops, step=1):
+    """Evaluates the model once over every grid cell; returns a PriceSurface."""
+    durations = np.arange(0, max_duration + step, step, dtype=np.float64)
+    S, A, D = np.meshgrid(np.arange(max_stops + 1), np.arange(n_airlines), durations, indexing="ij")
+    X = np.column_stack([D.ravel(), S.ravel(), A.ravel()])
+    grid = reg.predict(X).astype(np.float32).reshape(S.shape)
+    return PriceSurface(grid, step)
+
+
+def surface_error(surface, reg, n_checks=5000, seed=0):
+    """
+    Largest absolute difference (model units) between the surface and the live
+    model on random in-domain inputs (whole-minute durations, as used by the app).
+    """
+    rng = np.random.default_rng(seed)
+    durations = rng.integers(0, surface.max_duration + 1, n_checks)
+    stops = rng.integers(0, surface.max_stops + 1, n_checks)
+    airlines = rng.integers(0, surface.grid.shape[1], n_checks)
+    live = reg.predict(np.column_stack([durations, stops, airlines]))
+    return float(np.max(np.abs(surface.lookup(durations, stops, airlines) - live)))
+
+
+def save_price_surface(surface, path, meta_path, model_path):
+    """
+    Writes the grid (.npy) and its metadata, tagged with the model file it was
+    built from. Both files are replaced atomically, the metadata last: loaders
+    key on the metadata file, so they never pair a new grid with old metadata.
+    """
+    tmp = path + ".tmp.npy"
+    np.save(tmp, surface.grid)
+    meta = {"step": surface.step, "shape": list(surface.grid.shape),
+            "model_mtime_ns": os.stat(model_path).st_mtime_ns}
+    meta_tmp = meta_path + ".tmp"
+    with open(meta_tmp, "w") as f:
+        json.dump(meta, f)
+    os.replace(tmp, path)
+    os.replace(meta_tmp, meta_path)
+
+
+def load_price_surface(path, meta_path):
+    """Memory-maps a saved surface (reload it when `meta_path` changes; it is written last)."""
+    with open(meta_path) as f:
+        meta = json.load(f)
+    return PriceSurface(np.load(path, mmap_mode="r"), meta["step"], meta["model_mtime_ns"])
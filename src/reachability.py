@@ -0,0 +1,163 @@
+# src/reachability.py
+"""
+Connectivity and bounded-hop reachability index for the flight network.
+
+* Connected-component ids answer "is there any route at all?" in O(1), so
+  searches between disconnected airports return at once instead of exploring
+  the whole origin component first.
+* For every airport and every stop limit up to MAX_STOPS, the set of airports
+  reachable within that many stops is stored as a packed bitset row (one bit
+  per airport, ~400 bytes per row on the bundled data). The rows are built
+  level by level with a vectorized OR over each airport's neighbours.
+
+Isochrone queries ("everywhere within 2 stops" / "within 8,000 km" / both)
+return parallel arrays of codes, coordinates, stops and distances, ready to be
+drawn on a map.
+"""
+import numpy as np
+from scipy.sparse.csgraph import connected_components, dijkstra
+
+from src.network import FlightNetwork
+
+MAX_STOPS = 3
+
+
+def _as_network(G):
+    return G if isinstance(G, FlightNetwork) else FlightNetwork.from_graph(G)
+
+
+def hop_bitsets(network, max_hops):
+    """
+    (max_hops, n, ceil(n / 8)) uint8 array: bit j of row [h - 1, i] is set when
+    airport j can be reached from airport i with at most h flights.
+    """
+    n = len(network)
+    offsets, targets = network.offsets, network.targets
+    reach = np.packbits(np.eye(n, dtype=bool), axis=1)
+    isolated = np.diff(offsets) == 0
+    # reduceat needs a valid start for every airport, so pad with an empty row
+    starts = np.minimum(offsets[:-1], len(targets))
+    levels = np.empty((max_hops,) + reach.shape, dtype=np.uint8)
+    for h in range(max_hops):
+        gathered = np.vstack([reach[targets], np.zeros((1, reach.shape[1]), dtype=np.uint8)])
+        via_neighbors = np.bitwise_or.reduceat(gathered, starts, axis=0)
+        via_neighbors[isolated] = 0
+        reach = levels[h] = reach | via_neighbors
+    return levels
+
+
+class ReachabilityIndex:
+    """Component ids and bounded-hop reachability bitsets for one network."""
+
+    def __init__(self, network, component, levels):
+        self.network = network
+        self.codes = network.codes
+        self.index = network.index
+        self.component = component
+        self.levels = levels # levels[s] = reachable with at most s stops (s + 1 flights)
+        self.max_stops = len(levels) - 1
+
+    @classmethod
+    def build(cls, G, max_stops=MAX_STOPS):
+        network = _as_network(G)
+        _, component = connected_components(network.matrix(), directed=False)
+        return cls(network, component.astype(np.int32), hop_bitsets(network, max_stops + 1))
+
+    # --- Connectivity ---
+    def connected(self, src, dest):
+        """True if any route joins the two airport codes."""
+        i, j = self.index.get(src), self.index.get(dest)
+        return i is not None and j is not None and self.component[i] == self.component[j]
+
+    def any_connected(self, sources, targets):
+        """True if any airport code in `sources` is connected to any in `targets`."""
+        src = {int(self.component[self.index[c]]) for c in sources if c in self.index}
+        return any(int(self.component[self.index[c]]) in src for c in targets if c in self.index)
+
+    def within_stops(self, src, dest, stops):
+        """True if `dest` can be reached from `src` with at most `stops` stops (stops <= max_stops)."""
+        i, j = self.index.get(src), self.index.get(dest)
+        if i is None or j is None:
+            return False
+        return bool(self.levels[stops, i, j >> 3] & (0x80 >> (j & 7)))
+
+    def count_within_stops(self, src, stops):
+        """Number of airports (including `src`) reachable with at most `stops` stops."""
+        return int(np.unpackbits(self.levels[stops, self.index[src]]).sum())
+
+    # --- Isochrones ---
+    def _min_stops(self, i, ids, max_stops):
+        """Fewest stops to each of `ids` (all within `max_stops`), from the bitset levels."""
+        bits = np.unpackbits(self.levels[:max_stops + 1, i], axis=1, count=len(self.codes))[:, ids]
+        return np.argmax(bits, axis=0) # level s holds the airports within s stops
+
+    def _hop_bounded_distances(self, i, flights):
+        """Shortest distance from airport id `i` using at most `flights` flights (Bellman-Ford rounds)."""
+        net = self.network
+        sources = np.repeat(np.arange(len(net.codes)), np.diff(net.offsets))
+        dist = np.full(len(net.codes), np.inf)
+        dist[i] = 0.0
+        for _ in range(flights):
+            relaxed = dist.copy()
+            np.minimum.at(relaxed, net.targets, dist[sources] + net.distances)
+            if np.array_equal(relaxed, dist):
+                break
+            dist = relaxed
+        return dist
+
+    def reachable(self, src, max_stops=None, max_km=None):
+        """
+        Isochrone from `src`: every other airport reachable with at most
+        `max_stops` stops and/or a route of at most `max_km` km. Returns a dict
+        of parallel arrays "codes", "lat", "lon", "stops" (fewest stops) and
+        "km" (shortest route distance; with both limits, the shortest within
+        the stop limit), nearest first.
+        """
+        if src not in self.index:
+            return {key: np.empty(0) for key in ("codes", "lat", "lon", "stops", "km")}
+        i = self.index[src]
+        net = self.network
+        if max_stops is not None and max_km is None and max_stops <= self.max_stops:
+            row = np.unpackbits(self.levels[max_stops, i], count=len(self.codes)).astype(bool)
+            km = None
+        elif max_stops is not None:
+            km = self._hop_bounded_distances(i, max_stops + 1)
+            row = np.isfinite(km) if max_km is None else km <= max_km
+        else:
+            km = dijkstra(net.matrix(), indices=i, limit=np.inf if max_km is None else max_km)
+            row = np.isfinite(km)
+        row[i] = False
+        ids = np.flatnonzero(row)
+
+        if km is None:
+            km = dijkstra(net.matrix(), indices=i)
+        if max_stops is not None and max_stops <= self.max_stops:
+            stops = self._min_stops(i, ids, max_stops)
+        else:
+            hops = dijkstra(net.matrix(), indices=i, unweighted=True)
+            stops = hops[ids].astype(int) - 1
+        order = np.argsort(km[ids], kind="stable")
+        ids = ids[order]
+        return {
+            "codes": self.codes[ids],
+            "lat": net.lat[ids],
+            "lon": net.lon[ids],
+            "stops": stops[order],
+            "km": km[ids],
+        }
+
+
+def reachability_index(G, max_stops=MAX_STOPS):
+    """
+    The index for a network, built on first use and kept on it (as
+    G.graph["reachability"] or FlightNetwork.reachability), so a rebuilt
+    network gets a fresh index. Searches on that network then answer
+    "no route" from the component ids without searching.
+    """
+    if isinstance(G, FlightNetwork):
+        if G.reachability is None:
+            G.reachability = ReachabilityIndex.build(G, max_stops)
+        return G.reachability
+    if "reachability" not in G.graph:
+        G.graph["reachability"] = ReachabilityIndex.build(G, max_stops)
+    return G.graph["reachability"]
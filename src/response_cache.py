@@ -0,0 +1,183 @@
+# src/response_cache.py
+import hashlib
+import json
+import os
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import Future
+
+
+class ResponseCache:
+    """
+    Thread-safe TTL + LRU cache with single-flight coalescing.
+
+    `get_or_compute(key, compute)` returns a fresh cached value or calls
+    `compute()` once: concurrent callers with the same key wait for that call
+    instead of starting their own. Entries expire `ttl` seconds after they were
+    stored; beyond `max_entries` the least recently used one is dropped. With
+    `disk_dir`, values (which must be JSON-serializable) are also written there
+    so they survive restarts and are shared between processes. Failed computes
+    are never cached; the exception is raised to every waiting caller.
+    """
+
+    def __init__(self, ttl=24 * 3600, max_entries=512, disk_dir=None):
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.disk_dir = disk_dir
+        self._entries = OrderedDict() # key -> (expires_at, value)
+        self._inflight = {} # key -> Future
+        self._lock = threading.Lock()
+        self._stats = {"hits": 0, "disk_hits": 0, "misses": 0, "coalesced": 0,
+                       "computes": 0, "errors": 0, "evictions": 0, "expirations": 0,
+                       "compute_seconds": 0.0}
+
+    def get_or_compute(self, key, compute):
+        value, future, leader = self.begin(key)
+        if value is not None:
+            return value
+        if not leader:
+            return future.result()
+
+        start = time.perf_counter()
+        try:
+            value = compute()
+        except BaseException as e:
+            self.finish(key, error=e)
+            raise
+        finally:
+            with self._lock:
+                self._stats["compute_seconds"] += time.perf_counter() - start
+        self.finish(key, value)
+        return value
+
+    def begin(self, key):
+        """
+        The single-flight step of `get_or_compute`, for callers that produce
+        the value themselves (e.g. while streaming it). Returns (value, future,
+        leader): a cached value (memory, then disk); or the in-flight Future of
+        the caller already computing it, to wait on; or, with leader=True, a
+        new Future: this caller must then end with `finish`.
+        """
+        with self._lock:
+            value = self._get_memory(key)
+            if value is not None:
+                self._stats["hits"] += 1
+                return value, None, False
+            future = self._inflight.get(key)
+            if future is not None:
+                self._stats["coalesced"] += 1
+                return None, future, False
+            future = self._inflight[key] = Future()
+
+        value, expires_at = self._get_disk(key)
+        with self._lock:
+            if value is None:
+                self._stats["misses"] += 1
+                return None, future, True
+            self._stats["disk_hits"] += 1
+            self._put_memory(key, value, expires_at) # keeps the stored lifetime
+            self._inflight.pop(key, None)
+        future.set_result(value)
+        return value, None, False
+
+    def finish(self, key, value=None, error=None):
+        """
+        Ends a `begin` lead: caches `value` and hands it (or raises `error`)
+        to the callers waiting on the key. Empty values are handed over but
+        not cached, and errors are never cached.
+        """
+        if error is None and value not in (None, ""):
+            self.put(key, value)
+        with self._lock:
+            future = self._inflight.pop(key, None)
+            self._stats["errors" if error is not None else "computes"] += 1
+        if future is not None:
+            if error is not None:
+                future.set_exception(error)
+            else:
+                future.set_result(value)
+
+    def get(self, key):
+        """The cached value (memory, then disk), or None (no coalescing; see `begin`)."""
+        with self._lock:
+            value = self._get_memory(key)
+        if value is None:
+            value, expires_at = self._get_disk(key)
+            if value is not None:
+                with self._lock:
+                    self._put_memory(key, value, expires_at)
+        return value
+
+    def put(self, key, value):
+        expires_at = time.time() + self.ttl
+        with self._lock:
+            self._put_memory(key, value, expires_at)
+        if self.disk_dir:
+            self._put_disk(key, value, expires_at)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self):
+        """Snapshot of hit/miss/coalescing counters plus current size."""
+        with self._lock:
+            stats = dict(self._stats)
+            stats["entries"] = len(self._entries)
+        lookups = stats["hits"] + stats["disk_hits"] + stats["misses"] + stats["coalesced"]
+        stats["hit_rate"] = (lookups - stats["misses"]) / lookups if lookups else 0.0
+        return stats
+
+    # --- Memory tier (caller holds the lock) ---
+    def _get_memory(self, key):
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        if entry[0] < time.time():
+            del self._entries[key]
+            self._stats["expirations"] += 1
+            return None
+        self._entries.move_to_end(key)
+        return entry[1]
+
+    def _put_memory(self, key, value, expires_at=None):
+        self._entries[key] = (expires_at or time.time() + self.ttl, value)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+            self._stats["evictions"] += 1
+
+    # --- Disk tier ---
+    def _disk_path(self, key):
+        digest = hashlib.sha1(json.dumps(key).encode()).hexdigest()
+        return os.path.join(self.disk_dir, f"{digest}.json")
+
+    def _get_disk(self, key):
+        """(value, expires_at) from disk, or (None, None) if missing or expired."""
+        if not self.disk_dir:
+            return None, None
+        path = self._disk_path(key)
+        try:
+            with open(path) as f:
+                entry = json.load(f)
+        except (OSError, ValueError):
+            return None, None
+        if entry["expires_at"] < time.time():
+            try:
+                os.remove(path)
+            except OSError:
+                pass
+            return None, None
+        return entry["value"], entry["expires_at"]
+
+    def _put_disk(self, key, value, expires_at):
+        try:
+            os.makedirs(self.disk_dir, exist_ok=True)
+            path = self._disk_path(key)
+            tmp = f"{path}.{threading.get_ident()}.tmp"
+            with open(tmp, "w") as f:
+                json.dump({"expires_at": expires_at, "value": value}, f)
+            os.replace(tmp, path)
+        except (OSError, TypeError) as e:
+            print(f"⚠️ Could not write the response cache to disk: {e}")
@@ -0,0 +1,130 @@
+# src/route_map.py
+"""
+Folium maps for the Route Visualization tab.
+
+Legs are drawn as great-circle arcs, generated for all legs at once by
+`great_circle_arcs`. `route_map` draws one itinerary with a polyline and
+markers. For big overlays (every route option, everywhere reachable from an
+airport) `routes_layer` and `isochrone_layer` put thousands of segments or
+airports into a single GeoJSON layer instead of one folium object each, which
+keeps the page small and the browser responsive.
+"""
+import folium
+import numpy as np
+
+ARC_POINTS = 24 # points per arc, endpoints included
+TILES = "CartoDB dark_matter"
+ROUTE_COLOR = "#00C9FF"
+OPTION_COLORS = ["#00C9FF", "#92FE9D", "#FFB347", "#FF6EC7"] # route option 1, 2, 3, ...
+STOP_COLORS = ["#92FE9D", "#00C9FF", "#FFB347", "#FF4444"] # nonstop, 1 stop, 2 stops, 3+ stops
+
+
+def _unit_vectors(lat, lon):
+    lat, lon = np.radians(lat), np.radians(lon)
+    return np.stack([np.cos(lat) * np.cos(lon), np.cos(lat) * np.sin(lon), np.sin(lat)], axis=-1)
+
+
+def great_circle_arcs(lat1, lon1, lat2, lon2, points=ARC_POINTS):
+    """
+    (n, points, 2) array of [lat, lon] along the great circle of each of the n
+    legs (spherical interpolation). Longitudes are unwrapped along each arc, so
+    arcs crossing the antimeridian continue past ±180 instead of jumping back.
+    """
+    a = _unit_vectors(np.asarray(lat1, dtype=np.float64), np.asarray(lon1, dtype=np.float64)).reshape(-1, 1, 3)
+    b = _unit_vectors(np.asarray(lat2, dtype=np.float64), np.asarray(lon2, dtype=np.float64)).reshape(-1, 1, 3)
+    omega = np.arccos(np.clip((a * b).sum(axis=-1), -1.0, 1.0)) # (n, 1) central angle
+    t = np.linspace(0.0, 1.0, points)
+    sin_omega = np.sin(omega)
+    straight = sin_omega < 1e-9 # same airport twice: plain interpolation
+    safe = np.where(straight, 1.0, sin_omega)
+    wa = np.where(straight, 1.0 - t, np.sin((1.0 - t) * omega) / safe)[..., None]
+    wb = np.where(straight, t, np.sin(t * omega) / safe)[..., None]
+    p = wa * a + wb * b
+    lat = np.degrees(np.arctan2(p[..., 2], np.hypot(p[..., 0], p[..., 1])))
+    lon = np.degrees(np.unwrap(np.arctan2(p[..., 1], p[..., 0]), axis=1))
+    return np.stack([lat, lon], axis=-1)
+
+
+def leg_arcs(legs, points=ARC_POINTS):
+    """
+    Arcs for an itinerary's legs (leg dicts from `find_shortest_path`), each
+    shifted by whole turns so it starts where the previous one ended: the
+    itinerary is one continuous line even across the antimeridian.
+    """
+    u = np.array([leg["coords_u"] for leg in legs], dtype=np.float64)
+    v = np.array([leg["coords_v"] for leg in legs], dtype=np.float64)
+    arcs = great_circle_arcs(u[:, 0], u[:, 1], v[:, 0], v[:, 1], points)
+    jumps = arcs[:-1, -1, 1] - arcs[1:, 0, 1]
+    arcs[:, :, 1] += np.concatenate([[0.0], np.cumsum(np.round(jumps / 360.0) * 360.0)])[:, None]
+    return arcs
+
+
+def route_map(legs):
+    """A dark folium map of one itinerary: great-circle legs, a plane per departure and a flag at the destination."""
+    arcs = leg_arcs(legs)
+    m = folium.Map(location=legs[0]["coords_u"], zoom_start=3, tiles=TILES)
+    folium.PolyLine(arcs.tolist(), color=ROUTE_COLOR, weight=4, opacity=0.8).add_to(m)
+    for leg, arc in zip(legs, arcs):
+        folium.Marker(arc[0].tolist(), popup=leg["from"], icon=folium.Icon(color="blue", icon="plane", prefix="fa")).add_to(m)
+    folium.Marker(arcs[-1, -1].tolist(), popup="DEST", icon=folium.Icon(color="red", icon="flag", prefix="fa")).add_to(m)
+    return m
+
+
+def routes_layer(routes, name="Route options"):
+    """
+    Every itinerary in `routes` ((legs, total_km) pairs, as from
+    `find_k_shortest_paths`) as one GeoJSON layer: one MultiLineString per
+    itinerary, coloured by option, with all arcs generated in one pass.
+    """
+    legs = [leg for path, _ in routes for leg in path]
+    if not legs:
+        return folium.GeoJson({"type": "FeatureCollection", "features": []}, name=name)
+    u = np.array([leg["coords_u"] for leg in legs], dtype=np.float64)
+    v = np.array([leg["coords_v"] for leg in legs], dtype=np.float64)
+    lines = great_circle_arcs(u[:, 0], u[:, 1], v[:, 0], v[:, 1])[..., ::-1].round(4).tolist() # GeoJSON is [lon, lat]
+    features, start = [], 0
+    for i, (path, total_km) in enumerate(routes):
+        features.append({
+            "type": "Feature",
+            "geometry": {"type": "MultiLineString", "coordinates": lines[start:start + len(path)]},
+            "properties": {"label": f"Option {i + 1}: {len(path) - 1} stop(s), {int(total_km):,} km",
+                           "color": OPTION_COLORS[i % len(OPTION_COLORS)]},
+        })
+        start += len(path)
+    return folium.GeoJson(
+        {"type": "FeatureCollection", "features": features}, name=name,
+        style_function=lambda f: {"color": f["properties"]["color"], "weight": 3, "opacity": 0.7},
+        tooltip=folium.GeoJsonTooltip(fields=["label"], labels=False),
+    )
+
+
+def isochrone_layer(reach, name="Reachable airports"):
+    """
+    A `ReachabilityIndex.reachable` result as one GeoJSON layer of circle
+    markers: one MultiPoint per stop count, coloured by stops.
+    """
+    stops = np.minimum(np.asarray(reach["stops"], dtype=int), len(STOP_COLORS) - 1)
+    coords = np.column_stack([reach["lon"], reach["lat"]]).round(4)
+    features = []
+    for s in np.unique(stops).tolist():
+        mask = stops == s
+        label = "nonstop" if s == 0 else f"{s}{'+' if s == len(STOP_COLORS) - 1 else ''} stop{'s' if s > 1 else ''}"
+        features.append({
+            "type": "Feature",
+            "geometry": {"type": "MultiPoint", "coordinates": coords[mask].tolist()},
+            "properties": {"label": f"{label}: {int(mask.sum()):,} airports", "color": STOP_COLORS[s]},
+        })
+    return folium.GeoJson(
+        {"type": "FeatureCollection", "features": features}, name=name,
+        marker=folium.CircleMarker(radius=3, fill=True, fill_opacity=0.8, weight=0),
+        style_function=lambda f: {"color": f["properties"]["color"], "fillColor": f["properties"]["color"]},
+        tooltip=folium.GeoJsonTooltip(fields=["label"], labels=False),
+    )
+
+
+def overlay_map(center, layers):
+    """A dark folium map centred on `center` ([lat, lon]) with the given GeoJSON layers."""
+    m = folium.Map(location=center, zoom_start=2, tiles=TILES)
+    for layer in layers:
+        layer.add_to(m)
+    return m
@@ -0,0 +1,366 @@
+# src/route_updates.py
+"""
+Incremental updates of the flight network from route delta files.
+
+`LiveNetwork` keeps the `build_graph` networkx graph together with the routes
+behind each airport pair, so adding or removing routes only touches the edges
+(and airports) they belong to; the result is the graph `build_graph` would
+produce from the updated route table. Every applied delta bumps the network
+version. Connected components are tracked incrementally. A memoized shortest
+path is dropped only when the delta removes or changes an edge it uses, or
+adds an edge that could shorten it (the great-circle distances to and from
+the new edge are a lower bound on any detour through it).
+
+A delta file is a CSV with the columns op,airline,source,dest:
+
+    op,airline,source,dest
+    add,BA,LHR,JFK
+    remove,AA,JFK,LAX
+    remove,XY,,            <- every route of carrier XY
+"""
+import csv
+import threading
+import time
+from collections import deque
+
+import numpy as np
+import pandas as pd
+
+from src.logic import build_graph, find_shortest_path, haversine, haversine_np, node_coords
+from src.metrics import METRICS
+
+ADD_OPS = {"add", "+"}
+REMOVE_OPS = {"remove", "-"}
+
+
+def read_delta(path):
+    """Rows of a delta file as (op, airline, source, dest) tuples, op being "add" or "remove"."""
+    rows = []
+    with open(path, newline="") as f:
+        for line, row in enumerate(csv.DictReader(f), start=2):
+            op = (row.get("op") or "").strip().lower()
+            airline, src, dest = ((row.get(k) or "").strip().upper() for k in ("airline", "source", "dest"))
+            if op in ADD_OPS and airline and src and dest:
+                rows.append(("add", airline, src, dest))
+            elif op in REMOVE_OPS and airline and bool(src) == bool(dest):
+                rows.append(("remove", airline, src or None, dest or None))
+            else:
+                raise ValueError(f"{path}:{line}: invalid delta row {row}")
+    return rows
+
+
+def _pair(u, v):
+    return (u, v) if u <= v else (v, u)
+
+
+class PathCache:
+    """
+    Memoized `find_shortest_path` results, indexed by the airport pairs (edges)
+    their routes fly, so a network change only drops the routes it can affect.
+    """
+
+    def __init__(self):
+        self._entries = {} # key -> (result, pairs flown)
+        self._by_edge = {} # airport pair -> set of keys
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            self.hits += 1
+            return entry[0]
+
+    def put(self, key, result):
+        legs = result[0] or []
+        pairs = {_pair(leg["from"], leg["to"]) for leg in legs}
+        with self._lock:
+            self._drop(key)
+            self._entries[key] = (result, pairs)
+            for pair in pairs:
+                self._by_edge.setdefault(pair, set()).add(key)
+
+    def _drop(self, key):
+        """Caller holds the lock; removes the entry and its key from every edge index."""
+        entry = self._entries.pop(key, None)
+        if entry is None:
+            return False
+        for pair in entry[1]:
+            keys = self._by_edge[pair]
+            keys.discard(key)
+            if not keys:
+                del self._by_edge[pair]
+        return True
+
+    def using(self, pairs):
+        """Keys of the entries whose route flies one of the airport `pairs`."""
+        with self._lock:
+            return set().union(*(self._by_edge.get(pair, ()) for pair in pairs))
+
+    def invalidate(self, keys):
+        """Drops the entries for `keys`; returns how many were dropped."""
+        with self._lock:
+            return sum(self._drop(key) for key in keys)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._by_edge.clear()
+
+    def items(self):
+        """Snapshot of (key, result) pairs; keys are (src, dest, strategy, airlines)."""
+        with self._lock:
+            return [(key, result) for key, (result, _) in self._entries.items()]
+
+    def __len__(self):
+        return len(self._entries)
+
+
+class LiveNetwork:
+    """The `build_graph` network plus what it needs to absorb route deltas in place."""
+
+    def __init__(self, routes, airports, airlines):
+        self.G = build_graph(routes, airports, airlines)
+        self.version = 0
+        self.G.graph["version"] = 0
+        self.airline_names = self.G.graph["airline_names"]
+
+        valid_airports = airports.dropna(subset=["IATA"]).drop_duplicates(subset=["IATA"])
+        self.airport_attrs = valid_airports.set_index("IATA")[["Latitude", "Longitude", "City", "Name"]].to_dict("index")
+
+        # The (airline, source, dest) routes behind each airport pair, in table order:
+        # the last one names the edge and sets its distance, as in `route_edges`
+        self.pair_routes = {}
+        self.airline_pairs = {} # airline code -> pairs it flies
+        known = routes["SourceAirport"].isin(self.airport_attrs) & routes["DestAirport"].isin(self.airport_attrs)
+        for airline, src, dest in zip(routes["Airline"][known].astype(str).tolist(),
+                                      routes["SourceAirport"][known].astype(str).tolist(),
+                                      routes["DestAirport"][known].astype(str).tolist()):
+            pair = (src, dest) if src <= dest else (dest, src)
+            self.pair_routes.setdefault(pair, []).append((airline, src, dest))
+            self.airline_pairs.setdefault(airline, set()).add(pair)
+
+        self.component = {}
+        self.members = {}
+        self._next_component = 0
+        self._label_components(list(self.G))
+        self.paths = PathCache()
+        self._subscribers = []
+        self._lock = threading.Lock()
+
+    # --- Components ---
+    def _label_components(self, starts):
+        """(Re)labels the components containing `starts` with fresh ids; returns the new ids."""
+        new_ids, adj = [], self.G._adj
+        for start in starts:
+            if start in self.component and self.component[start] in new_ids:
+                continue # reached from an earlier start
+            c = self._next_component
+            self._next_component += 1
+            new_ids.append(c)
+            seen = {start}
+            queue = deque([start])
+            while queue:
+                u = queue.popleft()
+                for v in adj[u]:
+                    if v not in seen:
+                        seen.add(v)
+                        queue.append(v)
+            for node in seen:
+                self.component[node] = c
+            self.members[c] = seen
+        return new_ids
+
+    def connected(self, src, dest):
+        """True if any route joins the two airports (O(1))."""
+        c = self.component.get(src)
+        return c is not None and c == self.component.get(dest)
+
+    # --- Routing ---
+    def shortest_path(self, src, dest, strategy="dijkstra", airlines=None):
+        """
+        `find_shortest_path` on the live graph, memoized until a delta can
+        change the answer. Holds the update lock, so a search never sees a
+        half-applied delta and never caches a route the delta made stale.
+        """
+        key = (src, dest, strategy, None if airlines is None else frozenset(airlines))
+        with self._lock:
+            if not self.connected(src, dest):
+                return None, 0
+            result = self.paths.get(key)
+            if result is None:
+                result = find_shortest_path(self.G, src, dest, strategy=strategy, airlines=airlines)
+                self.paths.put(key, result)
+            return result
+
+    def subscribe(self, callback):
+        """Calls `callback(live_network, report)` after every applied delta (e.g. to refresh derived indexes)."""
+        self._subscribers.append(callback)
+
+    # --- Updates ---
+    def _refresh_edge(self, pair):
+        """Makes the graph edge for `pair` match its remaining routes; returns "added", "removed", "changed" or None."""
+        G, routes = self.G, self.pair_routes.get(pair)
+        if not routes:
+            self.pair_routes.pop(pair, None)
+            if G.has_edge(*pair):
+                G.remove_edge(*pair)
+                return "removed"
+            return None
+
+        airline, src, dest = routes[-1]
+        a, b = self.airport_attrs[src], self.airport_attrs[dest]
+        dist = haversine(a["Longitude"], a["Latitude"], b["Longitude"], b["Latitude"])
+        attrs = {"weight": dist, "airline": self.airline_names.get(airline, airline), "distance": dist,
+                 "airlines": frozenset(code for code, _, _ in routes)}
+        if not G.has_edge(*pair):
+            for node in pair:
+                if node not in G:
+                    G.add_node(node, **self.airport_attrs[node])
+            G.add_edge(*pair, **attrs)
+            return "added"
+        if G.edges[pair] != attrs:
+            G.edges[pair].update(attrs)
+            return "changed"
+        return None
+
+    def _shortcut_keys(self, added, changed):
+        """
+        Cached keys whose route a new edge could shorten (or create): those
+        where great-circle(src, u) + edge + great-circle(v, dest) doesn't exceed
+        the cached distance. A changed edge can only gain carriers for
+        airline-filtered routes, so it is checked against those alone.
+        """
+        entries = self.paths.items()
+        if not entries or not (added or changed):
+            return set()
+        attrs = self.airport_attrs
+        src = [attrs[key[0]] for key, _ in entries]
+        dest = [attrs[key[1]] for key, _ in entries]
+        src_lon, src_lat = np.array([a["Longitude"] for a in src]), np.array([a["Latitude"] for a in src])
+        dest_lon, dest_lat = np.array([a["Longitude"] for a in dest]), np.array([a["Latitude"] for a in dest])
+        dist = np.array([np.inf if path is None else km for _, (path, km) in entries]) + 1e-6
+        filtered = np.array([key[3] is not None for key, _ in entries])
+
+        hit = np.zeros(len(entries), dtype=bool)
+        added = set(added)
+        for pair in added | set(changed):
+            (u, a), (v, b) = ((n, attrs[n]) for n in pair)
+            via = self.G.edges[pair]["weight"] + np.minimum(
+                haversine_np(src_lon, src_lat, a["Longitude"], a["Latitude"])
+                + haversine_np(b["Longitude"], b["Latitude"], dest_lon, dest_lat),
+                haversine_np(src_lon, src_lat, b["Longitude"], b["Latitude"])
+                + haversine_np(a["Longitude"], a["Latitude"], dest_lon, dest_lat))
+            shorter = via <= dist
+            hit |= shorter if pair in added else shorter & filtered
+        return {key for (key, _), h in zip(entries, hit.tolist()) if h}
+
+    def apply(self, delta):
+        """
+        Applies (op, airline, source, dest) rows (see `read_delta`; a file path
+        is also accepted) and returns a report of what changed. Removing a
+        route takes out its last occurrence; rows naming unknown airports or
+        routes are skipped and counted.
+        """
+        if isinstance(delta, str):
+            delta = read_delta(delta)
+        start = time.perf_counter()
+        with self._lock:
+            G = self.G
+            touched, skipped, added, removed = set(), 0, 0, 0
+            for op, airline, src, dest in delta:
+                if op == "add":
+                    if src not in self.airport_attrs or dest not in self.airport_attrs:
+                        skipped += 1
+                        continue
+                    pair = (src, dest) if src <= dest else (dest, src)
+                    self.pair_routes.setdefault(pair, []).append((airline, src, dest))
+                    self.airline_pairs.setdefault(airline, set()).add(pair)
+                    touched.add(pair)
+                    added += 1
+                elif src is None: # the whole carrier
+                    pairs = self.airline_pairs.pop(airline, set())
+                    for pair in pairs:
+                        kept = [r for r in self.pair_routes[pair] if r[0] != airline]
+                        removed += len(self.pair_routes[pair]) - len(kept)
+                        self.pair_routes[pair] = kept
+                    touched |= pairs
+                    skipped += not pairs
+                else:
+                    pair = (src, dest) if src <= dest else (dest, src)
+                    routes = self.pair_routes.get(pair, [])
+                    at = next((i for i in range(len(routes) - 1, -1, -1) if routes[i] == (airline, src, dest)), None)
+                    if at is None:
+                        skipped += 1
+                        continue
+                    del routes[at]
+                    if not any(r[0] == airline for r in routes):
+                        self.airline_pairs[airline].discard(pair)
+                    touched.add(pair)
+                    removed += 1
+
+            # Components of the touched airports before the change
+            endpoints = {node for pair in touched for node in pair}
+            old_components = {self.component[n] for n in endpoints if n in self.component}
+            absent = {n for n in endpoints if n not in G}
+
+            changes = {"added": [], "removed": [], "changed": []}
+            removed_nodes = []
+            for pair in touched:
+                change = self._refresh_edge(pair)
+                if change:
+                    changes[change].append(pair)
+            for node in endpoints:
+                if node in G and G.degree(node) == 0:
+                    G.remove_node(node)
+                    removed_nodes.append(node)
+            added_nodes = [n for n in absent if n in G]
+
+            structural = changes["added"] or changes["removed"]
+            affected = set(old_components) if (structural or changes["changed"]) else set()
+            if structural:
+                # Stale: `reachability_index` rebuilds it on demand; the oracle's bounds no longer hold
+                G.graph.pop("reachability", None)
+                G.graph.pop("oracle", None)
+                for c in old_components:
+                    self.members.pop(c, None)
+                for node in removed_nodes:
+                    self.component.pop(node, None)
+                affected |= set(self._label_components([n for n in endpoints if n in G]))
+            if removed_nodes or added_nodes:
+                G.graph["coords"] = node_coords(G)
+
+            stale = self.paths.using(changes["removed"] + changes["changed"])
+            stale |= self._shortcut_keys(changes["added"], changes["changed"])
+            invalidated = self.paths.invalidate(stale)
+            if affected:
+                self.version += 1
+                G.graph["version"] = self.version
+            report = {
+                "version": self.version,
+                "routes_added": added,
+                "routes_removed": removed,
+                "rows_skipped": skipped,
+                "edges_added": len(changes["added"]),
+                "edges_removed": len(changes["removed"]),
+                "edges_changed": len(changes["changed"]),
+                "airports_added": len(added_nodes),
+                "airports_removed": len(removed_nodes),
+                "components_affected": sorted(affected),
+                "paths_invalidated": invalidated,
+                "seconds": time.perf_counter() - start,
+            }
+        METRICS.observe("apply_route_delta", report["seconds"])
+        METRICS.count("route_delta_rows", len(delta))
+        for callback in self._subscribers:
+            callback(self, report)
+        return report
+
+    def route_table(self):
+        """The current routes as an Airline/SourceAirport/DestAirport table (e.g. for a full rebuild)."""
+        rows = [r for routes in self.pair_routes.values() for r in routes]
+        return pd.DataFrame(rows, columns=["Airline", "SourceAirport", "DestAirport"])
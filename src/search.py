@@ -0,0 +1,297 @@
+# src/search.py
+"""
+Graph-agnostic point-to-point search routines.
+
+Every routine takes a `neighbors(u)` callable that yields (v, weight, edge)
+tuples, so the same code runs on the networkx graph and on the CSR
+`FlightNetwork`. `edge` is whatever the caller needs to rebuild the leg
+(the networkx edge dict, a CSR position, ...).
+
+All routines return (nodes, edges, distance, expanded) where `expanded` is the
+number of nodes settled by the search. `nodes` is None when there is no path.
+"""
+import heapq
+from itertools import count
+
+INF = float("inf")
+
+SEARCH_STRATEGIES = ("dijkstra", "astar", "bidirectional")
+# What `find_shortest_path` accepts: the routines here plus "alt" (A* with landmark bounds)
+ROUTE_STRATEGIES = SEARCH_STRATEGIES + ("alt",)
+
+
+def _unwind(pred, source, node):
+    """Walks predecessor links back to `source`; returns (nodes, edges) from source to node."""
+    nodes, edges = [node], []
+    while node != source:
+        node, edge = pred[node]
+        nodes.append(node)
+        edges.append(edge)
+    nodes.reverse()
+    edges.reverse()
+    return nodes, edges
+
+
+def dijkstra(neighbors, source, target, heuristic=None):
+    """
+    Dijkstra with early exit at `target`. Passing an admissible `heuristic(node)`
+    (a lower bound on the remaining distance) turns it into A*.
+    """
+    push, pop = heapq.heappush, heapq.heappop
+    c = count()
+    dist = {source: 0.0}
+    pred = {}
+    settled = set()
+    heap = [(heuristic(source) if heuristic else 0.0, next(c), source)]
+    while heap:
+        u = pop(heap)[2]
+        if u in settled:
+            continue
+        settled.add(u)
+        du = dist[u]
+        if u == target:
+            nodes, edges = _unwind(pred, source, target)
+            return nodes, edges, du, len(settled)
+        for v, w, e in neighbors(u):
+            if v in settled:
+                continue
+            nd = du + w
+            if v not in dist or nd < dist[v]:
+                dist[v] = nd
+                pred[v] = (u, e)
+                push(heap, (nd + heuristic(v) if heuristic else nd, next(c), v))
+    return None, None, INF, len(settled)
+
+
+def bidirectional_dijkstra(neighbors, source, target):
+    """
+    Dijkstra grown from both ends of an undirected graph; stops once the two
+    frontiers can no longer improve the best meeting point.
+    """
+    if source == target:
+        return [source], [], 0.0, 1
+
+    c = count()
+    dists = ({source: 0.0}, {target: 0.0})
+    preds = ({}, {})
+    settled = (set(), set())
+    heaps = ([(0.0, next(c), source)], [(0.0, next(c), target)])
+    best, meet = INF, None
+
+    while heaps[0] and heaps[1]:
+        if heaps[0][0][0] + heaps[1][0][0] >= best:
+            break
+        side = 0 if heaps[0][0][0] <= heaps[1][0][0] else 1
+        dist, pred, done, heap = dists[side], preds[side], settled[side], heaps[side]
+        other = dists[1 - side]
+
+        du, _, u = heapq.heappop(heap)
+        if u in done:
+            continue
+        done.add(u)
+        for v, w, e in neighbors(u):
+            if v in done:
+                continue
+            nd = du + w
+            if nd < dist.get(v, INF):
+                dist[v] = nd
+                pred[v] = (u, e)
+                heapq.heappush(heap, (nd, next(c), v))
+            if v in other and dist[v] + other[v] < best:
+                best, meet = dist[v] + other[v], v
+
+    expanded = len(settled[0]) + len(settled[1])
+    if meet is None:
+        return None, None, INF, expanded
+
+    fwd_nodes, fwd_edges = _unwind(preds[0], source, meet)
+    bwd_nodes, bwd_edges = _unwind(preds[1], target, meet)
+    return fwd_nodes + bwd_nodes[-2::-1], fwd_edges + bwd_edges[::-1], best, expanded
+
+
+def with_endpoints(neighbors, sources, targets, start, end):
+    """
+    Wraps `neighbors` with a virtual `start` node joined to every node in
+    `sources` and a virtual `end` node joined to every node in `targets`
+    (zero-weight edges, edge None), so one start -> end search finds the best
+    route between any source and any target. Strip the first and last
+    node/edge of the result to drop the virtual ends.
+    """
+    sources, targets = set(sources), set(targets)
+    start_links = [(s, 0.0, None) for s in sources]
+    end_links = [(t, 0.0, None) for t in targets]
+
+    def wrapped(u):
+        if u == start:
+            return start_links
+        if u == end:
+            return end_links
+        out = list(neighbors(u))
+        if u in sources:
+            out.append((start, 0.0, None))
+        if u in targets:
+            out.append((end, 0.0, None))
+        return out
+    return wrapped
+
+
+def check_strategy(strategy):
+    """Raises ValueError unless `strategy` is one of ROUTE_STRATEGIES."""
+    if strategy not in ROUTE_STRATEGIES:
+        raise ValueError(f"Unknown search strategy {strategy!r}; expected one of {ROUTE_STRATEGIES}")
+
+
+def search(neighbors, source, target, strategy="dijkstra", heuristic=None):
+    """Runs one of SEARCH_STRATEGIES; `heuristic` is only used by "astar"."""
+    if strategy == "dijkstra":
+        return dijkstra(neighbors, source, target)
+    if strategy == "astar":
+        return dijkstra(neighbors, source, target, heuristic=heuristic)
+    if strategy == "bidirectional":
+        return bidirectional_dijkstra(neighbors, source, target)
+    raise ValueError(f"Unknown search strategy {strategy!r}; expected one of {SEARCH_STRATEGIES}")
+
+
+def distances_from(neighbors, source, unit=False):
+    """
+    Full single-source Dijkstra: {node: distance} for every reachable node.
+    With `unit=True` every edge counts 1, giving hop counts instead.
+    """
+    c = count()
+    dist = {source: 0.0}
+    settled = set()
+    heap = [(0.0, next(c), source)]
+    while heap:
+        du, _, u = heapq.heappop(heap)
+        if u in settled:
+            continue
+        settled.add(u)
+        for v, w, _ in neighbors(u):
+            nd = du + (1 if unit else w)
+            if v not in settled and nd < dist.get(v, INF):
+                dist[v] = nd
+                heapq.heappush(heap, (nd, next(c), v))
+    return dist
+
+
+def _spur_search(neighbors, source, target, to_target, hops_to_target, max_edges, max_dist,
+                 banned_nodes, banned_next):
+    """
+    A* from `source` to `target` that avoids `banned_nodes`, doesn't take the
+    first hops in `banned_next`, uses at most `max_edges` edges and stays within
+    `max_dist`. Returns (nodes, edges, weights, expanded); nodes is None if no path.
+
+    `to_target`/`hops_to_target` are exact distances/hop counts to the target on
+    the unrestricted graph, so they are admissible here and prune aggressively.
+    With an edge limit, states are (node, edges used) so a longer path with
+    fewer legs is not shadowed by a shorter one with too many.
+    """
+    limited = max_edges is not None
+    start = (source, 0) if limited else source
+    push, pop = heapq.heappush, heapq.heappop
+    c = count()
+    dist = {start: 0.0}
+    pred = {}
+    settled = set()
+    heap = [(to_target(source), next(c), start)]
+    while heap:
+        state = pop(heap)[2]
+        if state in settled:
+            continue
+        settled.add(state)
+        u, used = state if limited else (state, 0)
+        du = dist[state]
+        if u == target:
+            nodes, edges, weights = [], [], []
+            while state != start:
+                state, e, w = pred[state]
+                edges.append(e)
+                weights.append(w)
+                nodes.append(state[0] if limited else state)
+            nodes.reverse()
+            nodes.append(target)
+            return nodes, edges[::-1], weights[::-1], len(settled)
+
+        for v, w, e in neighbors(u):
+            if v in banned_nodes or (u == source and v in banned_next):
+                continue
+            nd = du + w
+            h = to_target(v)
+            if h == INF or nd + h > max_dist:
+                continue
+            if limited:
+                if used + 1 + hops_to_target(v) > max_edges:
+                    continue
+                nxt = (v, used + 1)
+            else:
+                nxt = v
+            if nxt not in settled and nd < dist.get(nxt, INF):
+                dist[nxt] = nd
+                pred[nxt] = (state, e, w)
+                push(heap, (nd + h, next(c), nxt))
+    return None, None, None, len(settled)
+
+
+def k_shortest_paths(neighbors, source, target, k, to_target, hops_to_target=None,
+                     max_edges=None, max_dist=INF):
+    """
+    Yen's k shortest loopless paths, shortest first.
+
+    `to_target(node)` / `hops_to_target(node)` give each node's distance / hop
+    count to `target` on the unrestricted graph (one reverse search, reused by
+    every spur search as an exact A* heuristic and for pruning). Paths with more
+    than `max_edges` edges or longer than `max_dist` are never generated.
+
+    Returns (paths, expanded) where each path is (nodes, edges, distance).
+    """
+    if hops_to_target is None:
+        hops_to_target = lambda node: 0
+    # Float sums taken in a different order must not prune the bound itself
+    max_dist *= 1 + 1e-9
+    expanded = 0
+
+    def spur(node, budget_edges, budget_dist, banned_nodes=(), banned_next=()):
+        nonlocal expanded
+        nodes, edges, weights, n = _spur_search(
+            neighbors, node, target, to_target, hops_to_target,
+            budget_edges, budget_dist, banned_nodes, banned_next)
+        expanded += n
+        return nodes, edges, weights
+
+    nodes, edges, weights = spur(source, max_edges, max_dist)
+    if nodes is None:
+        return [], expanded
+
+    found = [(nodes, edges, weights)]
+    seen = {tuple(nodes)}
+    candidates = []
+    c = count()
+    while len(found) < k:
+        prev_nodes, prev_edges, prev_weights = found[-1]
+        root_dist = 0.0
+        for i, node in enumerate(prev_nodes[:-1]):
+            root = prev_nodes[:i + 1]
+            edges_left = None if max_edges is None else max_edges - i
+            if (edges_left is not None and hops_to_target(node) > edges_left) \
+                    or root_dist + to_target(node) > max_dist:
+                root_dist += prev_weights[i]
+                continue
+
+            # Leave the spur node by an edge none of the accepted paths sharing this root used
+            banned_next = {p[i + 1] for p, _, _ in found if p[:i + 1] == root}
+            s_nodes, s_edges, s_weights = spur(node, edges_left, max_dist - root_dist,
+                                               set(root[:-1]), banned_next)
+            if s_nodes is not None:
+                path = root[:-1] + s_nodes
+                if tuple(path) not in seen:
+                    seen.add(tuple(path))
+                    weights = prev_weights[:i] + s_weights
+                    heapq.heappush(candidates, (sum(weights), next(c), path, prev_edges[:i] + s_edges, weights))
+            root_dist += prev_weights[i]
+
+        if not candidates:
+            break
+        _, _, nodes, edges, weights = heapq.heappop(candidates)
+        found.append((nodes, edges, weights))
+
+    return [(nodes, edges, sum(weights)) for nodes, edges, weights in found], expanded
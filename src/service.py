@@ -0,0 +1,344 @@
+# src/service.py
+"""
+Headless routing service: the app's routing, pricing, delay and emissions
+logic as a JSON HTTP API and a command-line tool, without Streamlit.
+
+Data, network and models are loaded once at startup by `RoutingService`.
+The HTTP server handles each request on its own thread; the loaded state is
+only read, so requests share it without locking. Run several processes
+behind a load balancer to use more than one core.
+
+    python -m src.service serve --port 8000
+    python -m src.service route JFK LHR --k 3 --max-stops 1
+    python -m src.service price 180 0 IndiGo
+    python -m src.service reachable BOM --max-stops 2 --max-km 8000
+    curl 'localhost:8000/route?src=JFK&dest=LHR&k=2'
+"""
+import argparse
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlsplit
+
+import numpy as np
+
+from src.metrics import METRICS
+from src.itinerary import DEFAULT_WEATHER, itinerary_metrics
+from src.logic import calculate_emissions_np, find_k_shortest_paths
+from src.ml_engine import predict_delays_batch, predict_prices_batch
+from src.network import build_network
+from src.reachability import reachability_index
+from src.tables import load_tables
+
+DEFAULT_HOST = "127.0.0.1"
+DEFAULT_PORT = 8000
+MAX_K = 10
+
+
+class BadRequest(ValueError):
+    """A request with missing or invalid parameters (HTTP 400)."""
+
+
+def _param(params, name, cast=str, default=None):
+    value = params.get(name, default)
+    if value is None:
+        raise BadRequest(f"missing parameter '{name}'")
+    try:
+        return cast(value)
+    except (TypeError, ValueError):
+        raise BadRequest(f"invalid value for '{name}': {value!r}")
+
+
+def _codes(value):
+    """One airport/airline code, a comma-separated list or a JSON list -> list of upper-case codes."""
+    if isinstance(value, str):
+        value = value.split(",")
+    return [str(code).strip().upper() for code in value if str(code).strip()]
+
+
+def _batch(params, casts, defaults):
+    """
+    Equal-length columns for a batch request, each cast with `casts[name]`;
+    scalars are broadcast. Returns (columns, is_batch).
+    """
+    columns = {}
+    for name, cast in casts.items():
+        value = params.get(name, defaults.get(name))
+        if value is None:
+            raise BadRequest(f"missing parameter '{name}'")
+        try:
+            columns[name] = [cast(v) for v in value] if isinstance(value, list) else cast(value)
+        except (TypeError, ValueError):
+            raise BadRequest(f"invalid value for '{name}': {value!r}")
+    lengths = {len(v) for v in columns.values() if isinstance(v, list)}
+    if len(lengths) > 1:
+        raise BadRequest("list parameters must have the same length")
+    is_batch = bool(lengths)
+    n = lengths.pop() if is_batch else 1
+    return {name: v if isinstance(v, list) else [v] * n for name, v in columns.items()}, is_batch
+
+
+class RoutingService:
+    """Loaded data, network and models, plus one method per endpoint (JSON-ready dicts in and out)."""
+
+    def __init__(self, warm_models=True):
+        start = time.perf_counter()
+        self.airports, self.airlines, self.routes = load_tables()
+        self.network = build_network(self.routes, self.airports, self.airlines)
+        self.reachability = reachability_index(self.network)
+        if warm_models:
+            # Loads (or trains) the models and the price surface now rather than on the first request
+            self.price({"duration": 120, "stops": 0, "airline": "IndiGo"})
+            self.delay({"distance": 1000, "airline": "IndiGo"})
+        self.startup_seconds = time.perf_counter() - start
+        self.started_at = time.time()
+        self._requests = 0
+        self._lock = threading.Lock()
+
+    def count_request(self):
+        with self._lock:
+            self._requests += 1
+
+    def health(self, params=None):
+        return {
+            "status": "ok",
+            "airports": self.network.number_of_nodes(),
+            "routes": self.network.number_of_edges(),
+            "startup_seconds": round(self.startup_seconds, 3),
+            "uptime_seconds": round(time.time() - self.started_at, 1),
+            "requests": self._requests,
+            "metrics_enabled": METRICS.enabled,
+        }
+
+    def route(self, params):
+        """
+        Up to `k` itineraries between `src` and `dest` (codes or comma-separated
+        lists meaning "any of these airports"), each with per-leg and total
+        distance, price, delay risk and emissions.
+        """
+        src, dest = _codes(_param(params, "src")), _codes(_param(params, "dest"))
+        k = min(_param(params, "k", int, 1), MAX_K)
+        max_stops = params.get("max_stops")
+        max_stops = None if max_stops in (None, "") else _param(params, "max_stops", int)
+        detour_ratio = params.get("detour_ratio")
+        detour_ratio = None if detour_ratio in (None, "") else _param(params, "detour_ratio", float)
+        airlines = params.get("airlines")
+        airlines = (_codes(airlines) or None) if airlines else None
+        weather = _param(params, "weather", str, DEFAULT_WEATHER)
+        if k < 1:
+            raise BadRequest("'k' must be at least 1")
+
+        stats = {}
+        routes = find_k_shortest_paths(self.network, src[0] if len(src) == 1 else src,
+                                       dest[0] if len(dest) == 1 else dest, k=k, max_stops=max_stops,
+                                       detour_ratio=detour_ratio, stats=stats, airlines=airlines)
+        options = []
+        for legs, total_km in routes:
+            metrics = itinerary_metrics(legs, weather)
+            options.append({
+                "distance_km": round(float(total_km), 1),
+                "stops": len(legs) - 1,
+                "price_usd": round(float(metrics["prices"].sum()), 2),
+                "emissions_kg": round(float(metrics["emissions"].sum()), 2),
+                "max_delay_risk": round(float(metrics["risks"].max()), 4),
+                "legs": [{
+                    "from": leg["from"], "to": leg["to"], "airline": leg["airline"],
+                    "distance_km": round(float(leg["distance"]), 1),
+                    "duration_mins": int(metrics["durations"][i]),
+                    "price_usd": round(float(metrics["prices"][i]), 2),
+                    "delay_risk": round(float(metrics["risks"][i]), 4),
+                    "emissions_kg": float(metrics["emissions"][i]),
+                    "coords_from": list(leg["coords_u"]), "coords_to": list(leg["coords_v"]),
+                } for i, leg in enumerate(legs)],
+            })
+        return {"src": src, "dest": dest, "found": bool(options), "options": options,
+                "expanded": stats.get("expanded")}
+
+    def reachable(self, params):
+        """
+        Airports reachable from `src` within `max_stops` stops and/or `max_km`
+        km (at least one of the two), nearest first.
+        """
+        src = _param(params, "src").strip().upper()
+        max_stops = params.get("max_stops")
+        max_stops = None if max_stops in (None, "") else _param(params, "max_stops", int)
+        max_km = params.get("max_km")
+        max_km = None if max_km in (None, "") else _param(params, "max_km", float)
+        if max_stops is None and max_km is None:
+            raise BadRequest("give 'max_stops', 'max_km' or both")
+        if (max_stops is not None and max_stops < 0) or (max_km is not None and max_km < 0):
+            raise BadRequest("'max_stops' and 'max_km' must not be negative")
+        found = self.reachability.reachable(src, max_stops=max_stops, max_km=max_km)
+        return {
+            "src": src,
+            "count": len(found["codes"]),
+            "airports": [{"code": code, "lat": float(lat), "lon": float(lon), "stops": int(stops), "km": round(float(km), 1)}
+                         for code, lat, lon, stops, km in zip(found["codes"], found["lat"], found["lon"],
+                                                              found["stops"], found["km"])],
+        }
+
+    def price(self, params):
+        """Ticket price (USD) for `duration` (minutes), `stops` and `airline`; lists give a batch."""
+        columns, is_batch = _batch(params, {"duration": float, "stops": int, "airline": str}, {"stops": 0})
+        prices = predict_prices_batch(np.array(columns["duration"]), np.array(columns["stops"]), columns["airline"])
+        prices = np.round(prices.astype(float), 2).tolist()
+        return {"price_usd": prices if is_batch else prices[0]}
+
+    def delay(self, params):
+        """Delay probability for `distance` (km), `weather` and `airline`; lists give a batch."""
+        columns, is_batch = _batch(params, {"distance": float, "weather": str, "airline": str},
+                                   {"weather": DEFAULT_WEATHER})
+        risks = predict_delays_batch(np.array(columns["distance"]), columns["weather"], columns["airline"])
+        risks = np.round(risks.astype(float), 4).tolist()
+        return {"delay_risk": risks if is_batch else risks[0]}
+
+    def emissions(self, params):
+        """CO₂ (kg) for a `distance` in km (or a list of them), or for the shortest `src`-`dest` route."""
+        if "distance" not in params:
+            route = self.route({**params, "k": 1})
+            if not route["found"]:
+                return {"emissions_kg": None, "distance_km": None}
+            best = route["options"][0]
+            return {"emissions_kg": best["emissions_kg"], "distance_km": best["distance_km"]}
+        columns, is_batch = _batch(params, {"distance": float}, {})
+        kg = calculate_emissions_np(columns["distance"]).tolist()
+        return {"emissions_kg": kg if is_batch else kg[0]}
+
+
+# --- HTTP ---
+ENDPOINTS = {"/health": "health", "/metrics": "metrics", "/route": "route", "/reachable": "reachable", "/price": "price", "/delay": "delay", "/emissions": "emissions"}
+
+
+def make_handler(service):
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1" # keep-alive, so clients can reuse connections
+        disable_nagle_algorithm = True # headers and body are separate writes; don't wait for the ACK between them
+        server_version = "SkyLink"
+
+        def log_message(self, *args):
+            pass
+
+        def do_GET(self):
+            url = urlsplit(self.path)
+            params = {k: v[-1] for k, v in parse_qs(url.query).items()}
+            self._dispatch(url.path, params)
+
+        def do_POST(self):
+            url = urlsplit(self.path)
+            try:
+                length = int(self.headers.get("Content-Length") or 0)
+                params = json.loads(self.rfile.read(length) or b"{}")
+                if not isinstance(params, dict):
+                    raise ValueError("body must be a JSON object")
+            except ValueError as e:
+                return self._send(400, {"error": f"invalid JSON body: {e}"})
+            self._dispatch(url.path, params)
+
+        def _dispatch(self, path, params):
+            service.count_request()
+            name = ENDPOINTS.get(path.rstrip("/") or "/")
+            if name is None:
+                return self._send(404, {"error": f"unknown endpoint {path}", "endpoints": sorted(ENDPOINTS)})
+            if name == "metrics":
+                # Prometheus text by default (for scraping), ?format=json for the summary
+                if params.get("format") == "json":
+                    return self._send(200, METRICS.snapshot())
+                return self._send(200, METRICS.to_prometheus(), "text/plain; version=0.0.4")
+            try:
+                self._send(200, getattr(service, name)(params))
+            except BadRequest as e:
+                self._send(400, {"error": str(e)})
+            except Exception as e:
+                self._send(500, {"error": f"{type(e).__name__}: {e}"})
+
+        def _send(self, status, payload, content_type="application/json"):
+            body = (payload if isinstance(payload, str) else json.dumps(payload)).encode()
+            self.send_response(status)
+            self.send_header("Content-Type", content_type)
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+    return Handler
+
+
+def make_server(service, host=DEFAULT_HOST, port=DEFAULT_PORT):
+    """A threaded HTTP server for `service` (port 0 picks a free port); call `serve_forever()` on it."""
+    server = ThreadingHTTPServer((host, port), make_handler(service))
+    server.daemon_threads = True
+    return server
+
+
+# --- CLI ---
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="python -m src.service", description="SkyLink routing service")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    serve = commands.add_parser("serve", help="run the JSON HTTP API")
+    serve.add_argument("--host", default=DEFAULT_HOST)
+    serve.add_argument("--port", type=int, default=DEFAULT_PORT)
+
+    route = commands.add_parser("route", help="itineraries between two airports")
+    route.add_argument("src", help="IATA code(s), comma-separated for 'any of these'")
+    route.add_argument("dest")
+    route.add_argument("--k", type=int, default=1)
+    route.add_argument("--max-stops", type=int)
+    route.add_argument("--detour-ratio", type=float)
+    route.add_argument("--airlines", help="comma-separated airline IATA codes")
+    route.add_argument("--weather", default=DEFAULT_WEATHER)
+
+    reachable = commands.add_parser("reachable", help="airports within a number of stops and/or km")
+    reachable.add_argument("src")
+    reachable.add_argument("--max-stops", type=int)
+    reachable.add_argument("--max-km", type=float)
+
+    price = commands.add_parser("price", help="ticket price for one leg")
+    price.add_argument("duration", type=float, help="minutes")
+    price.add_argument("stops", type=int)
+    price.add_argument("airline")
+
+    delay = commands.add_parser("delay", help="delay probability for one leg")
+    delay.add_argument("distance", type=float, help="km")
+    delay.add_argument("airline")
+    delay.add_argument("--weather", default=DEFAULT_WEATHER)
+
+    emissions = commands.add_parser("emissions", help="CO2 for a distance or the shortest route")
+    emissions.add_argument("distance_or_src")
+    emissions.add_argument("dest", nargs="?")
+
+    args = parser.parse_args(argv)
+    if args.command == "emissions" and args.dest is None:
+        # A plain distance needs neither the network nor the models
+        print(json.dumps({"emissions_kg": float(calculate_emissions_np(float(args.distance_or_src)))}))
+        return
+
+    print("🚀 Loading data, network and models...")
+    service = RoutingService(warm_models=args.command == "serve")
+    if args.command == "serve":
+        server = make_server(service, args.host, args.port)
+        print(f"✅ Ready in {service.startup_seconds:.1f}s, serving on http://{args.host}:{server.server_port}")
+        try:
+            server.serve_forever()
+        except KeyboardInterrupt:
+            pass
+        finally:
+            server.server_close()
+        return
+
+    if args.command == "route":
+        result = service.route({"src": args.src, "dest": args.dest, "k": args.k, "max_stops": args.max_stops,
+                                "detour_ratio": args.detour_ratio, "airlines": args.airlines, "weather": args.weather})
+    elif args.command == "reachable":
+        result = service.reachable({"src": args.src, "max_stops": args.max_stops, "max_km": args.max_km})
+    elif args.command == "price":
+        result = service.price({"duration": args.duration, "stops": args.stops, "airline": args.airline})
+    elif args.command == "delay":
+        result = service.delay({"distance": args.distance, "weather": args.weather, "airline": args.airline})
+    else:
+        result = service.emissions({"src": args.distance_or_src, "dest": args.dest})
+    print(json.dumps(result, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,67 @@
+# src/spatial_index.py
+"""
+Ball-tree index over airport coordinates for nearest-airport and radius queries.
+
+Coordinates are indexed in radians with the haversine metric, so distances
+agree with `logic.haversine`. Every query takes scalar or array inputs and is
+answered for the whole batch in one tree traversal.
+"""
+import numpy as np
+from sklearn.neighbors import BallTree
+
+EARTH_RADIUS_KM = 6371 # same radius as logic.haversine
+# How far apart airports of one metro area ("any London airport") can be
+METRO_RADIUS_KM = 80
+
+
+class AirportIndex:
+    """Spatial index over the airports table (rows with an IATA code and coordinates)."""
+
+    def __init__(self, airports, min_routes=0):
+        table = airports.dropna(subset=["IATA", "Latitude", "Longitude"])
+        if min_routes:
+            table = table[table["RouteCount"] >= min_routes]
+        self.airports = table.reset_index(drop=True)
+        self.codes = self.airports["IATA"].astype(str).to_numpy(dtype=object)
+        self.index = {code: i for i, code in enumerate(self.codes.tolist())}
+        coords = np.radians(self.airports[["Latitude", "Longitude"]].to_numpy(dtype=np.float64))
+        self.tree = BallTree(coords, metric="haversine")
+        self._hubs = {}
+
+    @staticmethod
+    def _points(lat, lon):
+        lat, lon = np.broadcast_arrays(np.atleast_1d(np.asarray(lat, dtype=np.float64)),
+                                       np.atleast_1d(np.asarray(lon, dtype=np.float64)))
+        return np.radians(np.column_stack([lat, lon]))
+
+    def nearest(self, lat, lon, k=1):
+        """
+        The k nearest airports to each point: (codes, distances_km), both of
+        shape (n_points, k), closest first.
+        """
+        k = min(k, len(self.codes))
+        dist, rows = self.tree.query(self._points(lat, lon), k=k)
+        return self.codes[rows], dist * EARTH_RADIUS_KM
+
+    def within(self, lat, lon, radius_km):
+        """
+        Airports within `radius_km` of each point: one (codes, distances_km)
+        pair per point, closest first.
+        """
+        rows, dist = self.tree.query_radius(self._points(lat, lon), r=radius_km / EARTH_RADIUS_KM,
+                                            return_distance=True, sort_results=True)
+        return [(self.codes[r], d * EARTH_RADIUS_KM) for r, d in zip(rows, dist)]
+
+    def nearest_hub(self, lat, lon, min_routes=100, k=1):
+        """`nearest`, restricted to airports with at least `min_routes` routes."""
+        if min_routes not in self._hubs:
+            self._hubs[min_routes] = AirportIndex(self.airports, min_routes=min_routes)
+        return self._hubs[min_routes].nearest(lat, lon, k=k)
+
+    def metro_airports(self, code, radius_km=METRO_RADIUS_KM):
+        """Codes of the airports within `radius_km` of airport `code` (itself first)."""
+        if code not in self.index:
+            return [code]
+        row = self.airports.iloc[self.index[code]]
+        codes, _ = self.within(row["Latitude"], row["Longitude"], radius_km)[0]
+        return codes.tolist()
@@ -0,0 +1,128 @@
+# src/tables.py
+"""
+Loading the OpenFlights tables (airports, airlines, routes) without Streamlit,
+so the headless service and scripts can use them; `utils.load_data` wraps
+`load_tables` in the app's `st.cache_data`.
+"""
+import hashlib
+import os
+import pandas as pd
+import pyarrow as pa
+import pyarrow.feather as feather
+
+from src.metrics import METRICS, timed
+
+SOURCE_FILES = ["data/routes.dat", "data/airports.dat", "data/airlines.dat"]
+TABLE_CACHE_DIR = "data/.cache"
+# Bump when parse_tables changes so stale caches are ignored
+TABLE_CACHE_VERSION = 1
+# Columns stored (and returned) as pandas categoricals
+CATEGORICAL_COLUMNS = {
+    "airports": ["IATA"],
+    "airlines": ["IATA"],
+    "routes": ["Airline", "SourceAirport", "DestAirport"],
+}
+
+def _source_key():
+    """Fingerprint of the .dat files (size + mtime) used to name the cache files."""
+    h = hashlib.sha1(f"v{TABLE_CACHE_VERSION}".encode())
+    for path in SOURCE_FILES:
+        info = os.stat(path)
+        h.update(f"{path}:{info.st_size}:{info.st_mtime_ns}".encode())
+    return h.hexdigest()[:16]
+
+def _cache_path(key, name):
+    return os.path.join(TABLE_CACHE_DIR, f"{key}_{name}.feather")
+
+def _read_table_cache(key):
+    """Memory-maps the cached tables for this source key, or returns None."""
+    tables = []
+    for name in CATEGORICAL_COLUMNS:
+        path = _cache_path(key, name)
+        if not os.path.exists(path):
+            return None
+        tables.append(feather.read_table(path, memory_map=True).to_pandas())
+    return tuple(tables)
+
+def _write_table_cache(key, tables):
+    """Writes uncompressed Feather files (so they can be memory-mapped) and drops stale ones."""
+    os.makedirs(TABLE_CACHE_DIR, exist_ok=True)
+    for name, df in zip(CATEGORICAL_COLUMNS, tables):
+        path = _cache_path(key, name)
+        tmp = path + ".tmp"
+        feather.write_feather(pa.Table.from_pandas(df), tmp, compression="uncompressed")
+        os.replace(tmp, path)
+    for filename in os.listdir(TABLE_CACHE_DIR):
+        if filename.endswith(".feather") and not filename.startswith(key):
+            os.remove(os.path.join(TABLE_CACHE_DIR, filename))
+
+@timed("load_tables")
+def load_tables(use_cache=True):
+    """
+    Returns (airports, airlines, routes). The cleaned tables are cached as
+    Feather files keyed by the size and mtime of the .dat sources, so only
+    the first start after the data changes pays for the CSV parsing.
+    """
+    if not use_cache:
+        return parse_tables()
+    key = _source_key()
+    try:
+        cached = _read_table_cache(key)
+    except (OSError, pa.ArrowException):
+        cached = None
+    if cached is not None:
+        METRICS.count("table_cache_hits")
+        return cached
+
+    METRICS.count("table_cache_misses")
+    tables = parse_tables()
+    try:
+        _write_table_cache(key, tables)
+    except OSError as e:
+        print(f"⚠️ Could not write table cache: {e}")
+    return tables
+
+@timed("parse_tables")
+def parse_tables():
+    """
+    Parses the OpenFlights .dat files into the cleaned (airports, airlines, routes) tables.
+    """
+    # 1. Load Routes FIRST (to calculate popularity)
+    cols_routes = ["Airline", "AirlineID", "SourceAirport", "SourceAirportID", "DestAirport", "DestAirportID", "Codeshare", "Stops", "Equipment"]
+    routes = pd.read_csv("data/routes.dat", header=None, names=cols_routes, na_values=["\\N"])
+    routes = routes.dropna(subset=["SourceAirport", "DestAirport"])
+
+    # Calculate Airport Popularity (Number of routes)
+    route_counts = routes["SourceAirport"].value_counts().add(routes["DestAirport"].value_counts(), fill_value=0)
+
+    # 2. Load Airports
+    cols_airports = ["AirportID", "Name", "City", "Country", "IATA", "ICAO", "Latitude", "Longitude", "Altitude", "Timezone", "DST", "Tz", "Type", "Source"]
+    airports = pd.read_csv("data/airports.dat", header=None, names=cols_airports, na_values=["\\N"])
+    
+    # Filter out invalid rows
+    airports = airports.dropna(subset=["IATA", "City", "Name"])
+    
+    # Map popularity score to airports
+    airports["RouteCount"] = airports["IATA"].map(route_counts).fillna(0)
+    
+    # Sort by RouteCount (Descending), so big airports come first
+    airports = airports.sort_values(by="RouteCount", ascending=False)
+
+    # Create the Label for dropdowns
+    airports["Label"] = (
+        airports["City"] + ", " + 
+        airports["Country"] + " (" + 
+        airports["IATA"] + ") - " + 
+        airports["Name"]
+    )
+
+    # 3. Load Airlines
+    cols_airlines = ["AirlineID", "Name", "Alias", "IATA", "ICAO", "Callsign", "Country", "Active"]
+    airlines = pd.read_csv("data/airlines.dat", header=None, names=cols_airlines, na_values=["\\N"])
+    airlines = airlines[airlines["Active"] == "Y"]
+
+    # Low-cardinality code columns as categoricals (smaller in memory and on disk)
+    return tuple(
+        df.astype({col: "category" for col in columns})
+        for df, columns in zip((airports, airlines, routes), CATEGORICAL_COLUMNS.values())
+    )
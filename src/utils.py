@@ -1,54 +1,24 @@
 # src/utils.py
-import pandas as pd
 import streamlit as st
 import re
 
+from src.tables import load_tables, parse_tables # re-exported for existing callers
+
 @st.cache_data
 def load_data():
     """
     Loads and joins the Airports, Airlines, and Routes databases.
     Includes smart sorting so popular airports appear first.
     """
-    # 1. Load Routes FIRST (to calculate popularity)
-    cols_routes = ["Airline", "AirlineID", "SourceAirport", "SourceAirportID", "DestAirport", "DestAirportID", "Codeshare", "Stops", "Equipment"]
-    routes = pd.read_csv("data/routes.dat", header=None, names=cols_routes, na_values=["\\N"])
-    routes = routes.dropna(subset=["SourceAirport", "DestAirport"])
-
-    # Calculate Airport Popularity (Number of routes)
-    route_counts = routes["SourceAirport"].value_counts().add(routes["DestAirport"].value_counts(), fill_value=0)
-
-    # 2. Load Airports
-    cols_airports = ["AirportID", "Name", "City", "Country", "IATA", "ICAO", "Latitude", "Longitude", "Altitude", "Timezone", "DST", "Tz", "Type", "Source"]
-    airports = pd.read_csv("data/airports.dat", header=None, names=cols_airports, na_values=["\\N"])
-    
-    # Filter out invalid rows
-    airports = airports.dropna(subset=["IATA", "City", "Name"])
-    
-    # Map popularity score to airports
-    airports["RouteCount"] = airports["IATA"].map(route_counts).fillna(0)
-    
-    # Sort by RouteCount (Descending), so big airports come first
-    airports = airports.sort_values(by="RouteCount", ascending=False)
+    return load_tables()
 
-    # Create the Label for dropdowns
-    airports["Label"] = (
-        airports["City"] + ", " + 
-        airports["Country"] + " (" + 
-        airports["IATA"] + ") - " + 
-        airports["Name"]
-    )
-
-    # 3. Load Airlines
-    cols_airlines = ["AirlineID", "Name", "Alias", "IATA", "ICAO", "Callsign", "Country", "Active"]
-    airlines = pd.read_csv("data/airlines.dat", header=None, names=cols_airlines, na_values=["\\N"])
-    airlines = airlines[airlines["Active"] == "Y"]
-
-    return airports, airlines, routes
-
-def parse_natural_language_query(query, airport_options):
+def parse_natural_language_query(query, airport_options, place_index=None):
     """
     Extracts Origin and Destination from sentences like:
     'Fly from Mumbai to Paris' or 'New York to Tokyo'
+
+    With a `PlaceIndex` the names are resolved through the index (ranked,
+    typo-tolerant); without one, the first label containing the name wins.
     """
     if not query: return None, None
     
@@ -69,6 +39,12 @@ def parse_natural_language_query(query, airport_options):
     else:
         return None, None # Failed to parse
 
+    if place_index is not None:
+        found_origin = place_index.resolve(origin_name) if origin_name else None
+        found_dest = place_index.resolve(dest_name) if dest_name else None
+        return (found_origin if found_origin in airport_options else None,
+                found_dest if found_dest in airport_options else None)
+
     # Attempt to match names to our airport list
     # We do a loose search in the "Label" keys
     found_origin = None